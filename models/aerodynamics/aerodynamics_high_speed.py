@@ -67,11 +67,17 @@ class AerodynamicsHighSpeed(Group):
         else:
             self.add_subsystem(
                 "oswald",
-                ComputeOSWALDopenvsp(wing_airfoil_file=self.options["wing_airfoil_file"]),
+                ComputeOSWALDopenvsp(
+                    wing_airfoil_file=self.options["wing_airfoil_file"],
+                    htp_airfoil_file=self.options["htp_airfoil_file"],
+                ),
                 promotes=["*"])
             self.add_subsystem(
                 "cl_alpha",
-                ComputeWingCLALPHAopenvsp(wing_airfoil_file=self.options["wing_airfoil_file"]),
+                ComputeWingCLALPHAopenvsp(
+                    wing_airfoil_file=self.options["wing_airfoil_file"],
+                    htp_airfoil_file=self.options["htp_airfoil_file"],
+                ),
                 promotes=["*"])
         self.add_subsystem("cd0_wing", Cd0Wing(wing_airfoil_file=self.options["wing_airfoil_file"]), promotes=["*"])
         self.add_subsystem("cd0_fuselage", Cd0Fuselage(), promotes=["*"])
@@ -26,6 +26,7 @@ from .components.cd0_other import Cd0Other
 from .components.compute_cl_max import ComputeMaxCL
 from .components.compute_reynolds import ComputeReynolds
 from .components.high_lift_aero import ComputeDeltaHighLift
+from .constants import POLAR_POINT_COUNT
 
 from .external.vlm import ComputeOSWALDvlm, ComputeWingCLALPHAvlm, ComputeHTPCLCMvlm, ComputeHTPCLALPHAvlm
 from .external.openvsp import ComputeOSWALDopenvsp, ComputeWingCLALPHAopenvsp, ComputeHTPCLCMopenvsp, \
@@ -59,13 +60,19 @@ class AerodynamicsLowSpeed(Group):
                 "data:geometry:wing:tip:chord",
             ]
         )
-        self.add_subsystem("comp_polar2", XfoilPolar(), promotes=["data:geometry:wing:thickness_ratio"])
-        self.add_subsystem("comp_polar3", XfoilPolar(), promotes=["data:geometry:wing:thickness_ratio"])
+        # Polars of MAC (used with VLM only), root and tip chords are computed concurrently by separate XFOIL
+        # processes
+        sections = ["root", "tip"] if self.options["use_openvsp"] else ["MAC", "root", "tip"]
+        self.add_subsystem(
+            "comp_polar",
+            XfoilPolar(
+                wing_airfoil_file=self.options["wing_airfoil_file"],
+                reynolds_count=len(sections),
+                concurrent_reynolds=True,
+            ),
+            promotes=["data:geometry:wing:thickness_ratio"],
+        )
         if not (self.options["use_openvsp"]):
-            self.add_subsystem(
-                "comp_polar1",
-                XfoilPolar(wing_airfoil_file=self.options["wing_airfoil_file"]),
-                promotes=["data:geometry:wing:thickness_ratio"])
             self.add_subsystem(
                 "oswald",
                 ComputeOSWALDvlm(low_speed_aero=True, wing_airfoil_file=self.options["wing_airfoil_file"]),
@@ -77,11 +84,19 @@ class AerodynamicsLowSpeed(Group):
         else:
             self.add_subsystem(
                 "oswald",
-                ComputeOSWALDopenvsp(low_speed_aero=True, wing_airfoil_file=self.options["wing_airfoil_file"]),
+                ComputeOSWALDopenvsp(
+                    low_speed_aero=True,
+                    wing_airfoil_file=self.options["wing_airfoil_file"],
+                    htp_airfoil_file=self.options["htp_airfoil_file"],
+                ),
                 promotes=["*"])
             self.add_subsystem(
                 "cl_alpha",
-                ComputeWingCLALPHAopenvsp(low_speed_aero=True, wing_airfoil_file=self.options["wing_airfoil_file"]),
+                ComputeWingCLALPHAopenvsp(
+                    low_speed_aero=True,
+                    wing_airfoil_file=self.options["wing_airfoil_file"],
+                    htp_airfoil_file=self.options["htp_airfoil_file"],
+                ),
                 promotes=["*"])
         self.add_subsystem("cd0_wing",
                            Cd0Wing(low_speed_aero=True,wing_airfoil_file=self.options["wing_airfoil_file"]),
@@ -127,33 +142,49 @@ class AerodynamicsLowSpeed(Group):
                 ), promotes=["*"])
         self.add_subsystem("cl_max", ComputeMaxCL(), promotes=["*"])
 
+        self.connect("data:aerodynamics:low_speed:mach", "comp_polar.xfoil:mach")
+        self.connect("data:aerodynamics:low_speed:unit_reynolds", "comp_polar.xfoil:unit_reynolds")
+        self.connect(
+            "xfoil_in.xfoil:length", "comp_polar.xfoil:length",
+            src_indices=[Connection.SECTIONS.index(section) for section in sections]
+        )
         if not (self.options["use_openvsp"]):
-            self.connect("data:aerodynamics:low_speed:mach", "comp_polar1.xfoil:mach")
-            self.connect("data:aerodynamics:low_speed:unit_reynolds", "comp_polar1.xfoil:unit_reynolds")
-            self.connect("xfoil_in.xfoil:length1", "comp_polar1.xfoil:length")
-            self.connect("comp_polar1.xfoil:CL", "data:aerodynamics:wing:low_speed:CL")
-            self.connect("comp_polar1.xfoil:CDp", "data:aerodynamics:wing:low_speed:CDp")
-        self.connect("data:aerodynamics:low_speed:mach", "comp_polar2.xfoil:mach")
-        self.connect("data:aerodynamics:low_speed:unit_reynolds", "comp_polar2.xfoil:unit_reynolds")
-        self.connect("xfoil_in.xfoil:length2", "comp_polar2.xfoil:length")
-        self.connect("comp_polar2.xfoil:CL_max_2D", "data:aerodynamics:wing:low_speed:root:CL_max_2D")
-        self.connect("data:aerodynamics:low_speed:mach", "comp_polar3.xfoil:mach")
-        self.connect("data:aerodynamics:low_speed:unit_reynolds", "comp_polar3.xfoil:unit_reynolds")
-        self.connect("xfoil_in.xfoil:length3", "comp_polar3.xfoil:length")
-        self.connect("comp_polar3.xfoil:CL_max_2D", "data:aerodynamics:wing:low_speed:tip:CL_max_2D")
+            # Polar outputs have one row per section
+            mac_indices = np.arange(POLAR_POINT_COUNT) + sections.index("MAC") * POLAR_POINT_COUNT
+            self.connect(
+                "comp_polar.xfoil:CL", "data:aerodynamics:wing:low_speed:CL",
+                src_indices=mac_indices, flat_src_indices=True
+            )
+            self.connect(
+                "comp_polar.xfoil:CDp", "data:aerodynamics:wing:low_speed:CDp",
+                src_indices=mac_indices, flat_src_indices=True
+            )
+        self.connect(
+            "comp_polar.xfoil:CL_max_2D", "data:aerodynamics:wing:low_speed:root:CL_max_2D",
+            src_indices=[sections.index("root")]
+        )
+        self.connect(
+            "comp_polar.xfoil:CL_max_2D", "data:aerodynamics:wing:low_speed:tip:CL_max_2D",
+            src_indices=[sections.index("tip")]
+        )
 
 
 class Connection(ExplicitComponent):
+    # Wing sections whose chords are provided (in this order) in xfoil:length
+    SECTIONS = ["MAC", "root", "tip"]
+
     def setup(self):
         self.add_input("data:geometry:wing:MAC:length", val=np.nan, units="m")
         self.add_input("data:geometry:wing:root:chord", val=np.nan, units="m")
         self.add_input("data:geometry:wing:tip:chord", val=np.nan, units="m")
-        self.add_output("xfoil:length1", units="m")
-        self.add_output("xfoil:length2", units="m")
-        self.add_output("xfoil:length3", units="m")
+        self.add_output("xfoil:length", shape=len(self.SECTIONS), units="m")
         self.declare_partials("*", "*", method="fd")
 
     def compute(self, inputs, outputs, discrete_inputs=None, discrete_outputs=None):
-        outputs["xfoil:length1"] = inputs["data:geometry:wing:MAC:length"]
-        outputs["xfoil:length2"] = inputs["data:geometry:wing:root:chord"]
-        outputs["xfoil:length3"] = inputs["data:geometry:wing:tip:chord"]
+        outputs["xfoil:length"] = np.concatenate(
+            (
+                inputs["data:geometry:wing:MAC:length"],
+                inputs["data:geometry:wing:root:chord"],
+                inputs["data:geometry:wing:tip:chord"],
+            )
+        )
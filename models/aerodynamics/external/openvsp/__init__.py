@@ -16,4 +16,5 @@ from .compute_ht_cl_alpha import ComputeHTPCLALPHAopenvsp
 from .compute_ht_cl_cm import ComputeHTPCLCMopenvsp
 from .compute_oswald import ComputeOSWALDopenvsp
 from .compute_wing_cl_alpha import ComputeWingCLALPHAopenvsp
-from .compute_aero import ComputeAEROopenvsp
\ No newline at end of file
+from .compute_aero import ComputeAEROopenvsp
+from .openvsp import OpenVSP, OPENVSP_CACHE, GEOMETRY_CACHE
@@ -0,0 +1,105 @@
+"""
+Concurrent execution of independent OpenVSP cases (vspscript or vspaero runs).
+
+Each case is run by its own runner script (.bat file on Windows, shell script elsewhere). When this module is run as
+a script, it runs the runner scripts given as arguments concurrently, so the external code component only has to
+launch one command.
+"""
+#  This file is part of FAST : A framework for rapid Overall Aircraft Design
+#  Copyright (C) 2020  ONERA & ISAE-SUPAERO
+#  FAST is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Dev Note: this module is run as a standalone script, so it must only import standard modules.
+import argparse
+import os
+import shlex
+import stat
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+RUNNER_EXTENSION = ".bat" if sys.platform == "win32" else ".sh"
+
+
+def write_case_runner(runner_path: str, exe_path: str, arguments: List[str]) -> str:
+    """
+    Writes the script that runs one case, output of the executable being discarded.
+
+    :param runner_path: path of the script, without extension (RUNNER_EXTENSION is added)
+    :param exe_path: path of the executable (vspscript or vspaero)
+    :param arguments: command line arguments of the executable
+    :return: path of the written script
+    """
+    runner_path += RUNNER_EXTENSION
+    with open(runner_path, "w") as runner_file:
+        if sys.platform == "win32":
+            runner_file.write("@echo off\n")
+            runner_file.write(subprocess.list2cmdline([exe_path] + arguments) + " >nul 2>nul\n")
+        else:
+            runner_file.write("#!/bin/sh\n")
+            runner_file.write(" ".join(shlex.quote(word) for word in [exe_path] + arguments) + " >/dev/null 2>&1\n")
+    if sys.platform != "win32":
+        os.chmod(runner_path, os.stat(runner_path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    return runner_path
+
+
+def get_cases_command(runner_paths: List[str], max_workers: Optional[int] = None) -> List[str]:
+    """
+    :param runner_paths: paths of the case runner scripts
+    :param max_workers: maximum number of cases run at once (all of them if None)
+    :return: the command that runs the cases concurrently, to be used as ExternalCodeComp command
+    """
+    command = [sys.executable, os.path.abspath(__file__)]
+    if max_workers:
+        command += ["--max-workers", str(max_workers)]
+
+    return command + list(runner_paths)
+
+
+def run_cases(runner_paths: List[str], max_workers: Optional[int] = None) -> int:
+    """
+    Runs the case runner scripts concurrently.
+
+    :param runner_paths: paths of the case runner scripts
+    :param max_workers: maximum number of cases run at once (all of them if None)
+    :return: 0 if all cases succeeded, the return code of the first failed case otherwise
+    """
+    if not runner_paths:
+        return 0
+
+    def run_case(runner_path):
+        if sys.platform == "win32":
+            return subprocess.call(["cmd.exe", "/c", runner_path])
+        return subprocess.call([runner_path])
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(runner_paths)) as executor:
+        return_codes = list(executor.map(run_case, runner_paths))
+
+    for runner_path, return_code in zip(runner_paths, return_codes):
+        if return_code != 0:
+            sys.stderr.write("Case %s failed with return code %i\n" % (runner_path, return_code))
+    return next((return_code for return_code in return_codes if return_code != 0), 0)
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Runs OpenVSP case runner scripts concurrently")
+    parser.add_argument("--max-workers", type=int, default=None, help="maximum number of cases run at once")
+    parser.add_argument("runner_paths", nargs="+", help="paths of the case runner scripts")
+    parsed_arguments = parser.parse_args(arguments)
+
+    return run_cases(parsed_arguments.runner_paths, parsed_arguments.max_workers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
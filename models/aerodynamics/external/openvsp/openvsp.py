@@ -0,0 +1,520 @@
+"""
+    OpenVSP runs shared by the OpenVSP components of the wing and horizontal tail
+"""
+#  This file is part of FAST : A framework for rapid Overall Aircraft Design
+#  Copyright (C) 2020  ONERA & ISAE-SUPAERO
+#  FAST is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import os.path as pth
+import shutil
+import tempfile
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Dict, List
+
+import numpy as np
+from fastoad.utils.physics import Atmosphere
+from fastoad.utils.resource_management.copy import copy_resource, copy_resource_folder
+from importlib_resources import path
+from openmdao.components.external_code_comp import ExternalCodeComp
+from openmdao.utils.file_wrap import InputFileGenerator
+
+from ... import resources
+from . import resources as local_resources
+from . import openvsp3201
+from .case_runner import write_case_runner, get_cases_command
+from ..vlm.cache import VLMCache
+from ...constants import HT_POINT_COUNT
+
+OPTION_OPENVSP_EXE_PATH = "openvsp_exe_path"
+OPTION_RESULT_FOLDER_PATH = "result_folder_path"
+OPTION_MAX_CONCURRENT_CASES = "max_concurrent_cases"
+
+WING_GEOMETRY = "wing_openvsp"  # wing alone
+WING_HTP_GEOMETRY = "wing_ht_openvsp"  # wing and horizontal tail
+
+ALPHA_LIMIT = 30.0  # Limit angle for horizontal tail CL/CM curves
+HT_AOA_LIST = list(np.linspace(0.0, ALPHA_LIMIT, HT_POINT_COUNT))
+
+# Angles of attack computed for each geometry: all the ones needed by the OpenVSP components (lift slopes, Oswald
+# coefficient, horizontal tail curves at low speed), so that they all use the same run.
+_WING_AOA_LIST = [0.0, 7.0, 7.5]
+_WING_HTP_AOA_LIST = [0.0, 4.0]
+_LOW_SPEED_WING_HTP_AOA_LIST = sorted(set(_WING_HTP_AOA_LIST + HT_AOA_LIST))
+
+_RESULT_SUBFOLDER = "OPENVSP"
+_STDERR_FILE_NAME = "vspaero_calc.err"
+VSPSCRIPT_EXE_NAME = "vspscript.exe"
+VSPAERO_EXE_NAME = "vspaero.exe"
+
+# Inputs defining the OpenVSP geometries and reference values: used as cache key
+_GEOMETRY_INPUTS = [
+    "data:geometry:wing:MAC:leading_edge:x:local",
+    "data:geometry:wing:MAC:length",
+    "data:geometry:fuselage:maximum_width",
+    "data:geometry:wing:root:y",
+    "data:geometry:wing:root:chord",
+    "data:geometry:wing:tip:y",
+    "data:geometry:wing:tip:chord",
+    "data:geometry:wing:sweep_0",
+    "data:geometry:wing:MAC:at25percent:x",
+    "data:geometry:wing:area",
+    "data:geometry:wing:span",
+    "data:geometry:fuselage:maximum_height",
+    "data:geometry:horizontal_tail:sweep_25",
+    "data:geometry:horizontal_tail:span",
+    "data:geometry:horizontal_tail:root:chord",
+    "data:geometry:horizontal_tail:tip:chord",
+    "data:geometry:horizontal_tail:MAC:at25percent:x:from_wingMAC25",
+    "data:geometry:horizontal_tail:MAC:length",
+    "data:geometry:horizontal_tail:MAC:at25percent:x:local",
+    "data:geometry:horizontal_tail:z:from_wingMAC25",
+]
+# Inputs defining the vspscript geometries: used as geometry cache key (see get_geometry_key)
+_WING_PLANFORM_INPUTS = [
+    "data:geometry:wing:MAC:leading_edge:x:local",
+    "data:geometry:wing:MAC:length",
+    "data:geometry:fuselage:maximum_width",
+    "data:geometry:wing:root:y",
+    "data:geometry:wing:root:chord",
+    "data:geometry:wing:tip:y",
+    "data:geometry:wing:tip:chord",
+    "data:geometry:wing:sweep_0",
+    "data:geometry:wing:MAC:at25percent:x",
+    "data:geometry:fuselage:maximum_height",
+]
+_HTP_PLANFORM_INPUTS = [
+    "data:geometry:horizontal_tail:sweep_25",
+    "data:geometry:horizontal_tail:span",
+    "data:geometry:horizontal_tail:root:chord",
+    "data:geometry:horizontal_tail:tip:chord",
+    "data:geometry:horizontal_tail:MAC:at25percent:x:from_wingMAC25",
+    "data:geometry:horizontal_tail:MAC:length",
+    "data:geometry:horizontal_tail:MAC:at25percent:x:local",
+    "data:geometry:horizontal_tail:z:from_wingMAC25",
+]
+
+# Results of the OpenVSP runs, shared by all the OpenVSP components of the process
+OPENVSP_CACHE = VLMCache()
+# Degenerate geometry files generated by vspscript, shared by all the OpenVSP components of the process (aero
+# solves of another flight condition reuse them)
+GEOMETRY_CACHE = VLMCache()
+
+
+def get_geometry_key(inputs, geometry: str, wing_airfoil_file: str, htp_airfoil_file: str) -> str:
+    """
+    :param inputs: component inputs (with the planform inputs of the geometry)
+    :param geometry: WING_GEOMETRY or WING_HTP_GEOMETRY
+    :param wing_airfoil_file: name of the wing airfoil file
+    :param htp_airfoil_file: name of the horizontal tail airfoil file
+    :return: the GEOMETRY_CACHE key of the degenerate geometry, that only depends on planform inputs
+    """
+    if geometry == WING_GEOMETRY:
+        return GEOMETRY_CACHE.get_key(geometry, *[inputs[name] for name in _WING_PLANFORM_INPUTS], wing_airfoil_file)
+
+    return GEOMETRY_CACHE.get_key(
+        geometry, *[inputs[name] for name in _WING_PLANFORM_INPUTS + _HTP_PLANFORM_INPUTS], wing_airfoil_file,
+        htp_airfoil_file,
+    )
+
+
+class OpenVSP(ExternalCodeComp):
+    """
+    Base class of OpenVSP components.
+
+    All the cases needed by the components (wing alone and wing with horizontal tail, at several angles of attack)
+    are computed at once by the first component that runs for a given geometry and flight condition, the other ones
+    reading results from OPENVSP_CACHE. Geometries are generated concurrently, and so are the vspaero cases.
+    """
+
+    def initialize(self):
+        self.options.declare(OPTION_RESULT_FOLDER_PATH, default="", types=str)
+        self.options.declare(OPTION_OPENVSP_EXE_PATH, default="", types=str, allow_none=True)
+        self.options.declare(OPTION_MAX_CONCURRENT_CASES, default=None, types=int, allow_none=True)
+        self.options.declare('wing_airfoil_file', default="naca23012.af", types=str, allow_none=True)
+        self.options.declare('htp_airfoil_file', default="naca0012.af", types=str, allow_none=True)
+
+    def setup(self):
+
+        self.add_input("data:geometry:wing:MAC:leading_edge:x:local", val=np.nan, units="m")
+        self.add_input("data:geometry:wing:MAC:length", val=np.nan, units="m")
+        self.add_input("data:geometry:fuselage:maximum_width", val=np.nan, units="m")
+        self.add_input("data:geometry:wing:root:y", val=np.nan, units="m")
+        self.add_input("data:geometry:wing:root:chord", val=np.nan, units="m")
+        self.add_input("data:geometry:wing:tip:y", val=np.nan, units="m")
+        self.add_input("data:geometry:wing:tip:chord", val=np.nan, units="m")
+        self.add_input("data:geometry:wing:sweep_0", val=np.nan, units="deg")
+        self.add_input("data:geometry:wing:MAC:at25percent:x", val=np.nan, units="m")
+        self.add_input("data:geometry:wing:area", val=np.nan, units="m**2")
+        self.add_input("data:geometry:wing:span", val=np.nan, units="m")
+        self.add_input("data:geometry:fuselage:maximum_height", val=np.nan, units="m")
+        self.add_input("data:geometry:horizontal_tail:sweep_25", val=np.nan, units="deg")
+        self.add_input("data:geometry:horizontal_tail:span", val=np.nan, units="m")
+        self.add_input("data:geometry:horizontal_tail:root:chord", val=np.nan, units="m")
+        self.add_input("data:geometry:horizontal_tail:tip:chord", val=np.nan, units="m")
+        self.add_input("data:geometry:horizontal_tail:MAC:at25percent:x:from_wingMAC25", val=np.nan, units="m")
+        self.add_input("data:geometry:horizontal_tail:MAC:length", val=np.nan, units="m")
+        self.add_input("data:geometry:horizontal_tail:MAC:at25percent:x:local", val=np.nan, units="m")
+        self.add_input("data:geometry:horizontal_tail:z:from_wingMAC25", val=np.nan, units="m")
+
+    def check_config(self, logger):
+        # let void to avoid logger error on "The command cannot be empty"
+        pass
+
+    def compute_cases(self, inputs, low_speed: bool) -> Dict[str, Dict[float, dict]]:
+        """
+        Runs OpenVSP (or gets results from cache) for the wing alone and the wing with horizontal tail.
+
+        :param inputs: component inputs
+        :param low_speed: if True, low speed Mach number is used at sea level, else cruise Mach number and altitude
+        :return: for WING_GEOMETRY and WING_HTP_GEOMETRY, the results of each angle of attack (in degrees) as a dict
+                 with .polar file values (cl, cdi, oswald, cm) and .lod file values (cl_wing, cm_wing, y_vector,
+                 cl_vector, cl_htp, cm_htp)
+        """
+        if low_speed:
+            altitude = 0.0
+            mach = float(inputs["data:aerodynamics:low_speed:mach"])
+            wing_htp_aoa_list = _LOW_SPEED_WING_HTP_AOA_LIST
+        else:
+            altitude = float(inputs["data:mission:sizing:main_route:cruise:altitude"])
+            mach = float(inputs["data:aerodynamics:cruise:mach"])
+            wing_htp_aoa_list = _WING_HTP_AOA_LIST
+
+        key = OPENVSP_CACHE.get_key(
+            *[inputs[name] for name in _GEOMETRY_INPUTS], mach, altitude, _WING_AOA_LIST, wing_htp_aoa_list,
+            self.options['wing_airfoil_file'], self.options['htp_airfoil_file'],
+        )
+        results = OPENVSP_CACHE.get(key)
+        if results is None:
+            results = self._run_cases(
+                inputs, mach, altitude, {WING_GEOMETRY: _WING_AOA_LIST, WING_HTP_GEOMETRY: wing_htp_aoa_list}
+            )
+            OPENVSP_CACHE.put(key, results)
+
+        return results
+
+    def _run_cases(self, inputs, mach: float, altitude: float, aoa_lists: Dict[str, List[float]]) -> dict:
+        """ Generates the geometries and runs vspaero for all angles of attack of each geometry """
+
+        # Create result folder first (if it must fail, let it fail as soon as possible)
+        result_folder_path = self.options[OPTION_RESULT_FOLDER_PATH]
+        if result_folder_path != "":
+            os.makedirs(pth.join(result_folder_path, _RESULT_SUBFOLDER), exist_ok=True)
+
+        # Get inputs (and calculate missing ones)
+        l0_wing = inputs["data:geometry:wing:MAC:length"]
+        fa_length = inputs["data:geometry:wing:MAC:at25percent:x"]
+        sref_wing = inputs['data:geometry:wing:area']
+        span_wing = inputs['data:geometry:wing:span']
+        atm = Atmosphere(altitude)
+        viscosity = atm.kinematic_viscosity
+        rho = atm.density
+        v_inf = max(atm.speed_of_sound * mach, 0.01)  # avoid V=0 m/s crashes
+        reynolds = v_inf * l0_wing / viscosity
+
+        # OPENVSP-SCRIPT: Geometry generation ######################################################
+
+        # I/O files --------------------------------------------------------------------------------
+        tmp_directory = self._create_tmp_directory()
+        # avoid to dump void xternal_code_comp_error.out error file
+        self.stderr = pth.join(tmp_directory.name, _STDERR_FILE_NAME)
+        if self.options[OPTION_OPENVSP_EXE_PATH]:
+            target_directory = pth.abspath(self.options[OPTION_OPENVSP_EXE_PATH])
+        else:
+            target_directory = tmp_directory.name
+        airfoil_file_paths = [pth.join(target_directory, self.options['wing_airfoil_file']),
+                              pth.join(target_directory, self.options['htp_airfoil_file'])]
+        csv_file_paths = [pth.join(target_directory, geometry + '_DegenGeom0.csv') for geometry in aoa_lists]
+        # Degenerate geometries already generated for the same planform are read from cache
+        geometry_keys = [
+            get_geometry_key(inputs, geometry, self.options['wing_airfoil_file'], self.options['htp_airfoil_file'])
+            for geometry in aoa_lists
+        ]
+        missing_geometries = []
+        missing_csv_file_paths = []
+        for geometry, geometry_key, csv_file_path in zip(aoa_lists, geometry_keys, csv_file_paths):
+            degen_geom = GEOMETRY_CACHE.get(geometry_key)
+            if degen_geom is None:
+                missing_geometries.append(geometry)
+                missing_csv_file_paths.append(csv_file_path)
+            else:
+                with open(csv_file_path, 'w') as csv_file:
+                    csv_file.write(degen_geom)
+        script_file_paths = [pth.join(target_directory, geometry + '.vspscript') for geometry in missing_geometries]
+        self.options["external_input_files"] = script_file_paths + airfoil_file_paths
+        self.options["external_output_files"] = missing_csv_file_paths
+
+        # Pre-processing (populating temp directory and generate runner scripts) -------------------
+        # Copy resource in temp directory if needed
+        if not (self.options[OPTION_OPENVSP_EXE_PATH]):
+            # noinspection PyTypeChecker
+            copy_resource_folder(openvsp3201, target_directory)
+            # noinspection PyTypeChecker
+            copy_resource(resources, self.options['wing_airfoil_file'], target_directory)
+            # noinspection PyTypeChecker
+            copy_resource(resources, self.options['htp_airfoil_file'], target_directory)
+        # Create corresponding runner scripts (one for each missing geometry, run concurrently)
+        runner_paths = []
+        for idx, (geometry, script_file_path) in enumerate(zip(missing_geometries, script_file_paths)):
+            runner_paths.append(write_case_runner(
+                pth.join(target_directory, 'vspscript_' + str(idx)),
+                pth.join(target_directory, VSPSCRIPT_EXE_NAME),
+                ['-script', script_file_path],
+            ))
+            self._write_script_file(inputs, geometry, script_file_path, airfoil_file_paths,
+                                    missing_csv_file_paths[idx])
+        self.options["command"] = get_cases_command(runner_paths, self.options[OPTION_MAX_CONCURRENT_CASES])
+
+        # Run SCRIPT --------------------------------------------------------------------------------
+        if missing_geometries:
+            super().compute(inputs, {})
+            for geometry_key, csv_file_path in zip(geometry_keys, csv_file_paths):
+                if csv_file_path in missing_csv_file_paths:
+                    with open(csv_file_path, 'r') as csv_file:
+                        GEOMETRY_CACHE.put(geometry_key, csv_file.read())
+        input_file_list = script_file_paths + csv_file_paths
+
+        # OPENVSP-AERO: aero calculation ############################################################
+
+        # I/O files --------------------------------------------------------------------------------
+        # Duplicate .csv file for multiple run
+        case_paths = []
+        for geometry, csv_file_path in zip(aoa_lists, csv_file_paths):
+            for idx in range(len(aoa_lists[geometry])):
+                case_path = pth.join(target_directory, geometry + '_DegenGeom' + str(idx))
+                if idx > 0:
+                    shutil.copy(csv_file_path, case_path + '.csv')
+                case_paths.append(case_path)
+        self.options["external_input_files"] = [case_path + ext for ext in ['.csv', '.vspaero']
+                                                for case_path in case_paths]
+        self.options["external_output_files"] = [case_path + ext for ext in ['.lod', '.polar']
+                                                 for case_path in case_paths]
+
+        # Pre-processing (create runner scripts) ---------------------------------------------------
+        # Create corresponding runner scripts (one for each case, run concurrently)
+        runner_paths = []
+        for idx, case_path in enumerate(case_paths):
+            runner_paths.append(write_case_runner(
+                pth.join(target_directory, 'vspaero_' + str(idx)),
+                pth.join(target_directory, VSPAERO_EXE_NAME),
+                [case_path],
+            ))
+        self.options["command"] = get_cases_command(runner_paths, self.options[OPTION_MAX_CONCURRENT_CASES])
+
+        # standard AERO input file -----------------------------------------------------------------
+        parser = InputFileGenerator()
+        case_aoa_list = [aoa for geometry in aoa_lists for aoa in aoa_lists[geometry]]
+        case_templates = [geometry + '_DegenGeom.vspaero' for geometry in aoa_lists for _ in aoa_lists[geometry]]
+        for case_path, aoa, template_file in zip(case_paths, case_aoa_list, case_templates):
+            with path(local_resources, template_file) as input_template_path:
+                parser.set_template_file(str(input_template_path))
+                parser.set_generated_file(case_path + '.vspaero')
+                parser.reset_anchor()
+                parser.mark_anchor("Sref")
+                parser.transfer_var(float(sref_wing), 0, 3)
+                parser.mark_anchor("Cref")
+                parser.transfer_var(float(l0_wing), 0, 3)
+                parser.mark_anchor("Bref")
+                parser.transfer_var(float(span_wing), 0, 3)
+                parser.mark_anchor("X_cg")
+                parser.transfer_var(float(fa_length), 0, 3)
+                parser.mark_anchor("Mach")
+                parser.transfer_var(float(mach), 0, 3)
+                parser.mark_anchor("AOA")
+                parser.transfer_var(float(aoa), 0, 3)
+                parser.mark_anchor("Vinf")
+                parser.transfer_var(float(v_inf), 0, 3)
+                parser.mark_anchor("Rho")
+                parser.transfer_var(float(rho), 0, 3)
+                parser.mark_anchor("ReCref")
+                parser.transfer_var(float(reynolds), 0, 3)
+                parser.generate()
+
+        # Run AERO --------------------------------------------------------------------------------
+        super().compute(inputs, {})
+
+        # Post-processing --------------------------------------------------------------------------
+        results = {geometry: {} for geometry in aoa_lists}
+        case_geometries = [geometry for geometry in aoa_lists for _ in aoa_lists[geometry]]
+        for case_path, aoa, geometry in zip(case_paths, case_aoa_list, case_geometries):
+            cl, cdi, oswald, cm = self._read_polar_file(case_path + '.polar')
+            cl_wing, cm_wing, y_vector, cl_vector, cl_htp, cm_htp = self._read_lod_file(case_path + '.lod')
+            results[geometry][aoa] = {
+                "cl": cl, "cdi": cdi, "oswald": oswald, "cm": cm, "cl_wing": cl_wing, "cm_wing": cm_wing,
+                "y_vector": y_vector, "cl_vector": cl_vector, "cl_htp": cl_htp, "cm_htp": cm_htp,
+            }
+
+        # Getting input/output files if needed
+        if result_folder_path != "":
+            file_list = input_file_list + self.options["external_input_files"] \
+                        + self.options["external_output_files"]
+            for file_path in file_list:
+                new_path = pth.join(result_folder_path, _RESULT_SUBFOLDER, pth.split(file_path)[1])
+                if pth.exists(file_path):
+                    shutil.copyfile(file_path, new_path)
+
+        # Delete temporary directory
+        tmp_directory.cleanup()
+
+        return results
+
+    def _write_script_file(self, inputs, geometry: str, script_file_path: str, airfoil_file_paths: List[str],
+                           csv_file_path: str):
+        """ Generates vspscript file of the wing (and horizontal tail for WING_HTP_GEOMETRY) """
+
+        # Get inputs (and calculate missing ones)
+        x0_wing = inputs["data:geometry:wing:MAC:leading_edge:x:local"]
+        l0_wing = inputs["data:geometry:wing:MAC:length"]
+        width_max = inputs["data:geometry:fuselage:maximum_width"]
+        y1_wing = width_max / 2.0
+        y2_wing = inputs["data:geometry:wing:root:y"]
+        l2_wing = inputs["data:geometry:wing:root:chord"]
+        y4_wing = inputs["data:geometry:wing:tip:y"]
+        l4_wing = inputs["data:geometry:wing:tip:chord"]
+        sweep_0_wing = inputs["data:geometry:wing:sweep_0"]
+        fa_length = inputs["data:geometry:wing:MAC:at25percent:x"]
+        height_max = inputs["data:geometry:fuselage:maximum_height"]
+        sweep_25_htp = inputs["data:geometry:horizontal_tail:sweep_25"]
+        span_htp = inputs["data:geometry:horizontal_tail:span"] / 2.0
+        root_chord_htp = inputs["data:geometry:horizontal_tail:root:chord"]
+        tip_chord_htp = inputs["data:geometry:horizontal_tail:tip:chord"]
+        lp_htp = inputs["data:geometry:horizontal_tail:MAC:at25percent:x:from_wingMAC25"]
+        l0_htp = inputs["data:geometry:horizontal_tail:MAC:length"]
+        x0_htp = inputs["data:geometry:horizontal_tail:MAC:at25percent:x:local"]
+        height_htp = inputs["data:geometry:horizontal_tail:z:from_wingMAC25"]
+
+        # Compute remaining inputs
+        x_wing = fa_length - x0_wing - 0.25 * l0_wing
+        z_wing = -(height_max - 0.12 * l2_wing) * 0.5
+        span2_wing = y4_wing - y2_wing
+        distance_htp = fa_length + lp_htp - 0.25 * l0_htp - x0_htp
+
+        # standard SCRIPT input file ---------------------------------------------------------------
+        parser = InputFileGenerator()
+        with path(local_resources, geometry + '.vspscript') as input_template_path:
+            parser.set_template_file(str(input_template_path))
+            parser.set_generated_file(script_file_path)
+            parser.mark_anchor("x_wing")
+            parser.transfer_var(float(x_wing), 0, 5)
+            parser.mark_anchor("z_wing")
+            parser.transfer_var(float(z_wing), 0, 5)
+            parser.mark_anchor("y1_wing")
+            parser.transfer_var(float(y1_wing), 0, 5)
+            for i in range(3):
+                parser.mark_anchor("l2_wing")
+                parser.transfer_var(float(l2_wing), 0, 5)
+            parser.reset_anchor()
+            parser.mark_anchor("span2_wing")
+            parser.transfer_var(float(span2_wing), 0, 5)
+            parser.mark_anchor("l4_wing")
+            parser.transfer_var(float(l4_wing), 0, 5)
+            parser.mark_anchor("sweep_0_wing")
+            parser.transfer_var(float(sweep_0_wing), 0, 5)
+            parser.mark_anchor("airfoil_0_file")
+            parser.transfer_var(self._rewrite_path(airfoil_file_paths[0]), 0, 3)
+            parser.mark_anchor("airfoil_1_file")
+            parser.transfer_var(self._rewrite_path(airfoil_file_paths[0]), 0, 3)
+            parser.mark_anchor("airfoil_2_file")
+            parser.transfer_var(self._rewrite_path(airfoil_file_paths[0]), 0, 3)
+            if geometry == WING_HTP_GEOMETRY:
+                parser.mark_anchor("distance_htp")
+                parser.transfer_var(float(distance_htp), 0, 5)
+                parser.mark_anchor("height_htp")
+                parser.transfer_var(float(height_htp), 0, 5)
+                parser.mark_anchor("span_htp")
+                parser.transfer_var(float(span_htp), 0, 5)
+                parser.mark_anchor("root_chord_htp")
+                parser.transfer_var(float(root_chord_htp), 0, 5)
+                parser.mark_anchor("tip_chord_htp")
+                parser.transfer_var(float(tip_chord_htp), 0, 5)
+                parser.mark_anchor("sweep_25_htp")
+                parser.transfer_var(float(sweep_25_htp), 0, 5)
+                parser.mark_anchor("airfoil_3_file")
+                parser.transfer_var(self._rewrite_path(airfoil_file_paths[1]), 0, 3)
+                parser.mark_anchor("airfoil_4_file")
+                parser.transfer_var(self._rewrite_path(airfoil_file_paths[1]), 0, 3)
+            parser.mark_anchor("csv_file")
+            parser.transfer_var(self._rewrite_path(csv_file_path), 0, 3)
+            parser.generate()
+
+    @staticmethod
+    def _read_polar_file(tmp_result_file_path: str):
+        """
+        Collect data from .polar file
+        """
+
+        with open(tmp_result_file_path, 'r') as hf:
+            line = hf.readlines()
+            # Cl
+            cl = float(line[1][40:50].replace(' ', ''))
+            # Cdi
+            cdi = float(line[1][60:70].replace(' ', ''))
+            # Oswald
+            oswald = float(line[1][100:110].replace(' ', ''))
+            # Cm
+            cm = float(line[1][150:160].replace(' ', ''))
+
+        return cl, cdi, oswald, cm
+
+    @staticmethod
+    def _read_lod_file(tmp_result_file_path: str):
+        """
+        Collect data from .lod file: wing CL/CM, wing lift curve and horizontal tail CL/CM (0.0 if no tail)
+        """
+        cl_wing = 0.0
+        cm_wing = 0.0
+        y_vector = []
+        cl_vector = []
+        cl_htp = 0.0
+        cm_htp = 0.0
+        with open(tmp_result_file_path, 'r') as lf:
+            data = lf.readlines()
+            for i in range(len(data)):
+                line = data[i].split()
+                line.append('**')  # avoid void line error
+                if line[0] == '1':
+                    y_vector.append(float(line[2]))
+                    cl_vector.append(float(line[5]))
+                if line[0] == 'Comp':
+                    # Totals of wing left/right parts, then of htp left/right parts (if any) follow the header
+                    components = []
+                    for component_line in data[i + 1:]:
+                        if not (component_line.split()[0:1] and component_line.split()[0].isdigit()):
+                            break
+                        components.append(component_line.split())
+                    cl_wing = float(components[0][5]) + float(components[1][5])  # sum CL left/right
+                    cm_wing = float(components[0][12]) + float(components[1][12])  # sum CM left/right
+                    if len(components) >= 4:
+                        cl_htp = float(components[2][5]) + float(components[3][5])  # sum CL left/right
+                        cm_htp = float(components[2][12]) + float(components[3][12])  # sum CM left/right
+                    break
+
+        return cl_wing, cm_wing, np.array(y_vector), np.array(cl_vector), cl_htp, cm_htp
+
+    @staticmethod
+    def _create_tmp_directory() -> TemporaryDirectory:
+
+        """Provide temporary directory for calculation."""
+
+        for tmp_base_path in [None, pth.join(str(Path.home()), ".fast")]:
+            if tmp_base_path is not None:
+                os.makedirs(tmp_base_path, exist_ok=True)
+            tmp_directory = tempfile.TemporaryDirectory(prefix="x", dir=tmp_base_path)
+            break
+
+        return tmp_directory
+
+    @staticmethod
+    def _rewrite_path(file_path: str) -> str:
+        file_path = '\"' + file_path.replace('\\', '\\\\') + '\"'
+        return file_path
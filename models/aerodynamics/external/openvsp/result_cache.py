@@ -0,0 +1,209 @@
+"""
+Persistent cache of OpenVSP results
+"""
+#  This file is part of FAST : A framework for rapid Overall Aircraft Design
+#  Copyright (C) 2020  ONERA & ISAE-SUPAERO
+#  FAST is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import os.path as pth
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_CACHE_SIZE = 10000
+RESULT_CACHE_FILE_NAME = "openvsp_results.sqlite"
+
+# Time (in s) a process waits for the database lock held by another one
+_LOCK_TIMEOUT = 60.0
+
+# Absolute values below this one are considered as zero for tolerance grid
+_ZERO_THRESHOLD = 1e-12
+
+_CREATE_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS results (
+        geometry_hash TEXT PRIMARY KEY,
+        cell_hash TEXT NOT NULL,
+        geometry TEXT NOT NULL,
+        results TEXT NOT NULL,
+        last_access REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS results_cell ON results (cell_hash)",
+    "CREATE INDEX IF NOT EXISTS results_access ON results (last_access)",
+]
+
+
+class OpenVSPResultCache:
+    """
+    Persistent store of OpenVSP results, in a SQLite database that can be shared by several processes.
+
+    Results are keyed on a hash of the geometry set (Mach number included). Lookup of an identical set is a single
+    indexed query. When tolerance is not zero, a stored set also matches if each of its values is within tolerance
+    (relative to the looked up value): to keep lookup independent of cache size, stored sets are indexed by their
+    cell in a logarithmic grid which step is twice the tolerance, so only the cell of the looked up set and the
+    closest neighbour cell of each value (2 ** len(geometry_set) cells) are queried.
+    The grid depends on tolerance, so results stored with another tolerance are only found by exact match.
+    The least recently used results are dropped when the cache exceeds max_size entries.
+    """
+
+    def __init__(self, file_path: str, max_size: int = DEFAULT_CACHE_SIZE, tolerance: float = 0.0):
+        if not 0.0 <= tolerance < 1.0:
+            raise ValueError("Tolerance of OpenVSP result cache should be in [0, 1[, got %s" % tolerance)
+
+        self.file_path = file_path
+        self.max_size = max_size
+        self.tolerance = tolerance
+        self.hits = 0
+        self.misses = 0
+
+        if pth.dirname(file_path):
+            os.makedirs(pth.dirname(file_path), exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            for statement in _CREATE_STATEMENTS:
+                connection.execute(statement)
+
+    def get(self, geometry_set: Sequence[float]) -> Optional[Dict[str, Any]]:
+        """
+        :return: the stored results (arrays as lists) of the closest matching geometry set, or None if not available
+        """
+        geometry_set = self._to_floats(geometry_set)
+        geometry_hash = self._hash(geometry_set)
+
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute(
+                "SELECT geometry_hash, results FROM results WHERE geometry_hash=?", (geometry_hash,)
+            ).fetchone()
+
+            if row is None and self.tolerance > 0.0:
+                cell_hashes = self._get_candidate_cell_hashes(geometry_set)
+                rows = connection.execute(
+                    "SELECT geometry_hash, results, geometry FROM results WHERE cell_hash IN (%s)"
+                    % ", ".join("?" * len(cell_hashes)),
+                    cell_hashes,
+                ).fetchall()
+                distances = [self._get_distance(json.loads(candidate[2]), geometry_set) for candidate in rows]
+                matching = [
+                    (distance, candidate) for distance, candidate in zip(distances, rows)
+                    if distance <= self.tolerance
+                ]
+                if matching:
+                    row = min(matching, key=lambda item: item[0])[1]
+
+            if row is not None:
+                connection.execute("UPDATE results SET last_access=? WHERE geometry_hash=?", (time.time(), row[0]))
+                self.hits += 1
+                return json.loads(row[1])
+
+        self.misses += 1
+        return None
+
+    def put(self, geometry_set: Sequence[float], results: Dict[str, Any]):
+        """
+        Stores results (floats or arrays) of geometry set, the least recently used ones being dropped if the cache
+        is full.
+        """
+        geometry_set = self._to_floats(geometry_set)
+        serialized_results = json.dumps({name: np.asarray(value).tolist() for name, value in results.items()})
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (
+                    self._hash(geometry_set),
+                    self._hash(self._get_cells(geometry_set)[0]),
+                    json.dumps(geometry_set),
+                    serialized_results,
+                    time.time(),
+                ),
+            )
+            excess = connection.execute("SELECT COUNT(*) FROM results").fetchone()[0] - max(self.max_size, 0)
+            if excess > 0:
+                connection.execute(
+                    "DELETE FROM results WHERE rowid IN "
+                    "(SELECT rowid FROM results ORDER BY last_access LIMIT ?)",
+                    (excess,),
+                )
+
+    def clear(self):
+        """ Removes all stored results and resets hit/miss counters """
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM results")
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with closing(self._connect()) as connection:
+            return connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _connect(self) -> sqlite3.Connection:
+        # Transactions are explicitly opened (BEGIN IMMEDIATE) for writes, SQLite locking the database file
+        return sqlite3.connect(self.file_path, timeout=_LOCK_TIMEOUT)
+
+    @staticmethod
+    def _to_floats(geometry_set: Sequence[float]) -> List[float]:
+        return [float(value) for value in np.asarray(geometry_set).ravel()]
+
+    @staticmethod
+    def _hash(values) -> str:
+        # repr() of floats is exact, so identical sets, and only them, have the same hash
+        return hashlib.sha1(repr(list(values)).encode()).hexdigest()
+
+    def _get_cells(self, geometry_set: List[float]) -> List[tuple]:
+        """
+        :return: for each value, its own cell and the closest neighbour one (or only its own cell if value is zero
+                 or tolerance is zero)
+        """
+        if self.tolerance == 0.0:
+            return [tuple(geometry_set)]
+
+        # A value within tolerance of x is at most -log(1 - tolerance) from x in log scale, i.e. half a cell
+        cell_width = -2.0 * math.log(1.0 - self.tolerance)
+        own_cells = []
+        neighbour_cells = []
+        for value in geometry_set:
+            if abs(value) < _ZERO_THRESHOLD:
+                own_cells.append((0, 0))
+                neighbour_cells.append((0, 0))
+                continue
+            sign = 1 if value > 0.0 else -1
+            position = math.log(abs(value)) / cell_width
+            index = math.floor(position)
+            own_cells.append((sign, index))
+            neighbour_cells.append((sign, index - 1 if position - index < 0.5 else index + 1))
+
+        return [tuple(own_cells), tuple(neighbour_cells)]
+
+    def _get_candidate_cell_hashes(self, geometry_set: List[float]) -> List[str]:
+        own_cells, neighbour_cells = self._get_cells(geometry_set)
+        choices = [sorted({own, neighbour}) for own, neighbour in zip(own_cells, neighbour_cells)]
+        return [self._hash(cells) for cells in itertools.product(*choices)]
+
+    @staticmethod
+    def _get_distance(stored_set: List[float], geometry_set: List[float]) -> float:
+        """ Largest difference between values of both sets, relative to geometry_set values """
+        if len(stored_set) != len(geometry_set):
+            return math.inf
+        distance = 0.0
+        for stored_value, value in zip(stored_set, geometry_set):
+            if stored_value != value:
+                distance = max(distance, abs(stored_value - value) / abs(value) if value != 0.0 else math.inf)
+        return distance
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Stand-in for vspscript and vspaero executables, that writes the files read by FAST OpenVSP components.
+
+Run as "vspscript -script <file>.vspscript", it writes a degenerate geometry file at the path given in the script,
+that only tells if the horizontal tail is defined.
+Run as "vspaero <case>", it writes <case>.lod and <case>.polar files from the angles of attack and Mach numbers of
+<case>.vspaero (one result block per combination), with linear lift and moment models.
+
+Each run lasts RUN_DURATION seconds and appends its start/end times to RUN_LOG_FILE_NAME, in the folder of the
+executable, so that concurrency of runs can be checked.
+"""
+#  This file is part of FAST : A framework for rapid Overall Aircraft Design
+#  Copyright (C) 2020  ONERA & ISAE-SUPAERO
+#  FAST is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import math
+import os.path as pth
+import re
+import sys
+import time
+
+RUN_DURATION = 0.2
+RUN_LOG_FILE_NAME = "runs.log"
+
+WING_CL_ALPHA = 4.5  # per radian, incompressible
+WING_CL0 = 0.1
+HTP_CL_ALPHA = 0.6  # per radian, incompressible
+SPAN_POINT_COUNT = 20
+
+
+def _run_vspscript(script_path):
+    with open(script_path) as script_file:
+        script = script_file.read()
+    csv_path = re.search(r'SetComputationFileName\(\s*\w+\s*,\s*"(.*)"\s*\)', script).group(1)
+    with open(csv_path.replace("\\\\", "\\"), "w") as csv_file:
+        csv_file.write("htp\n" if "hid" in script else "wing\n")
+
+
+def _read_values(text, name):
+    values = re.search(r"^%s\s*=\s*(.*)$" % name, text, re.M).group(1)
+    return [float(value) for value in values.split(",")]
+
+
+def _run_vspaero(case_path):
+    with open(case_path + ".vspaero") as case_file:
+        case = case_file.read()
+    with open(case_path + ".csv") as csv_file:
+        with_htp = csv_file.read().strip() == "htp"
+
+    lod_lines = []
+    polar_lines = ["Beta Mach AoA Re/1e6 CLo CLi CLtot CDo CDi CDtot CDt CDtot_t CSo CSi CStot L/D E CMx\n"]
+    # One result block (.lod) and one line (.polar) per case, angle of attack varying first
+    for mach in _read_values(case, "Mach"):
+        for aoa in _read_values(case, "AoA"):
+            alpha = math.radians(aoa)
+            beta = math.sqrt(1.0 - mach ** 2)
+            cl_wing = (WING_CL0 + WING_CL_ALPHA * alpha) / beta
+            cm_wing = -0.05 - 0.1 * cl_wing
+            cl_htp = HTP_CL_ALPHA * alpha / beta if with_htp else 0.0
+            cm_htp = -0.5 * cl_htp
+
+            # Components totals (left and right parts) are after "Comp" line, CL in 6th column and CM in 13th
+            # column
+            lod_lines.append("Wing   Xavg   Yavg   Zavg   Chord   V/Vref   Cl   Cd   Cs   Cx   Cy   Cz\n")
+            for idx in range(SPAN_POINT_COUNT):
+                y = 0.2 + 0.25 * idx
+                lod_lines.append("1 0 %.5f 0.0 1.5 %.5f 0.01\n" % (y, cl_wing * (1.0 - (idx / SPAN_POINT_COUNT) ** 2)))
+            lod_lines.append("\nComp Name Mach AoA Beta CL CDi CS CFx CFy CFz Cmx Cmy Cmz\n")
+            components = [(cl_wing, cm_wing)] * 2 + ([(cl_htp, cm_htp)] * 2 if with_htp else [])
+            for idx, (cl, cm) in enumerate(components):
+                lod_lines.append(
+                    "%i Surf %.5f %.5f 0.0 %.5f 0.001 0.0 0.0 0.0 0.0 0.0 %.5f 0.0\n"
+                    % (idx + 1, mach, aoa, cl / 2.0, cm / 2.0)
+                )
+            lod_lines.append("\n")
+
+            # Lines of polar file have fixed width columns: CL at [40:50], CDi at [60:70], Oswald at [100:110] and
+            # CM at [150:160]
+            oswald = 0.85 if with_htp else 0.8
+            values = [0.0] * 16
+            values[1], values[2], values[4], values[6], values[10], values[15] = \
+                mach, aoa, cl_wing, 0.01, oswald, cm_wing
+            polar_lines.append("".join("%10.5f" % value for value in values) + "\n")
+
+    with open(case_path + ".lod", "w") as lod_file:
+        lod_file.writelines(lod_lines)
+    with open(case_path + ".polar", "w") as polar_file:
+        polar_file.writelines(polar_lines)
+
+
+def main(arguments):
+    start = time.time()
+    if arguments[0] == "-script":
+        _run_vspscript(arguments[1])
+    else:
+        _run_vspaero(arguments[0])
+    time.sleep(RUN_DURATION)
+    with open(pth.join(pth.dirname(pth.abspath(__file__)), RUN_LOG_FILE_NAME), "a") as log_file:
+        log_file.write("%s %f %f\n" % (pth.basename(arguments[-1]), start, time.time()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
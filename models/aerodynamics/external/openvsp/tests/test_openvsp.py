@@ -0,0 +1,48 @@
+"""
+Test module for OpenVSP tools
+"""
+#  This file is part of FAST : A framework for rapid Overall Aircraft Design
+#  Copyright (C) 2020  ONERA & ISAE-SUPAERO
+#  FAST is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os.path as pth
+import subprocess
+import sys
+import time
+
+from ..case_runner import write_case_runner, get_cases_command, run_cases, RUNNER_EXTENSION
+
+
+def test_case_runner(tmpdir):
+    """ Tests runner scripts are run concurrently, within concurrency limit, and failures are reported """
+
+    runner_paths = [
+        write_case_runner(
+            pth.join(str(tmpdir), "case_%i" % idx), sys.executable, ["-c", "import time; time.sleep(0.3)"]
+        )
+        for idx in range(4)
+    ]
+    assert all(runner_path.endswith(RUNNER_EXTENSION) for runner_path in runner_paths)
+
+    start = time.time()
+    assert run_cases(runner_paths) == 0
+    assert time.time() - start < 1.0
+
+    start = time.time()
+    assert run_cases(runner_paths, max_workers=2) == 0
+    assert time.time() - start >= 0.6
+
+    # Failure of one case is reported by the command given to the external code component
+    runner_paths.append(
+        write_case_runner(pth.join(str(tmpdir), "failing_case"), sys.executable, ["-c", "import sys; sys.exit(3)"])
+    )
+    assert subprocess.call(get_cases_command(runner_paths, max_workers=2), stderr=subprocess.DEVNULL) == 3
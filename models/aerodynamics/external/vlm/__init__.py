@@ -14,4 +14,6 @@
 from .compute_oswald import ComputeOSWALDvlm
 from .compute_wing_cl_alpha import ComputeWingCLALPHAvlm
 from .compute_ht_cl_alpha import ComputeHTPCLALPHAvlm
-from .compute_ht_cl_cm import ComputeHTPCLCMvlm
\ No newline at end of file
+from .compute_ht_cl_cm import ComputeHTPCLCMvlm
+from .vlm import VLM
+from .cache import VLMCache, VLM_CACHE
@@ -0,0 +1,92 @@
+"""
+    Process-wide cache of VLM geometry solutions
+"""
+#  This file is part of FAST : A framework for rapid Overall Aircraft Design
+#  Copyright (C) 2020  ONERA & ISAE-SUPAERO
+#  FAST is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+
+DEFAULT_CACHE_SIZE = 16
+
+
+class VLMCache:
+    """
+    Bounded LRU store of VLM results (meshes, factorized AIC matrices...) shared by all the VLM components of the
+    process.
+
+    Entries are keyed on a hash of the geometry values, the mesh settings and the airfoil files, see :meth:`get_key`.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(*values) -> str:
+        """
+        Hashes provided values (numbers, arrays or strings) into a cache key.
+        """
+        sha = hashlib.sha1()
+        for value in values:
+            if isinstance(value, str):
+                sha.update(value.encode())
+            elif value is None:
+                sha.update(b"None")
+            else:
+                sha.update(np.asarray(value, dtype=float).tobytes())
+            sha.update(b"|")
+
+        return sha.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        :return: the stored entry (marked as most recently used) or None if key is unknown
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, entry: Any):
+        """
+        Stores entry, the least recently used one being dropped if the cache is full.
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(self.max_size, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """ Removes all entries and resets hit/miss counters """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+VLM_CACHE = VLMCache()
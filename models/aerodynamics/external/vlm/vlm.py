@@ -15,17 +15,61 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import inspect
+import logging
 import math
 import numpy as np
 import copy
 import openmdao.api as om
-from typing import Tuple, List, Union, Optional
+from scipy.linalg import lu_factor, lu_solve
+from scipy.sparse.linalg import LinearOperator, gmres
+from typing import Callable, Dict, Tuple, List, Union, Optional
 
 from ....geometry.profiles.get_profile import get_profile
+from .cache import VLMCache, VLM_CACHE
 
 DEFAULT_NX = 19
 DEFAULT_NY1 = 3
 DEFAULT_NY2 = 14
+DEFAULT_AUTO_MESH_TOLERANCE = 0.01
+DEFAULT_GMRES_TOLERANCE = 1e-10
+
+# Mesh refinement factors (applied to nx/ny1/ny2 options) successively tried in auto mesh mode
+_AUTO_MESH_FACTORS = [0.5, 0.75, 1.0, 1.5, 2.0]
+_AUTO_MESH_AOAList = [0.0, 7.0]
+_LOGGER = logging.getLogger(__name__)
+
+# Maximum number of control points per influence block computed on the fly by the GMRES solver (blocks are made of
+# whole chordwise strips, also used as block-Jacobi preconditioner)
+_GMRES_BLOCK_SIZE = 256
+_GMRES_RESTART = 50
+# Relative tolerance keyword of gmres ('tol' is deprecated since SciPy 1.12 and removed later)
+_GMRES_RTOL_KEYWORD = "rtol" if "rtol" in inspect.signature(gmres).parameters else "tol"
+
+# Inputs defining the VLM meshes, AIC matrices and flapped panels: used as cache key
+_MESH_INPUTS = [
+    "data:geometry:wing:kink:span_ratio",
+    "data:geometry:wing:span",
+    "data:geometry:wing:root:y",
+    "data:geometry:wing:root:chord",
+    "data:geometry:wing:tip:chord",
+    "data:geometry:flap:span_ratio",
+    "data:geometry:horizontal_tail:span",
+    "data:geometry:horizontal_tail:root:chord",
+    "data:geometry:horizontal_tail:tip:chord",
+    "data:geometry:fuselage:maximum_width",
+]
+# Planform inputs of the batch evaluation (see VLM.compute_wing_batch)
+_BATCH_INPUTS = [name for name in _MESH_INPUTS if "horizontal_tail" not in name] + [
+    "data:geometry:wing:aspect_ratio", "data:geometry:wing:MAC:length"
+]
+# Maximum number of designs whose AIC matrices are stacked and solved at once in batch evaluation
+_BATCH_SIZE = 64
+# Surface entries modified by compute_wing/compute_htp (copied when read from cache), the unit solutions stored
+# in 'basis' being shared
+_MUTABLE_ENTRIES = ['panel_angle', 'panel_angle_vect', 'z', 'gamma_offset']
+# Meshes chosen in auto mode, stored per geometry class
+_AUTO_MESH_CACHE = VLMCache(max_size=64)
 
 
 class VLM(om.ExplicitComponent):
@@ -33,6 +77,24 @@ class VLM(om.ExplicitComponent):
     def initialize(self):
         self.options.declare('wing_airfoil_file', default="naca23012.af", types=str, allow_none=True)
         self.options.declare('htp_airfoil_file', default="naca0012.af", types=str, allow_none=True)
+        self.options.declare('nx', default=DEFAULT_NX, types=int, desc="number of chordwise panels")
+        self.options.declare('ny1', default=DEFAULT_NY1, types=int, desc="number of spanwise panels (straight part)")
+        self.options.declare('ny2', default=DEFAULT_NY2, types=int, desc="number of spanwise panels (tapered part)")
+        self.options.declare('chordwise_spacing', default='uniform', values=['uniform', 'cosine'])
+        self.options.declare('spanwise_spacing', default='uniform', values=['uniform', 'cosine'])
+        self.options.declare('induced_drag_method', default='near_field', values=['near_field', 'trefftz'],
+                             desc="induced angle from the full wake influence matrix at the control points or from "
+                                  "spanwise circulation in the Trefftz plane")
+        self.options.declare('auto_mesh', default=False, types=bool,
+                             desc="if True, nx/ny1/ny2 are refined until results converge")
+        self.options.declare('auto_mesh_tolerance', default=DEFAULT_AUTO_MESH_TOLERANCE, types=float,
+                             desc="relative variation of CL_alpha and Oswald coefficient for auto mesh convergence")
+        self.options.declare('solver', default='direct', values=['direct', 'gmres'],
+                             desc="'direct' assembles and LU-factorizes the AIC matrix, 'gmres' solves the system "
+                                  "iteratively with influence coefficients computed block-wise on the fly (for "
+                                  "large meshes)")
+        self.options.declare('gmres_tolerance', default=DEFAULT_GMRES_TOLERANCE, types=float,
+                             desc="relative residual tolerance of the GMRES solver")
 
     def setup(self):
 
@@ -52,46 +114,160 @@ class VLM(om.ExplicitComponent):
 
     def _run(self, inputs):
 
+        if self.options['auto_mesh']:
+            nx, ny1, ny2 = self._get_auto_mesh(inputs)
+        else:
+            nx, ny1, ny2 = self.options['nx'], self.options['ny1'], self.options['ny2']
+        self._set_mesh_size(inputs, nx, ny1, ny2)
+        self._generate_surfaces(inputs)
+
+    def _set_mesh_size(self, inputs, nx: int, ny1: int, ny2: int):
+        """Defines mesh size from the panel numbers of the straight (ny1) and tapered (ny2) wing parts"""
+
         wing_break = float(inputs["data:geometry:wing:kink:span_ratio"])
 
-        # Define mesh size        
-        self.nx = int(DEFAULT_NX)
+        # Define mesh size
+        self.nx = int(nx)
         if wing_break > 0.0:
-            self.ny1 = int(DEFAULT_NY1 + 5)  # n° of panels in the straight section of the wing
-            self.ny2 = int((DEFAULT_NY2 - 5)/2)  # n° of panels in in the flapped portion of the wing
+            self.ny1 = int(ny1 + 5)  # n° of panels in the straight section of the wing
+            self.ny2 = max(int((ny2 - 5)/2), 1)  # n° of panels in in the flapped portion of the wing
         else:
-            self.ny1 = int(DEFAULT_NY1)  # n° of panels in the straight section of the wing
-            self.ny2 = int(DEFAULT_NY2/2)  # n° of panels in in the flapped portion of the wing
+            self.ny1 = int(ny1)  # n° of panels in the straight section of the wing
+            self.ny2 = max(int(ny2/2), 1)  # n° of panels in in the flapped portion of the wing
         self.ny3 = self.ny2  # n° of panels in the un-flapped exterior portion of the wing
 
         self.ny = int(self.ny1 + self.ny2 + self.ny3)
-        # Define elements
-        self.WING = {'x_panel': np.zeros((self.nx + 1, 2 * self.ny + 1)),
-                     'y_panel': np.zeros(2 * self.ny + 1),
-                     'z': np.zeros(self.nx + 1),
-                     'x_LE': np.zeros(2 * self.ny + 1),
-                     'chord': np.zeros(2 * self.ny + 1),
-                     'panel_span': np.zeros(2 * self.ny),
-                     'panel_chord': np.zeros(self.nx * self.ny),
-                     'panel_surf': np.zeros(self.nx * self.ny),
-                     'xc': np.zeros(self.nx * 2 * self.ny),
-                     'yc': np.zeros(self.nx * 2 * self.ny),
-                     'x1': np.zeros(self.nx * 2 * self.ny),
-                     'x2': np.zeros(self.nx * 2 * self.ny),
-                     'y1': np.zeros(self.nx * 2 * self.ny),
-                     'y2': np.zeros(self.nx * 2 * self.ny),
-                     'panel_angle': np.zeros(self.nx),
-                     'panel_angle_vect': np.zeros(self.nx * self.ny),
-                     'AIC': np.zeros((self.nx * self.ny, self.nx * self.ny)),
-                     'AIC_wake': np.zeros((self.nx * self.ny, self.nx * self.ny))}
-        # Duplicate for HTP
-        self.HTP = copy.deepcopy(self.WING)
-
-        # Generate WING
-        self._generate_wing(inputs)
-
-        # Generate HTP
-        self._generate_htp(inputs)
+
+    def _get_auto_mesh(self, inputs) -> Tuple[int, int, int]:
+        """
+        Refines the mesh, starting from half the nx/ny1/ny2 options, until the wing CL_alpha and Oswald coefficient
+        change by less than the auto_mesh_tolerance option from previous mesh, and returns the refined (nx, ny1, ny2).
+
+        The chosen mesh is stored per geometry class (rounded planform ratios) so that refinement is done once. Trial
+        meshes are not stored in VLM cache, only the chosen one is.
+        """
+
+        semi_span = inputs['data:geometry:wing:span'] / 2.0
+        geometry_class = VLM_CACHE.get_key(
+            np.round(inputs['data:geometry:wing:aspect_ratio'], 1),
+            np.round(inputs['data:geometry:wing:tip:chord'] / inputs['data:geometry:wing:root:chord'], 2),
+            np.round(inputs['data:geometry:wing:root:y'] / semi_span, 2),
+            np.round(inputs['data:geometry:wing:kink:span_ratio'], 2),
+            np.round(inputs['data:geometry:flap:span_ratio'], 2),
+            self.options['nx'], self.options['ny1'], self.options['ny2'],
+            self.options['chordwise_spacing'], self.options['spanwise_spacing'],
+            self.options['induced_drag_method'], self.options['solver'], self.options['gmres_tolerance'],
+            self.options['auto_mesh_tolerance'], self.options['wing_airfoil_file'],
+        )
+        mesh = _AUTO_MESH_CACHE.get(geometry_class)
+        if mesh is not None:
+            return mesh
+
+        tolerance = self.options['auto_mesh_tolerance']
+        previous_mesh = None
+        previous_result = None
+        for factor in _AUTO_MESH_FACTORS:
+            mesh = (
+                max(int(round(self.options['nx'] * factor)), 2),
+                max(int(round(self.options['ny1'] * factor)), 1),
+                max(int(round(self.options['ny2'] * factor)), 2),
+            )
+            if mesh == previous_mesh:
+                continue
+            self._set_mesh_size(inputs, *mesh)
+            surfaces = self._generate_surfaces(inputs, store=False)
+            cl, _, oswald, _ = self.compute_wing(inputs, _AUTO_MESH_AOAList, 1.0)
+            result = np.array([cl[1] - cl[0], oswald[1]], dtype=float)
+            if previous_result is not None and np.all(np.abs(result - previous_result) <= tolerance*np.abs(result)):
+                break
+            previous_mesh = mesh
+            previous_result = result
+        else:
+            _LOGGER.warning("VLM mesh did not converge within %s, finest mesh %s is used", tolerance, mesh)
+        VLM_CACHE.put(self._get_surfaces_key(inputs), surfaces)
+        _AUTO_MESH_CACHE.put(geometry_class, mesh)
+
+        return mesh
+
+    def _get_surfaces_key(self, inputs) -> str:
+        """VLM cache key of the wing and htp surfaces for current mesh size"""
+
+        return VLM_CACHE.get_key(
+            *[inputs[name] for name in _MESH_INPUTS],
+            self.nx, self.ny1, self.ny2, self.ny3,
+            self.options['chordwise_spacing'], self.options['spanwise_spacing'],
+            self.options['induced_drag_method'], self.options['solver'], self.options['gmres_tolerance'],
+            self.options['wing_airfoil_file'], self.options['htp_airfoil_file'],
+        )
+
+    def _generate_surfaces(self, inputs, store: bool = True) -> tuple:
+        """
+        Generates wing and htp meshes and AIC matrices (or gets them from cache)
+
+        :param inputs: inputs parameters for the explicit component
+        :param store: if False, generated surfaces are not stored in VLM cache
+        :return: the (wing, htp) surfaces shared through VLM cache
+        """
+
+        # Meshes, factorized AIC matrices and unit solutions are shared between all VLM components for the same geometry
+        key = self._get_surfaces_key(inputs)
+        cached_surfaces = VLM_CACHE.get(key)
+        if cached_surfaces is None:
+            # Define elements
+            self.WING = self._get_empty_surface()
+            # Duplicate for HTP
+            self.HTP = copy.deepcopy(self.WING)
+
+            # Generate WING
+            self._generate_wing(inputs)
+
+            # Generate HTP
+            self._generate_htp(inputs)
+
+            # Compute and factorize AIC matrices (or preconditioner blocks) once for all
+            for surface in [self.WING, self.HTP]:
+                self._generate_influence(surface)
+                surface['AIC_lu'] = self._factorize(surface)
+            cached_surfaces = (self.WING, self.HTP)
+            if store:
+                VLM_CACHE.put(key, cached_surfaces)
+
+        self.WING, self.HTP = [
+            {name: (value.copy() if name in _MUTABLE_ENTRIES else value) for name, value in surface.items()}
+            for surface in cached_surfaces
+        ]
+
+        return cached_surfaces
+
+    def _get_empty_surface(self) -> dict:
+        """Surface (wing or htp) dictionary with zero arrays sized for current mesh"""
+
+        return {'x_panel': np.zeros((self.nx + 1, 2 * self.ny + 1)),
+                'y_panel': np.zeros(2 * self.ny + 1),
+                'z': np.zeros(self.nx + 1),
+                'x_LE': np.zeros(2 * self.ny + 1),
+                'chord': np.zeros(2 * self.ny + 1),
+                'panel_span': np.zeros(2 * self.ny),
+                'panel_chord': np.zeros(self.nx * self.ny),
+                'panel_surf': np.zeros(self.nx * self.ny),
+                'xc': np.zeros(self.nx * 2 * self.ny),
+                'yc': np.zeros(self.nx * 2 * self.ny),
+                'x1': np.zeros(self.nx * 2 * self.ny),
+                'x2': np.zeros(self.nx * 2 * self.ny),
+                'y1': np.zeros(self.nx * 2 * self.ny),
+                'y2': np.zeros(self.nx * 2 * self.ny),
+                'panel_angle': np.zeros(self.nx),
+                'panel_angle_vect': np.zeros(self.nx * self.ny),
+                'flap_hinge': 0.0,
+                'flapped_chord': np.zeros(self.nx + 1, dtype=bool),
+                'flapped_span': np.zeros(self.ny),
+                'deflection_vects': None,
+                'AIC': None,
+                'AIC_wake': None,
+                'trefftz': np.zeros((self.ny, self.ny)),
+                'AIC_lu': None,
+                'basis': {},
+                'gamma_offset': np.zeros(self.nx * self.ny)}
 
     def _generate_wing(self, inputs):
         """Generates the coordinates for VLM calculations and AIC matrix of the wing"""
@@ -107,18 +283,21 @@ class VLM(om.ExplicitComponent):
         chord = self.WING['chord']
         x_LE = self.WING['x_LE']
         y_endflaps = y2_wing + flap_span_ratio * (semi_span - y2_wing)
+        spacing = self.options['spanwise_spacing']
         # Definition of x_panel, y_panel, x_LE and chord (Right side)
         for j in range(self.ny+1):
             if j < self.ny1:
-                y_panel[j] = y2_wing * j/self.ny1
+                y_panel[j] = self._get_panel_border(0.0, y2_wing, j, self.ny1, spacing)
                 chord[j] = root_chord
             elif (j >= self.ny1) and (j < (self.ny1+self.ny2)):
-                y_panel[j] = y2_wing + (y_endflaps - y2_wing) * (j-self.ny1)/self.ny2
+                y_panel[j] = self._get_panel_border(y2_wing, y_endflaps - y2_wing, j-self.ny1, self.ny2, spacing)
                 y_tapered_section = (y_panel[j] - y2_wing)
                 chord[j] = root_chord + (tip_chord-root_chord)*y_tapered_section/(semi_span-y2_wing)
                 x_LE[j] = y_tapered_section * (root_chord-tip_chord)/(4*(semi_span-y2_wing))
             else:
-                y_panel[j] = y_endflaps + (semi_span - y_endflaps) * (j-(self.ny1+self.ny2))/self.ny3
+                y_panel[j] = self._get_panel_border(
+                    y_endflaps, semi_span - y_endflaps, j-(self.ny1+self.ny2), self.ny3, spacing
+                )
                 y_tapered_section = (y_panel[j] - y2_wing)
                 chord[j] = root_chord + (tip_chord-root_chord)*y_tapered_section/(semi_span-y2_wing)
                 x_LE[j] = y_tapered_section * (root_chord-tip_chord)/(4*(semi_span-y2_wing))
@@ -133,6 +312,15 @@ class VLM(om.ExplicitComponent):
         self.WING['x_LE'] = x_LE
         # Launch common code
         self._generate_common(self.WING)
+        # Flapped panels masks: chordwise panel borders behind the hinge, spanwise panels out of fuselage and up to
+        # flaps end
+        x_start = float((1.0 - flap_span_ratio)*root_chord)
+        flapped_span = np.zeros(self.ny)
+        flapped_span[:self.ny1] = y_panel[:self.ny1] > inputs['data:geometry:fuselage:maximum_width']/2.0
+        flapped_span[self.ny1:self.ny1+self.ny2] = 1.0
+        self.WING['flap_hinge'] = x_start
+        self.WING['flapped_chord'] = self.WING['x_panel'][:, 0] > x_start
+        self.WING['flapped_span'] = flapped_span
 
     def _generate_htp(self, inputs):
         """Generates the coordinates for VLM calculations and AIC matrix of the htp"""
@@ -145,9 +333,10 @@ class VLM(om.ExplicitComponent):
         y_panel = self.HTP['y_panel']
         chord = self.HTP['chord']
         x_LE = self.HTP['x_LE']
+        spacing = self.options['spanwise_spacing']
         # Definition of x_panel, y_panel, x_LE and chord (Right side)
         for j in range(self.ny+1):
-            y_panel[j] = semi_span * j/self.ny
+            y_panel[j] = self._get_panel_border(0.0, semi_span, j, self.ny, spacing)
             chord[j] = root_chord + (tip_chord-root_chord)*y_panel[j]/semi_span
             x_LE[j] = y_panel[j] * (root_chord-tip_chord)/(4*semi_span)
         # Definition of Left side (symmetry)
@@ -179,12 +368,11 @@ class VLM(om.ExplicitComponent):
         y1 = dictionary['y1']
         x2 = dictionary['x2']
         y2 = dictionary['y2']
-        AIC = dictionary['AIC']
-        AIC_wake = dictionary['AIC_wake']
+        spacing = self.options['chordwise_spacing']
         # Calculate panel corners x-coordinate
         for i in range(self.nx+1):
             for j in range(2*self.ny+1):
-                x_panel[i, j] = x_LE[j] + chord[j] * i/self.nx
+                x_panel[i, j] = self._get_panel_border(x_LE[j], chord[j], i, self.nx, spacing)
         # Calculate panel span with symmetry
         for j in range(self.ny):
             panelspan[j] = y_panel[j+1] - y_panel[j]
@@ -221,42 +409,6 @@ class VLM(om.ExplicitComponent):
                     x2[self.nx*self.ny+(i*self.ny+j)] = x_panel[i, self.ny+j] \
                                                         + 0.25*(x_panel[i+1, self.ny+j] - x_panel[i, self.ny+j])
                     y2[self.nx*self.ny+(i*self.ny+j)] = y_panel[self.ny+j]
-        # Aerodynamic coefficients computation (Right side)
-        for i in range(self.nx*self.ny):
-            for j in range(self.nx*self.ny):
-                # Right wing
-                a = xc[i] - x1[j]
-                b = yc[i] - y1[j]
-                c = xc[i] - x2[j]
-                d = yc[i] - y2[j]
-                e = math.sqrt(a**2 + b**2)
-                f = math.sqrt(c**2 + d**2)
-                g = x2[j] - x1[j]
-                h = y2[j] - y1[j]
-                k = (g*a + h*b)/e - (g*c + h*d)/f
-                m = (1 + c/f)/d - (1 + a/e)/b
-                if a*d-b*c != 0:
-                    AIC[i, j] = (k/(a*d-b*c)) / (4*math.pi)
-                AIC_wake[i, j] = m / (4*math.pi)
-                AIC[i, j] = AIC[i, j] + m / (4*math.pi)
-        # Aerodynamic coefficients computation (Left side)
-        for i in range(self.nx*self.ny):
-            for j in range(self.nx*self.ny):
-                # Left wing
-                a = xc[i] - x1[self.nx*self.ny+j]
-                b = yc[i] - y1[self.nx*self.ny+j]
-                c = xc[i] - x2[self.nx*self.ny+j]
-                d = yc[i] - y2[self.nx*self.ny+j]
-                e = math.sqrt(a**2 + b**2)
-                f = math.sqrt(c**2 + d**2)
-                g = x2[self.nx*self.ny+j] - x1[self.nx*self.ny+j]
-                h = y2[self.nx*self.ny+j] - y1[self.nx*self.ny+j]
-                k = (g*a + h*b)/e - (g*c + h*d)/f
-                m = (1 + c/f)/d - (1 + a/e)/b
-                if a*d-b*c != 0:
-                    AIC[i, j] = AIC[i, j] + (k/(a*d-b*c)) / (4*math.pi)
-                AIC_wake[i, j] = AIC_wake[i, j] + m / (4*math.pi)
-                AIC[i, j] = AIC[i, j] + m / (4*math.pi)
         # Save data
         dictionary['x_panel'] = x_panel
         dictionary['panel_span'] = panelspan
@@ -268,8 +420,121 @@ class VLM(om.ExplicitComponent):
         dictionary['y1'] = y1
         dictionary['x2'] = x2
         dictionary['y2'] = y2
+
+    def _generate_influence(self, dictionary):
+        """
+        Aerodynamic coefficients computation (right side vortices and their left side images), AIC matrices being not
+        assembled for GMRES solver (computed block-wise on the fly instead)
+        """
+
+        n = self.nx * self.ny
+        xc, yc = dictionary['xc'][:n], dictionary['yc'][:n]
+        x1, y1 = dictionary['x1'][:n], dictionary['y1'][:n]
+        x2, y2 = dictionary['x2'][:n], dictionary['y2'][:n]
+        y_panel = dictionary['y_panel']
+        if self.options['solver'] == 'direct':
+            AIC, AIC_wake = self._compute_influence(
+                xc, yc, x1, y1, x2, y2, with_wake=self.options['induced_drag_method'] == 'near_field'
+            )
+        else:
+            AIC, AIC_wake = None, None
+        # Save data
         dictionary['AIC'] = AIC
         dictionary['AIC_wake'] = AIC_wake
+        dictionary['trefftz'] = self._compute_trefftz_influence(
+            yc[:self.ny], y_panel[:self.ny], y_panel[1:self.ny+1]
+        )
+        dictionary['AIC_lu'] = None
+
+    @staticmethod
+    def _get_panel_border(start, length, index: int, n_panels: int, spacing: str):
+        """
+        Position of a panel border along a segment divided in n_panels panels.
+
+        :param start: segment start position
+        :param length: segment length
+        :param index: border index (from 0 to n_panels)
+        :param n_panels: number of panels
+        :param spacing: 'uniform' or 'cosine' (refined at both ends)
+        """
+
+        if spacing == 'cosine':
+            return start + length * (1.0 - math.cos(math.pi * index / n_panels)) / 2.0
+
+        return start + length * index / n_panels
+
+    @staticmethod
+    def _compute_influence(xc, yc, x1, y1, x2, y2, with_wake: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the influence of the right side horseshoe vortices (bound segment from (x1, y1) to (x2, y2) and
+        trailing legs) on the control points (xc, yc), for all pairs at once. Coordinates may be stacked along leading
+        axes (one row per geometry) to get stacked matrices.
+
+        The aircraft being symmetric, the left side vortices are the images of the right side ones (bound segment
+        from (x2, -y2) to (x1, -y1)) and carry the same circulation: their contribution is folded into the same
+        kernel so that only the half-span system is assembled and solved.
+
+        :param with_wake: if False, AIC_wake is not computed (None)
+        :return: [AIC, AIC_wake] influence matrices with control points in rows and right side vortices in columns
+        """
+
+        # Right side vortices
+        a = xc[..., :, np.newaxis] - x1[..., np.newaxis, :]
+        b = yc[..., :, np.newaxis] - y1[..., np.newaxis, :]
+        c = xc[..., :, np.newaxis] - x2[..., np.newaxis, :]
+        d = yc[..., :, np.newaxis] - y2[..., np.newaxis, :]
+        g = (x2 - x1)[..., np.newaxis, :]
+        h = (y2 - y1)[..., np.newaxis, :]
+        bound, wake = VLM._horseshoe_kernel(a, b, c, d, g, h)
+        # Left side images: x-distances are swapped, y-distances are taken to mirrored points
+        b_image = yc[..., :, np.newaxis] - (-y2[..., np.newaxis, :])
+        d_image = yc[..., :, np.newaxis] - (-y1[..., np.newaxis, :])
+        bound_image, wake_image = VLM._horseshoe_kernel(c, b_image, a, d_image, -g, h)
+
+        AIC = bound + wake
+        AIC = AIC + bound_image
+        AIC = AIC + wake_image
+        AIC_wake = wake + wake_image if with_wake else None
+
+        return AIC, AIC_wake
+
+    @staticmethod
+    def _compute_trefftz_influence(yc, y1, y2) -> np.ndarray:
+        """
+        Computes the induced angle (divided by circulation and halved, as seen by the bound vortices) in the Trefftz
+        plane at the spanwise strips centers yc, due to the trailing vortices of the right side strips (shed at y1 and
+        y2) and of their left side images.
+
+        :return: influence matrix with strips centers in rows and right side strips in columns
+        """
+
+        b = yc[..., :, np.newaxis] - y1[..., np.newaxis, :]
+        d = yc[..., :, np.newaxis] - y2[..., np.newaxis, :]
+        b_image = yc[..., :, np.newaxis] - (-y2[..., np.newaxis, :])
+        d_image = yc[..., :, np.newaxis] - (-y1[..., np.newaxis, :])
+
+        return ((1/d - 1/b) + (1/d_image - 1/b_image)) / (4*math.pi)
+
+    @staticmethod
+    def _horseshoe_kernel(a, b, c, d, g, h) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Horseshoe vortex induced velocity (divided by circulation) from the distances between control points and
+        bound segment ends (a, b), (c, d) and the bound segment components (g, h).
+
+        :return: [bound, wake] contributions of bound segment and trailing legs
+        """
+
+        # float_power relies on libm pow() like the scalar a**2 does, so results match bit for bit
+        e = np.sqrt(np.float_power(a, 2) + np.float_power(b, 2))
+        f = np.sqrt(np.float_power(c, 2) + np.float_power(d, 2))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = (g*a + h*b)/e - (g*c + h*d)/f
+            m = (1 + c/f)/d - (1 + a/e)/b
+            det = a*d - b*c
+            bound = np.where(det != 0, k/det, 0.0) / (4*math.pi)
+        wake = m / (4*math.pi)
+
+        return bound, wake
 
     def compute_wing(
             self,
@@ -292,44 +557,48 @@ class VLM(om.ExplicitComponent):
         aspect_ratio = inputs['data:geometry:wing:aspect_ratio']
         meanchord = inputs['data:geometry:wing:MAC:length']
 
-        # Initialization        
-        Cl = []
-        Cdi = []
-        Oswald = []
-        Cm = []
+        # Initialization
         xc = self.WING['xc']
         panelchord = self.WING['panel_chord']
         panelsurf = self.WING['panel_surf']
+        n = self.nx * self.ny
+
+        # Circulation is the linear combination of the unit solutions for incidence, camber and flaps deflection
+        _, gamma_alpha, wake_alpha = self._get_unit_solution(self.WING, 'alpha', lambda: np.ones(n))
+        panelangle_vect = np.zeros(n)
+        gamma_offset = np.zeros(n)
+        wake_offset = np.zeros(n)
         if use_airfoil:
-            self.generate_curvature(self.WING, self.options['wing_airfoil_file'])
-        panelangle_vect = self.WING['panel_angle_vect']
-        AIC = self.WING['AIC']
-        AIC_inv = np.linalg.inv(AIC)
-        AIC_wake = self.WING['AIC_wake']
-        self.apply_deflection(inputs, flaps_angle)
-
-        # Calculate all the aerodynamic parameters 
-        for AoA in aoalist:
-            AoA = AoA*math.pi/180
-            alpha = np.add(panelangle_vect, AoA)
-            gamma = -np.dot(AIC_inv, alpha) * vinf
-            cp = -2 / vinf * np.divide(gamma, panelchord)
-            for i in range(self.nx):
-                cp[i*self.ny] = cp[i*self.ny] * 1
-            cl = -np.sum(cp*panelsurf)/np.sum(panelsurf)
-            alphaind = np.dot(AIC_wake, gamma) / vinf
-            cdind_panel = cp*alphaind
-            cdi = np.sum(cdind_panel*panelsurf)/np.sum(panelsurf)
-            oswald = cl**2/(math.pi*aspect_ratio*cdi) * 0.955  # !!!: manual correction?
-            cmpanel = np.multiply(cp, (xc[:self.nx*self.ny]-meanchord/4))
-            cm = np.sum(cmpanel*panelsurf)/np.sum(panelsurf)
-            # Save data
-            Cl.append(cl)
-            Cdi.append(cdi)
-            Oswald.append(oswald)
-            Cm.append(cm)
-
-        return Cl, Cdi, Oswald, Cm
+            vect, gamma, wake = self._get_unit_solution(
+                self.WING, 'camber', lambda: self._get_wing_camber_vect()
+            )
+            panelangle_vect += vect
+            gamma_offset += gamma
+            wake_offset += wake
+        if flaps_angle != 0.0:
+            sin_deflection = math.sin(flaps_angle*math.pi/180)
+            vect, gamma, wake = self._get_unit_solution(
+                self.WING, 'flaps', lambda: self._get_deflection_vects(np.zeros(self.nx + 1))[1]
+            )
+            panelangle_vect += sin_deflection * vect
+            gamma_offset += sin_deflection * gamma
+            wake_offset += sin_deflection * wake
+        self.WING['panel_angle_vect'] = panelangle_vect
+        self.WING['gamma_offset'] = gamma_offset
+
+        # Calculate all the aerodynamic parameters (one column per angle of attack)
+        AoA = np.atleast_1d(aoalist) * math.pi / 180
+        gamma = -(gamma_offset[:, np.newaxis] + np.outer(gamma_alpha, AoA)) * vinf
+        cp = -2 / vinf * np.divide(gamma, panelchord[:, np.newaxis])
+        cl = -np.sum(cp*panelsurf[:, np.newaxis], axis=0)/np.sum(panelsurf)
+        alphaind = -(wake_offset[:, np.newaxis] + np.outer(wake_alpha, AoA))
+        cdind_panel = cp*alphaind
+        cdi = np.sum(cdind_panel*panelsurf[:, np.newaxis], axis=0)/np.sum(panelsurf)
+        oswald = cl**2/(math.pi*aspect_ratio*cdi) * 0.955  # !!!: manual correction?
+        cmpanel = np.multiply(cp, (xc[:n, np.newaxis]-meanchord/4))
+        cm = np.sum(cmpanel*panelsurf[:, np.newaxis], axis=0)/np.sum(panelsurf)
+
+        return list(cl), list(cdi), list(oswald), list(cm)
 
     def compute_htp(
             self,
@@ -348,39 +617,130 @@ class VLM(om.ExplicitComponent):
 
         meanchord = inputs['data:geometry:horizontal_tail:MAC:length']
 
-        # Initialization 
-        Cl = []
-        Cm = []
+        # Initialization
         xc = self.HTP['xc']
         panelchord = self.HTP['panel_chord']
         panelsurf = self.HTP['panel_surf']
+        n = self.nx * self.ny
+
+        # Circulation is the linear combination of the unit solutions for incidence and camber
+        _, gamma_alpha, _ = self._get_unit_solution(self.HTP, 'alpha', lambda: np.ones(n))
         if use_airfoil:
-            self.generate_curvature(self.HTP, self.options['htp_airfoil_file'])
-        panelangle_vect = self.HTP['panel_angle_vect']
-        AIC = self.HTP['AIC']
-        AIC_inv = np.linalg.inv(AIC)
-
-        # Calculate all the aerodynamic parameters
-        for AoA in aoalist:
-            AoA = AoA * math.pi / 180
-            alpha = np.add(panelangle_vect, AoA)
-            gamma = -np.dot(AIC_inv, alpha) * vinf
-            cp = -2 / vinf * np.divide(gamma, panelchord)
-            for i in range(self.nx):
-                cp[i * self.ny] = cp[i * self.ny] * 1
-            cl = -np.sum(cp * panelsurf) / np.sum(panelsurf)
-            cmpanel = np.multiply(cp, (xc[:self.nx * self.ny] - meanchord / 4))
-            cm = np.sum(cmpanel * panelsurf) / np.sum(panelsurf)
-            # Save data
-            Cl.append(cl)
-            Cm.append(cm)
-
-        return Cl, Cm
+            panelangle_vect, gamma_offset, _ = self._get_unit_solution(
+                self.HTP, 'camber', lambda: self._get_camber_vect(self.HTP, self.options['htp_airfoil_file'])
+            )
+        else:
+            panelangle_vect = np.zeros(n)
+            gamma_offset = np.zeros(n)
+        self.HTP['panel_angle_vect'] = panelangle_vect.copy()
+        self.HTP['gamma_offset'] = gamma_offset.copy()
+
+        # Calculate all the aerodynamic parameters (one column per angle of attack)
+        AoA = np.atleast_1d(aoalist) * math.pi / 180
+        gamma = -(gamma_offset[:, np.newaxis] + np.outer(gamma_alpha, AoA)) * vinf
+        cp = -2 / vinf * np.divide(gamma, panelchord[:, np.newaxis])
+        cl = -np.sum(cp * panelsurf[:, np.newaxis], axis=0) / np.sum(panelsurf)
+        cmpanel = np.multiply(cp, (xc[:n, np.newaxis] - meanchord / 4))
+        cm = np.sum(cmpanel * panelsurf[:, np.newaxis], axis=0) / np.sum(panelsurf)
+
+        return list(cl), list(cm)
+
+    def compute_wing_batch(
+            self,
+            planforms: Dict[str, Union[float, np.ndarray]],
+            aoa: float = 14.0,
+            batch_size: int = _BATCH_SIZE) -> Dict[str, np.ndarray]:
+        """
+        VLM computations for the wing alone (with airfoil camber, no flaps deflection) on many planforms at once,
+        for design-of-experiments sweeps. Geometries are meshed one by one, then their AIC matrices are stacked (by
+        groups of batch_size designs having the same mesh size) and solved together with batched numpy.linalg.
+
+        Mesh is defined by nx/ny1/ny2 options (auto_mesh and solver options being ignored).
+
+        :param planforms: values (one per design, or a single value shared by all designs) of the geometry inputs
+                          named as for the explicit component: wing aspect ratio, MAC length, span, root y, root and
+                          tip chords, kink span ratio, flap span ratio and fuselage maximum width
+        :param aoa: angle of attack (in Deg) of the Oswald coefficient computation
+        :param batch_size: maximum number of AIC matrices solved at once
+        :return: dictionary of arrays (one value per design) 'CL_alpha' (in rad**-1), 'CL0', 'CM_alpha' (in rad**-1),
+                 'CM0' and 'oswald' (same conventions as compute_wing)
+        """
+
+        design_count = max(np.size(planforms[name]) for name in _BATCH_INPUTS)
+        values = {name: np.broadcast_to(np.asarray(planforms[name], dtype=float).ravel(), (design_count,))
+                  for name in _BATCH_INPUTS}
+        # HTP geometry does not matter for the wing (only used by flaps/mesh cache key)
+        htp_names = [name for name in _MESH_INPUTS if name not in _BATCH_INPUTS]
+        results = {name: np.zeros(design_count) for name in ['CL_alpha', 'CL0', 'CM_alpha', 'CM0', 'oswald']}
+
+        # Meshes are generated one by one and grouped by size
+        designs = {}
+        for idx in range(design_count):
+            inputs = {name: values[name][idx:idx+1] for name in _BATCH_INPUTS}
+            inputs.update({name: np.ones(1) for name in htp_names})
+            self._set_mesh_size(inputs, self.options['nx'], self.options['ny1'], self.options['ny2'])
+            self.WING = self._get_empty_surface()
+            self._generate_wing(inputs)
+            angle_vect = np.stack([np.ones(self.nx * self.ny), self._get_wing_camber_vect()], axis=-1)
+            designs.setdefault((self.nx, self.ny1, self.ny2, self.ny3), []).append((idx, self.WING, angle_vect))
+
+        for mesh, group in designs.items():
+            self.nx, self.ny1, self.ny2, self.ny3 = mesh
+            self.ny = self.ny1 + self.ny2 + self.ny3
+            for start in range(0, len(group), max(batch_size, 1)):
+                self._compute_wing_stack(group[start:start+batch_size], values, aoa, results)
+
+        return results
+
+    def _compute_wing_stack(self, designs: list, values: Dict[str, np.ndarray], aoa: float, results: dict):
+        """
+        Solves stacked AIC systems of designs (list of (index, WING dictionary, unit angles)) for unit incidence and
+        camber, and stores obtained coefficients in results at designs indexes.
+        """
 
+        n = self.nx * self.ny
+        index = np.array([design[0] for design in designs])
+
+        def stack(name, size=n):
+            return np.stack([design[1][name][:size] for design in designs])
+
+        xc, yc, panelchord, panelsurf = stack('xc'), stack('yc'), stack('panel_chord'), stack('panel_surf')
+        y_panel = stack('y_panel', self.ny + 1)
+        AIC, AIC_wake = self._compute_influence(
+            xc, yc, stack('x1'), stack('y1'), stack('x2'), stack('y2'),
+            with_wake=self.options['induced_drag_method'] == 'near_field',
+        )
+        # Unit solutions, last axis being (incidence, camber)
+        gamma = np.linalg.solve(AIC, np.stack([design[2] for design in designs]))
+        if self.options['induced_drag_method'] == 'trefftz':
+            trefftz = self._compute_trefftz_influence(yc[:, :self.ny], y_panel[:, :-1], y_panel[:, 1:])
+            strip_gamma = np.sum(np.reshape(gamma, (len(designs), self.nx, self.ny, 2)), axis=1)
+            induced_angle = np.tile(np.matmul(trefftz, strip_gamma), (1, self.nx, 1))
+        else:
+            induced_angle = np.matmul(AIC_wake, gamma)
+
+        # Coefficients for unit air speed (see compute_wing), incidence and camber contributions being linear
+        surface = np.sum(panelsurf, axis=1)
+        cp = 2 * gamma / panelchord[:, :, np.newaxis]
+        cl = -np.sum(cp * panelsurf[:, :, np.newaxis], axis=1) / surface[:, np.newaxis]
+        lever_arm = xc - values['data:geometry:wing:MAC:length'][index, np.newaxis] / 4
+        cm = np.sum(cp * (lever_arm * panelsurf)[:, :, np.newaxis], axis=1) / surface[:, np.newaxis]
+        alpha = aoa * math.pi / 180
+        cp_aoa = cp[:, :, 1] + alpha * cp[:, :, 0]
+        alphaind = -(induced_angle[:, :, 1] + alpha * induced_angle[:, :, 0])
+        cl_aoa = cl[:, 1] + alpha * cl[:, 0]
+        cdi_aoa = np.sum(cp_aoa * alphaind * panelsurf, axis=1) / surface
+        aspect_ratio = values['data:geometry:wing:aspect_ratio'][index]
+
+        results['CL_alpha'][index] = cl[:, 0]
+        results['CL0'][index] = cl[:, 1]
+        results['CM_alpha'][index] = cm[:, 0]
+        results['CM0'][index] = cm[:, 1]
+        results['oswald'][index] = cl_aoa**2/(math.pi*aspect_ratio*cdi_aoa) * 0.955
 
     def get_cl_curve(self, aoa: float, vinf: float) -> Tuple[list, list]:
         """
-        Get wing Cl at y position.
+        Get wing Cl at y position (with camber and flaps deflection of the last compute_wing call).
 
         :param aoa: angle of attack to be computed (in Deg)
         :param vinf: air speed (in m/s)
@@ -389,87 +749,187 @@ class VLM(om.ExplicitComponent):
 
         yc_wing = self.WING['yc']
         chord_wing = self.WING['chord']
-        panelangle_vect = self.WING['panel_angle_vect']
         panelchord = self.WING['panel_chord']
-        AIC = self.WING['AIC']
-        AIC_inv = np.linalg.inv(AIC)
+        n = self.nx * self.ny
+        _, gamma_alpha, _ = self._get_unit_solution(self.WING, 'alpha', lambda: np.ones(n))
         aoa = aoa * math.pi / 180
-        alpha = np.add(panelangle_vect, aoa)
-        gamma = -np.dot(AIC_inv, alpha) * vinf
+        gamma = -(self.WING['gamma_offset'] + gamma_alpha * aoa) * vinf
         cp = -2 / vinf * np.divide(gamma, panelchord)
-        cl_curve = []
-        y_position = []
-        for j in range(self.ny):
-            cl_span = 0.0
-            y = yc_wing[j]
-            chord = (chord_wing[j] + chord_wing[j+1]) / 2.0
-            for i in range(self.nx):
-                cl_span += -cp[i*self.ny + j] * panelchord[i*self.ny + j] / chord
-            cl_curve.append(cl_span)
-            y_position.append(y)
+        # Panels are stored row by row (chordwise index i, spanwise index j)
+        cp = np.reshape(cp[:n], (self.nx, self.ny))
+        panelchord = np.reshape(panelchord[:n], (self.nx, self.ny))
+        chord = (chord_wing[:self.ny] + chord_wing[1:self.ny+1]) / 2.0
+        cl_curve = list(np.sum(-cp * panelchord, axis=0) / chord)
+        y_position = list(yc_wing[:self.ny])
 
         return y_position, cl_curve
 
+    def _get_unit_solution(
+            self, dictionary, name: str, get_angle_vect: Callable[[], np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the solution of the VLM system for unit panel angles (in rad) and unit air speed. It is computed once
+        per geometry (AIC matrix being LU-factorized on first use) and shared through the surface basis.
+        With GMRES solver, AIC and wake influence products are computed block-wise on the fly.
+
+        :param dictionary: WING or HTP dictionary
+        :param name: name of the solution in the basis ('alpha', 'camber', 'flaps')
+        :param get_angle_vect: function returning the panel angles, called only if solution is not yet known
+        :return: [panel angles, circulation, induced angle] vectors (circulation sign as AIC solution), induced angle
+                 being computed according to induced_drag_method option
+        """
 
-    def generate_curvature(self, dictionary, file_name):
-        """Generates curvature corresponding to the airfoil contained in .af file"""
+        basis = dictionary['basis']
+        if name not in basis:
+            if dictionary['AIC_lu'] is None:
+                dictionary['AIC_lu'] = self._factorize(dictionary)
+            angle_vect = get_angle_vect()
+            if self.options['solver'] == 'direct':
+                gamma = lu_solve(dictionary['AIC_lu'], angle_vect)
+            else:
+                gamma = self._solve_gmres(dictionary, angle_vect)
+            if self.options['induced_drag_method'] == 'trefftz':
+                # Trefftz plane: induced angle from the spanwise circulation, constant along each strip
+                strip_gamma = np.sum(np.reshape(gamma, (self.nx, self.ny)), axis=0)
+                induced_angle = np.tile(np.dot(dictionary['trefftz'], strip_gamma), self.nx)
+            elif dictionary['AIC_wake'] is None:
+                induced_angle = self._influence_product(dictionary, gamma, wake=True)
+            else:
+                induced_angle = np.dot(dictionary['AIC_wake'], gamma)
+            basis[name] = (angle_vect, gamma, induced_angle)
 
-        x_panel = dictionary['x_panel']
-        panelangle_vect = dictionary['panel_angle_vect']
-        panelangle = dictionary['panel_angle']
+        return basis[name]
 
-        # Initialization
-        z = np.zeros(self.nx + 1)
-        rootchord = x_panel[self.nx, 0] - x_panel[0, 0]
-        # Calculation of panelangle_vect
-        profile = get_profile(file_name=file_name)
-        mean_line = profile.get_mean_line()
-        for i in range(self.nx + 1):
-            xred = (x_panel[i, 0] - x_panel[0, 0]) / rootchord
-            z[i] = np.interp(min(max(xred, min(mean_line['x'])), max(mean_line['x'])), mean_line['x'], mean_line['z'])
-        z = z * rootchord
-        for i in range(self.nx):
-            panelangle[i] = (z[i] - z[i+1]) / (x_panel[i+1, 0] - x_panel[i, 0])
+    def _get_influence_blocks(self) -> List[np.ndarray]:
+        """
+        Splits the right side panels in blocks of whole chordwise strips (at most _GMRES_BLOCK_SIZE panels, except
+        if a single strip is larger).
 
-        for i in range(self.nx):
-            for j in range(self.ny):
-                panelangle_vect[i*self.ny+j] = panelangle[i]
+        :return: list of panel indices arrays
+        """
 
-        # Save results
-        dictionary['panel_angle_vect'] = panelangle_vect
-        dictionary['panel_angle'] = panelangle
-        dictionary['z'] = z
+        strip_count = max(_GMRES_BLOCK_SIZE // self.nx, 1)
+        chordwise_index = np.arange(self.nx)[:, np.newaxis] * self.ny
 
+        return [(chordwise_index + np.arange(j, min(j + strip_count, self.ny))[np.newaxis, :]).ravel()
+                for j in range(0, self.ny, strip_count)]
 
-    def apply_deflection(self, inputs, deflection_angle):
-        """Apply panel angle deflection due to flaps angle [UNUSED: deflection_angle=0.0]"""
+    def _influence_product(self, dictionary, vect: np.ndarray, wake: bool = False) -> np.ndarray:
+        """
+        Computes AIC.vect (or AIC_wake.vect) without assembling the matrix: influence coefficients are computed on the
+        fly for one block of control points at a time (memory in O(block size * panel count)).
+        """
 
-        root_chord = inputs['data:geometry:wing:root:chord']
-        x_start = (1.0 - inputs['data:geometry:flap:span_ratio'])*root_chord
-        y1_wing = inputs['data:geometry:fuselage:maximum_width']/2.0
+        n = self.nx * self.ny
+        x1, y1 = dictionary['x1'][:n], dictionary['y1'][:n]
+        x2, y2 = dictionary['x2'][:n], dictionary['y2'][:n]
+        product = np.zeros(n)
+        for index in self._get_influence_blocks():
+            AIC, AIC_wake = self._compute_influence(
+                dictionary['xc'][index], dictionary['yc'][index], x1, y1, x2, y2, with_wake=wake
+            )
+            product[index] = np.dot(AIC_wake if wake else AIC, vect)
 
-        deflection_angle *= math.pi/180  # converted to radian
-        z_ = self.WING['z']
-        x_panel = self.WING['x_panel']
-        y_panel = self.WING['y_panel']
-        panelangle = self.WING['panel_angle']
-        panelangle_vect = self.WING['panel_angle_vect']
+        return product
 
-        z = np.zeros(self.nx+1)
-        for i in range(self.nx+1):
-            if x_panel[i, 0] > x_start:
-                z[i] = z_[i] - math.sin(deflection_angle) * (x_panel[i, 0]-x_start)
-        for i in range(self.nx):
-            panelangle[i] = (z[i] - z[i+1]) / (x_panel[i+1, 0] - x_panel[i, 0])
-        for j in range(self.ny1):
-            if y_panel[j] > y1_wing:
-                for i in range(self.nx):
-                    panelangle_vect[i*self.ny+j] += panelangle[i]
-        for j in range(self.ny1, self.ny1+self.ny2):
-            for i in range(self.nx):
-                panelangle_vect[i*self.ny+j] += panelangle[i]
+    def _factorize(self, dictionary):
+        """
+        :return: LU factorization of the AIC matrix for direct solver, list of (panel indices, LU factorization of the
+                 diagonal block) for GMRES solver (block-Jacobi preconditioner)
+        """
+
+        if self.options['solver'] == 'direct':
+            return lu_factor(dictionary['AIC'])
+
+        factorized_blocks = []
+        for index in self._get_influence_blocks():
+            AIC, _ = self._compute_influence(
+                dictionary['xc'][index], dictionary['yc'][index], dictionary['x1'][index], dictionary['y1'][index],
+                dictionary['x2'][index], dictionary['y2'][index], with_wake=False
+            )
+            factorized_blocks.append((index, lu_factor(AIC)))
+
+        return factorized_blocks
+
+    def _solve_gmres(self, dictionary, angle_vect: np.ndarray) -> np.ndarray:
+        """Solves AIC.gamma = angle_vect with block-Jacobi preconditioned GMRES (matrix-free)"""
+
+        n = self.nx * self.ny
+
+        def apply_preconditioner(vect):
+            result = np.zeros(n)
+            for index, lu in dictionary['AIC_lu']:
+                result[index] = lu_solve(lu, np.ravel(vect)[index])
+            return result
+
+        operator = LinearOperator((n, n), matvec=lambda vect: self._influence_product(dictionary, np.ravel(vect)),
+                                  dtype=float)
+        preconditioner = LinearOperator((n, n), matvec=apply_preconditioner, dtype=float)
+        gamma, info = gmres(operator, angle_vect, atol=0.0, restart=_GMRES_RESTART, maxiter=n, M=preconditioner,
+                            **{_GMRES_RTOL_KEYWORD: self.options['gmres_tolerance']})
+        if info != 0:
+            _LOGGER.warning("VLM GMRES solver did not converge (info=%s)", info)
+
+        return gamma
+
+    def _get_camber_vect(self, dictionary, file_name) -> np.ndarray:
+        """Panel angles due to airfoil camber"""
+
+        self.generate_curvature(dictionary, file_name)
+
+        return dictionary['panel_angle_vect'].copy()
+
+    def _get_wing_camber_vect(self) -> np.ndarray:
+        """Panel angles due to wing airfoil camber, including camber of the flapped part with no deflection"""
+
+        camber_vect = self._get_camber_vect(self.WING, self.options['wing_airfoil_file'])
+
+        return camber_vect + self._get_base_deflection_vects()[0]
+
+    def _get_base_deflection_vects(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Deflection vectors (see :meth:`_get_deflection_vects`) of the wing camber line, computed once per camber"""
+
+        if self.WING['deflection_vects'] is None:
+            self.WING['deflection_vects'] = self._get_deflection_vects(self.WING['z'])
+
+        return self.WING['deflection_vects']
+
+    def _get_deflection_vects(self, z_camber: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Panel angles of the flapped panels: for a flaps angle delta, they are vect0 + sin(delta) * vect1.
+
+        :param z_camber: camber line z coordinates at chordwise panel borders (zeros for flat plate)
+        :return: [vect0, vect1] panel angles vectors
+        """
+
+        x_start = self.WING['flap_hinge']
+        x_panel = self.WING['x_panel'][:, 0]
+        flapped_chord = self.WING['flapped_chord']
+        z0 = np.where(flapped_chord, z_camber, 0.0)
+        z1 = np.where(flapped_chord, -(x_panel - x_start), 0.0)
+        panelangle0 = (z0[:-1] - z0[1:]) / (x_panel[1:] - x_panel[:-1])
+        panelangle1 = (z1[:-1] - z1[1:]) / (x_panel[1:] - x_panel[:-1])
+
+        # Panels are stored row by row (chordwise index i, spanwise index j)
+        flapped_span = self.WING['flapped_span']
+        return np.outer(panelangle0, flapped_span).ravel(), np.outer(panelangle1, flapped_span).ravel()
+
+    def generate_curvature(self, dictionary, file_name):
+        """Generates curvature corresponding to the airfoil contained in .af file"""
+
+        x_panel = dictionary['x_panel'][:, 0]
+
+        # Camber line at chordwise panel borders (relative position bounded to mean line definition)
+        rootchord = x_panel[self.nx] - x_panel[0]
+        mean_line = get_profile(file_name=file_name).get_mean_line()
+        mean_line_x, mean_line_z = mean_line['x'], mean_line['z']
+        xred = np.clip((x_panel - x_panel[0]) / rootchord, np.min(mean_line_x), np.max(mean_line_x))
+        z = np.interp(xred, mean_line_x, mean_line_z) * rootchord
+        # Calculation of panelangle_vect (same angle for all the panels of a chordwise row)
+        panelangle = (z[:-1] - z[1:]) / (x_panel[1:] - x_panel[:-1])
 
         # Save results
-        self.WING['panel_angle_vect'] = panelangle_vect
-        self.WING['panel_angle'] = panelangle
-        self.WING['z'] = z
+        dictionary['panel_angle_vect'] = np.repeat(panelangle, self.ny)
+        dictionary['panel_angle'] = panelangle
+        dictionary['z'] = z
+        dictionary['deflection_vects'] = None
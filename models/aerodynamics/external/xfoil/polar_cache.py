@@ -0,0 +1,229 @@
+"""
+Persistent cache of XFOIL polars
+"""
+#  This file is part of FAST : A framework for rapid Overall Aircraft Design
+#  Copyright (C) 2020  ONERA & ISAE-SUPAERO
+#  FAST is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import io
+import os
+import os.path as pth
+import sqlite3
+import time
+from contextlib import closing
+from typing import Optional, Tuple
+
+import numpy as np
+
+DEFAULT_CACHE_SIZE = 1000
+THICKNESS_RATIO_QUANTUM = 1e-4
+
+# Time (in s) a process waits for the database lock held by another one
+_LOCK_TIMEOUT = 60.0
+
+_CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS polars (
+        airfoil_hash TEXT NOT NULL,
+        thickness_ratio INTEGER NOT NULL,
+        alpha_start REAL NOT NULL,
+        alpha_end REAL NOT NULL,
+        iter_limit INTEGER NOT NULL,
+        coarse_alpha_step REAL NOT NULL,
+        reynolds REAL NOT NULL,
+        mach REAL NOT NULL,
+        polar BLOB NOT NULL,
+        last_access REAL NOT NULL,
+        PRIMARY KEY (airfoil_hash, thickness_ratio, alpha_start, alpha_end, iter_limit, coarse_alpha_step, reynolds, mach)
+    )
+"""
+_GROUP_CONDITION = (
+    "airfoil_hash=? AND thickness_ratio=? AND alpha_start=? AND alpha_end=? AND iter_limit=? AND coarse_alpha_step=?"
+)
+
+
+class XfoilPolarCache:
+    """
+    Persistent store of XFOIL polars, in a SQLite database that can be shared by several processes.
+
+    Polars are keyed on the airfoil file hash, the thickness ratio (quantized to THICKNESS_RATIO_QUANTUM), the alpha
+    range, iteration limit and coarse alpha step of adaptive polars (exact match, 0 for fixed-step polars), and the
+    Reynolds and Mach numbers (match within relative tolerance).
+    Polars for a Reynolds number between two stored ones, closer than interpolation_range (relative to Reynolds
+    number), are interpolated. The least recently used polars are dropped when the cache exceeds max_size entries.
+    """
+
+    def __init__(
+            self,
+            file_path: str,
+            max_size: int = DEFAULT_CACHE_SIZE,
+            tolerance: float = 0.0,
+            interpolation_range: float = 0.0
+    ):
+        self.file_path = file_path
+        self.max_size = max_size
+        self.tolerance = tolerance
+        self.interpolation_range = interpolation_range
+        self.hits = 0
+        self.misses = 0
+
+        if pth.dirname(file_path):
+            os.makedirs(pth.dirname(file_path), exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(_CREATE_TABLE)
+
+    @staticmethod
+    def get_airfoil_hash(file_path: str) -> str:
+        """ Hashes content of the airfoil file """
+        with open(file_path, "rb") as airfoil_file:
+            return hashlib.sha1(airfoil_file.read()).hexdigest()
+
+    def get(
+            self,
+            airfoil_hash: str,
+            thickness_ratio: float,
+            alpha_range: Tuple[float, float],
+            iter_limit: int,
+            reynolds: float,
+            mach: float,
+            coarse_alpha_step: float = 0.0,
+    ) -> Optional[np.ndarray]:
+        """
+        :return: the stored (or interpolated) polar as XFOIL result array, or None if not available
+        """
+
+        group = self._get_group(airfoil_hash, thickness_ratio, alpha_range, iter_limit, coarse_alpha_step)
+        with closing(self._connect()) as connection, connection:
+            rows = connection.execute(
+                "SELECT reynolds, mach, polar FROM polars WHERE " + _GROUP_CONDITION
+                + " AND mach BETWEEN ? AND ?",
+                group + (mach - self.tolerance * abs(mach), mach + self.tolerance * abs(mach)),
+            ).fetchall()
+
+            # Closest Reynolds number within tolerance (closest Mach number for a same Reynolds number)
+            matching = [row for row in rows if abs(row[0] - reynolds) <= self.tolerance * abs(reynolds)]
+            if matching:
+                row = min(matching, key=lambda row: (abs(row[0] - reynolds), abs(row[1] - mach)))
+                self._touch(connection, group, row)
+                self.hits += 1
+                return self._load(row[2])
+
+            # Interpolation between neighbouring Reynolds numbers (closest Mach number for each of them)
+            lower = max(
+                (row for row in rows if row[0] < reynolds),
+                key=lambda row: (row[0], -abs(row[1] - mach)),
+                default=None,
+            )
+            upper = min(
+                (row for row in rows if row[0] > reynolds),
+                key=lambda row: (row[0], abs(row[1] - mach)),
+                default=None,
+            )
+            if lower and upper and upper[0] - lower[0] <= self.interpolation_range * abs(reynolds):
+                polar = self._interpolate(lower, upper, reynolds)
+                if polar is not None:
+                    self._touch(connection, group, lower)
+                    self._touch(connection, group, upper)
+                    self.hits += 1
+                    return polar
+
+        self.misses += 1
+        return None
+
+    def put(
+            self,
+            airfoil_hash: str,
+            thickness_ratio: float,
+            alpha_range: Tuple[float, float],
+            iter_limit: int,
+            reynolds: float,
+            mach: float,
+            polar: np.ndarray,
+            coarse_alpha_step: float = 0.0,
+    ):
+        """
+        Stores polar (XFOIL result array), the least recently used ones being dropped if the cache is full.
+        """
+
+        group = self._get_group(airfoil_hash, thickness_ratio, alpha_range, iter_limit, coarse_alpha_step)
+        with io.BytesIO() as buffer:
+            np.save(buffer, polar, allow_pickle=False)
+            blob = buffer.getvalue()
+        with closing(self._connect()) as connection, connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT OR REPLACE INTO polars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                group + (float(reynolds), float(mach), blob, time.time()),
+            )
+            connection.execute(
+                "DELETE FROM polars WHERE rowid IN "
+                "(SELECT rowid FROM polars ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (max(self.max_size, 0),),
+            )
+
+    def clear(self):
+        """ Removes all stored polars and resets hit/miss counters """
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM polars")
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with closing(self._connect()) as connection:
+            return connection.execute("SELECT COUNT(*) FROM polars").fetchone()[0]
+
+    def _connect(self) -> sqlite3.Connection:
+        # Transactions are explicitly opened (BEGIN IMMEDIATE) for writes, SQLite locking the database file
+        return sqlite3.connect(self.file_path, timeout=_LOCK_TIMEOUT)
+
+    @staticmethod
+    def _get_group(airfoil_hash, thickness_ratio, alpha_range, iter_limit, coarse_alpha_step) -> tuple:
+        return (
+            airfoil_hash,
+            int(round(float(thickness_ratio) / THICKNESS_RATIO_QUANTUM)),
+            float(alpha_range[0]),
+            float(alpha_range[1]),
+            int(iter_limit),
+            float(coarse_alpha_step),
+        )
+
+    @staticmethod
+    def _touch(connection, group, row):
+        connection.execute(
+            "UPDATE polars SET last_access=? WHERE " + _GROUP_CONDITION + " AND reynolds=? AND mach=?",
+            (time.time(),) + group + (row[0], row[1]),
+        )
+
+    @staticmethod
+    def _load(blob) -> np.ndarray:
+        with io.BytesIO(blob) as buffer:
+            return np.load(buffer, allow_pickle=False)
+
+    def _interpolate(self, lower_row, upper_row, reynolds) -> Optional[np.ndarray]:
+        """ Linear interpolation on Reynolds number, for the angles of attack available in both polars """
+
+        lower_polar = np.atleast_1d(self._load(lower_row[2]))
+        upper_polar = np.atleast_1d(self._load(upper_row[2]))
+        alpha, lower_index, upper_index = np.intersect1d(
+            lower_polar["alpha"], upper_polar["alpha"], return_indices=True
+        )
+        if len(alpha) == 0:
+            return None
+
+        ratio = (reynolds - lower_row[0]) / (upper_row[0] - lower_row[0])
+        polar = np.zeros(len(alpha), dtype=lower_polar.dtype)
+        for name in lower_polar.dtype.names:
+            polar[name] = (
+                (1.0 - ratio) * lower_polar[name][lower_index] + ratio * upper_polar[name][upper_index]
+            )
+
+        return polar
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Stand-in for XFOIL executable, that answers the commands used by FAST on standard input/output.
+
+Polar is analytical: CL = 0.1 * alpha + 1e-8 * Reynolds up to alpha = 15°, then decreasing. Points do not converge
+above alpha = 20°. The process crashes (as XFOIL may do) for Mach numbers above 0.9. As XFOIL, it stores 12 polars at
+most (further PACC commands are refused until polars are deleted with PDEL).
+
+As XFOIL, INIT toggles the flag telling boundary layers are initialized, which is cleared when an airfoil is loaded
+or panelled. Viscous points computed from boundary layers initialized for another airfoil do not converge.
+"""
+#  This file is part of FAST : A framework for rapid Overall Aircraft Design
+#  Copyright (C) 2020  ONERA & ISAE-SUPAERO
+#  FAST is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import sys
+
+STALL_ALPHA = 15.0
+MAX_CONVERGED_ALPHA = 20.0
+MAX_POLAR_COUNT = 12  # NPX in XFOIL.INC
+
+
+def _get_point(alpha, reynolds):
+    if alpha <= STALL_ALPHA:
+        lift_coeff = 0.1 * alpha + 1e-8 * reynolds
+    else:
+        lift_coeff = 0.1 * STALL_ALPHA + 1e-8 * reynolds - 0.05 * (alpha - STALL_ALPHA)
+    return alpha, lift_coeff, 0.01, 0.005, -0.05, 0.5, 0.6
+
+
+def _get_arguments(words, lines, count):
+    """ Arguments are given on command line, or on following lines (as answers to prompts) """
+    arguments = [float(word) for word in words[1:]]
+    while len(arguments) < count:
+        arguments.append(float(next(lines)))
+    return arguments
+
+
+def _write(text):
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def main():
+    lines = iter(sys.stdin)
+    state = {"menu": "XFOIL", "RE": 0.0, "M": 0.0, "VISC": False, "PACC": False, "polar": [], "polar_file": "",
+             "polar_count": 0, "airfoil": None, "BL_initialized": False, "BL_airfoil": None}
+
+    for line in lines:
+        words = line.split()
+        command = words[0].upper() if words else ""
+        _write(" %s   c>  " % state["menu"])
+
+        if state["menu"] == "XFOIL":
+            if command == "QUIT":
+                return
+            if command in ["PLOP", "GDES", "OPER"]:
+                state["menu"] = command
+            elif command == "LOAD":
+                with open(words[1] if len(words) > 1 else next(lines).strip()) as profile_file:
+                    _write("\n Labeled airfoil file.  Name:  %s\n" % profile_file.readline().strip())
+                    state["airfoil"] = profile_file.read()
+                state["BL_initialized"] = False
+            elif command == "PANE":
+                _write("\n Number of panel nodes  160\n")
+                state["BL_initialized"] = False
+            elif command:
+                _write(' %s command not recognized.  Type a "?" for command listing\n' % command[:4])
+        elif command == "":
+            state["menu"] = "XFOIL"
+        elif state["menu"] == "OPER":
+            if command in ["RE", "M"]:
+                state[command] = _get_arguments(words, lines, 1)[0]
+                if command == "M" and state["M"] > 0.9:
+                    sys.exit(1)
+            elif command == "ITER":
+                _get_arguments(words, lines, 1)
+            elif command == "VISC":
+                state["VISC"] = not state["VISC"]
+            elif command == "INIT":
+                state["BL_initialized"] = not state["BL_initialized"]
+            elif command == "PACC":
+                if not state["PACC"] and state["polar_count"] >= MAX_POLAR_COUNT:
+                    _write("\n Number of polars is at array limit\n")
+                    continue
+                state["PACC"] = not state["PACC"]
+                if state["PACC"]:
+                    state["polar_count"] += 1
+                    state["polar"] = []
+                    state["polar_file"] = next(lines).strip()
+                    next(lines)
+                elif state["polar_file"]:
+                    with open(state["polar_file"], "w") as polar_file:
+                        polar_file.write("\n" * 12)
+                        for point in state["polar"]:
+                            polar_file.write("%8.3f %8.4f %8.5f %8.5f %8.4f %8.4f %8.4f\n" % point)
+            elif command in ["ASEQ", "ALFA"]:
+                if command == "ASEQ":
+                    alpha_start, alpha_end, alpha_step = _get_arguments(words, lines, 3)
+                    alphas = [
+                        alpha_start + idx * alpha_step
+                        for idx in range(int(round((alpha_end - alpha_start) / alpha_step)) + 1)
+                    ]
+                else:
+                    alphas = _get_arguments(words, lines, 1)
+                for alpha in alphas:
+                    point = _get_point(alpha, state["RE"])
+                    _write("\n   a = %7.3f      CL = %7.4f\n" % point[:2])
+                    if state["VISC"] and not state["BL_initialized"]:
+                        state["BL_initialized"] = True
+                        state["BL_airfoil"] = state["airfoil"]
+                    if alpha > MAX_CONVERGED_ALPHA or (state["VISC"] and state["BL_airfoil"] != state["airfoil"]):
+                        _write("     VISCAL:  Convergence failed\n")
+                    elif state["PACC"] and state["VISC"]:
+                        state["polar"].append(point)
+            elif command == "PLIS":
+                _write("\n   alpha    CL        CD       CDp       CM     Top_Xtr  Bot_Xtr\n")
+                _write("  ------ -------- --------- --------- -------- -------- --------\n")
+                for point in state["polar"]:
+                    _write("  %6.3f %8.4f %9.5f %9.5f %8.4f %8.4f %8.4f\n" % point)
+                _write("\n")
+            elif command == "PDEL":
+                polar_index = _get_arguments(words, lines, 1)[0]
+                state["polar_count"] = 0 if polar_index == 0 else max(state["polar_count"] - 1, 0)
+                state["polar"] = []
+
+
+if __name__ == "__main__":
+    main()
@@ -16,19 +16,27 @@ Test module for XFOIL component
 
 # pylint: disable=redefined-outer-name  # needed for fixtures
 
+import os
 import os.path as pth
 import shutil
+import sys
 from platform import system
 import warnings
 
+import numpy as np
 import pytest
+import openmdao.api as om
 from openmdao.core.indepvarcomp import IndepVarComp
 
 from .....tests.testing_utilities import run_system
 from .....tests.xfoil_exe.get_xfoil import get_xfoil_path
 from ..xfoil_polar import XfoilPolar, DEFAULT_2D_CL_MAX
+from ..polar_cache import XfoilPolarCache
+from ..working_directory_pool import XfoilWorkingDirectoryPool, XFOIL_EXE_NAME, XFOIL_PATH_LIMIT
+from ..xfoil_session import XfoilSessionPool, split_alpha_range
 
 XFOIL_RESULTS = pth.join(pth.dirname(__file__), "results")
+FAKE_XFOIL_COMMAND = [sys.executable, pth.join(pth.dirname(__file__), "fake_xfoil.py")]
 
 xfoil_path = None if system() == "Windows" else get_xfoil_path()
 
@@ -111,3 +119,247 @@ def test_compute_with_provided_path():
     )
     problem = run_system(xfoil_comp, ivc)
     assert problem["xfoil:CL_max_2D"] == pytest.approx(1.85, 1e-2)
+
+
+def _get_dummy_polar(reynolds: float) -> np.ndarray:
+    polar = np.zeros(21, dtype=[(name, "f8") for name in XfoilPolar._xfoil_output_names])
+    polar["alpha"] = np.linspace(0.0, 10.0, 21)
+    polar["CL"] = 0.1 * polar["alpha"] + reynolds * 1e-7
+    return polar
+
+
+def test_polar_cache(tmpdir):
+    """ Tests storage, tolerance-based lookup, interpolation and eviction of polars """
+
+    cache = XfoilPolarCache(
+        pth.join(str(tmpdir), "polars.sqlite"), max_size=3, tolerance=0.01, interpolation_range=0.5
+    )
+    key = ("hash", 0.12, (0.0, 10.0), 500)
+    cache.put(*key, 1.0e6, 0.1, _get_dummy_polar(1.0e6))
+    cache.put(*key, 1.2e6, 0.1, _get_dummy_polar(1.2e6))
+
+    # Stored polar within tolerance, interpolated polar between Reynolds numbers, no polar out of range
+    assert cache.get(*key, 1.005e6, 0.1)["CL"][0] == pytest.approx(0.1, abs=1e-12)
+    assert cache.get(*key, 1.1e6, 0.1)["CL"][0] == pytest.approx(0.11, abs=1e-12)
+    assert cache.get(*key, 2.0e6, 0.1) is None
+    assert cache.get(*key, 1.0e6, 0.5) is None
+    assert cache.get("other_hash", 0.12, (0.0, 10.0), 500, 1.0e6, 0.1) is None
+    assert cache.hits == 2
+    assert cache.misses == 3
+
+    # Least recently used polar is dropped
+    cache.put(*key, 3.0e6, 0.1, _get_dummy_polar(3.0e6))
+    cache.get(*key, 1.0e6, 0.1)
+    cache.put(*key, 4.0e6, 0.1, _get_dummy_polar(4.0e6))
+    assert len(cache) == 3
+    assert cache.get(*key, 1.2e6, 0.1) is None
+
+
+def test_polar_cache_closest_mach(tmpdir):
+    """ Tests polars of closest Mach number are used when several ones are stored for a Reynolds number """
+
+    cache = XfoilPolarCache(
+        pth.join(str(tmpdir), "polars.sqlite"), tolerance=0.1, interpolation_range=0.5
+    )
+    key = ("hash", 0.12, (0.0, 10.0), 500)
+    # Polar stored at Mach 0.105 is marked with a different CL offset
+    cache.put(*key, 1.0e6, 0.1, _get_dummy_polar(1.0e6))
+    cache.put(*key, 1.0e6, 0.105, _get_dummy_polar(5.0e6))
+    cache.put(*key, 1.4e6, 0.1, _get_dummy_polar(1.4e6))
+
+    assert cache.get(*key, 1.0e6, 0.1)["CL"][0] == pytest.approx(0.1, abs=1e-12)
+    assert cache.get(*key, 1.0e6, 0.104)["CL"][0] == pytest.approx(0.5, abs=1e-12)
+    assert cache.get(*key, 1.2e6, 0.1)["CL"][0] == pytest.approx(0.12, abs=1e-12)
+
+
+def test_compute_from_polar_cache(tmpdir):
+    """ Tests that XFOIL is not launched when polar is in cache """
+
+    cache_path = pth.join(str(tmpdir), "polars.sqlite")
+    cache = XfoilPolarCache(cache_path)
+    airfoil_hash = XfoilPolarCache.get_airfoil_hash(
+        pth.join(pth.dirname(__file__), pth.pardir, pth.pardir, pth.pardir, "resources", "naca23012.af")
+    )
+    cache.put(airfoil_hash, 0.12, (0.0, 30.0), 500, 1.0e6, 0.1, _get_dummy_polar(1.0e6))
+
+    ivc = IndepVarComp()
+    ivc.add_output("xfoil:unit_reynolds", 1.0e6)
+    ivc.add_output("xfoil:mach", 0.1)
+    ivc.add_output("data:geometry:wing:thickness_ratio", 0.12)
+    ivc.add_output("xfoil:length", 1.0, units="m")
+
+    # Bad executable name would raise ValueError if XFOIL was launched
+    xfoil_comp = XfoilPolar(xfoil_exe_path="Dummy", polar_cache_path=cache_path)
+    problem = run_system(xfoil_comp, ivc)
+    assert problem["xfoil:CL_max_2D"] == pytest.approx(1.1, abs=1e-6)
+
+
+def test_working_directory_pool(tmpdir):
+    """ Tests that working directories are reused, cleaned between runs and removed at the end """
+
+    pool = XfoilWorkingDirectoryPool(base_paths=[pth.join(str(tmpdir), "x" * 100), None])
+    with pool.get_directory() as directory:
+        # too long base path is skipped
+        assert len(pth.join(directory.path, "out")) <= XFOIL_PATH_LIMIT
+        exe_path = directory.exe_path
+        assert pth.isfile(exe_path)
+        first_path = directory.path
+        with open(pth.join(directory.path, "out"), "w") as result_file:
+            result_file.write("result")
+
+        # a concurrent run gets another directory
+        with pool.get_directory() as other_directory:
+            assert other_directory.path != first_path
+
+    with pool.get_directory() as directory:
+        assert len(pool) == 2
+        assert directory.path == first_path
+        assert os.listdir(directory.path) == [XFOIL_EXE_NAME]
+        assert directory.exe_path == exe_path
+
+    pool.clear()
+    assert len(pool) == 0
+    assert not pth.exists(first_path)
+
+
+def test_xfoil_session():
+    """ Tests that an XFOIL session loads airfoil once, computes successive polars and recovers from crashes """
+
+    pool = XfoilSessionPool(XfoilWorkingDirectoryPool())
+    profile = np.array([[1.0, 0.0], [0.5, 0.06], [0.0, 0.0], [0.5, -0.06], [1.0, 0.0]])
+
+    with pool.get_session(FAKE_XFOIL_COMMAND, timeout=10.0) as session:
+        polar = session.compute_polar(profile, 1.0e6, 0.1, 100, 0.0, 10.0)
+        assert polar["alpha"] == pytest.approx(np.linspace(0.0, 10.0, 21))
+        assert polar["CL"] == pytest.approx(0.1 * polar["alpha"] + 0.01, abs=1e-4)
+
+    with pool.get_session(FAKE_XFOIL_COMMAND, timeout=10.0) as same_session:
+        assert same_session is session
+        polar = session.compute_polar(profile, 2.0e6, 0.2, 100, 2.0, 4.0, 1.0)
+        assert polar["CL"] == pytest.approx([0.22, 0.32, 0.42], abs=1e-4)
+        assert session.load_count == 1
+        session.compute_polar(profile * 1.1, 2.0e6, 0.2, 100, 2.0, 4.0, 1.0)
+        assert session.load_count == 2
+
+        # Fake XFOIL crashes for Mach > 0.9
+        polar = session.compute_polar(profile, 2.0e6, 0.95, 100, 2.0, 4.0, 1.0)
+        assert len(polar) == 0
+        assert not session.is_alive
+
+    with pool.get_session(FAKE_XFOIL_COMMAND, timeout=10.0) as new_session:
+        assert new_session is not session
+        assert len(new_session.compute_polar(profile, 2.0e6, 0.2, 100, 2.0, 4.0, 1.0)) == 3
+
+    assert len(pool) == 1
+    pool.clear()
+    assert len(pool) == 0
+
+
+def test_xfoil_session_airfoil_reload():
+    """ Tests that boundary layers are initialized again when another airfoil is loaded in a session """
+
+    pool = XfoilSessionPool(XfoilWorkingDirectoryPool())
+    profile = np.array([[1.0, 0.0], [0.5, 0.06], [0.0, 0.0], [0.5, -0.06], [1.0, 0.0]])
+    thicker_profile = np.array([[1.0, 0.0], [0.5, 0.08], [0.0, 0.0], [0.5, -0.08], [1.0, 0.0]])
+
+    with pool.get_session(FAKE_XFOIL_COMMAND, timeout=10.0) as session:
+        assert len(session.compute_polar(profile, 1.0e6, 0.1, 100, 0.0, 4.0, 1.0)) == 5
+        # Fake XFOIL does not converge from boundary layers of another airfoil
+        assert len(session.compute_polar(thicker_profile, 1.0e6, 0.1, 100, 0.0, 4.0, 1.0)) == 5
+        assert len(session.compute_adaptive_polar(profile, 1.0e6, 0.1, 100, 0.0, 4.0)) == 5
+        assert len(session.compute_polar(profile, 2.0e6, 0.1, 100, 0.0, 4.0, 1.0)) == 5
+        assert session.load_count == 3
+    pool.clear()
+
+
+def test_xfoil_session_adaptive_polar():
+    """ Tests that adaptive polar gets max CL with fewer points than fixed-step polar """
+
+    pool = XfoilSessionPool(XfoilWorkingDirectoryPool())
+    profile = np.array([[1.0, 0.0], [0.5, 0.06], [0.0, 0.0], [0.5, -0.06], [1.0, 0.0]])
+
+    with pool.get_session(FAKE_XFOIL_COMMAND, timeout=10.0) as session:
+        full_polar = session.compute_polar(profile, 1.0e6, 0.1, 100, 0.0, 30.0)
+        adaptive_polar = session.compute_adaptive_polar(profile, 1.0e6, 0.1, 100, 0.0, 30.0)
+
+    # Fake XFOIL has max CL at 15° and does not converge above 20°
+    assert np.max(full_polar["CL"]) == pytest.approx(1.51, abs=1e-4)
+    assert np.max(adaptive_polar["CL"]) == pytest.approx(1.51, abs=1e-4)
+    assert np.all(np.diff(adaptive_polar["alpha"]) > 0.0)
+    assert 15.5 in adaptive_polar["alpha"]  # refined near max CL
+    assert np.max(adaptive_polar["alpha"]) < 17.5  # early stop
+    assert len(adaptive_polar) < len(full_polar) / 2
+    pool.clear()
+
+
+@pytest.mark.skipif(system() == "Windows", reason="Fake XFOIL is run as a script")
+@pytest.mark.parametrize("session_mode, concurrent_reynolds", [(False, False), (True, False), (False, True)])
+def test_compute_several_reynolds(session_mode, concurrent_reynolds):
+    """ Tests that polars for several lengths are computed in one XFOIL run (or concurrently) and stacked """
+
+    problem = om.Problem()
+    ivc = problem.model.add_subsystem("ivc", IndepVarComp(), promotes=["*"])
+    ivc.add_output("xfoil:unit_reynolds", 1.0e6)
+    ivc.add_output("xfoil:mach", 0.1)
+    ivc.add_output("data:geometry:wing:thickness_ratio", 0.12)
+    ivc.add_output("xfoil:length", [1.0, 2.0, 3.0], units="m")
+    problem.model.add_subsystem(
+        "xfoil",
+        XfoilPolar(
+            xfoil_exe_path=FAKE_XFOIL_COMMAND[1],
+            reynolds_count=3,
+            session_mode=session_mode,
+            concurrent_reynolds=concurrent_reynolds,
+        ),
+        promotes=["*"],
+    )
+    problem.setup()
+    problem.run_model()
+
+    # Fake XFOIL gives CL = 0.1 * alpha + 1e-8 * Reynolds up to alpha = 15°
+    assert problem["xfoil:CL_max_2D"] == pytest.approx([1.51, 1.52, 1.53], abs=1e-4)
+    assert problem["xfoil:CL"].shape == (3, 150)
+    assert problem["xfoil:CL"][:, 2] == pytest.approx([0.11, 0.12, 0.13], abs=1e-4)
+
+
+@pytest.mark.skipif(system() == "Windows", reason="Fake XFOIL is run as a script")
+def test_compute_more_reynolds_than_xfoil_polars():
+    """ Tests that polars beyond XFOIL in-memory polar limit (12) are computed in one XFOIL run """
+
+    lengths = np.arange(1.0, 14.0)
+    problem = om.Problem()
+    ivc = problem.model.add_subsystem("ivc", IndepVarComp(), promotes=["*"])
+    ivc.add_output("xfoil:unit_reynolds", 1.0e6)
+    ivc.add_output("xfoil:mach", 0.1)
+    ivc.add_output("data:geometry:wing:thickness_ratio", 0.12)
+    ivc.add_output("xfoil:length", lengths, units="m")
+    problem.model.add_subsystem(
+        "xfoil", XfoilPolar(xfoil_exe_path=FAKE_XFOIL_COMMAND[1], reynolds_count=len(lengths)), promotes=["*"],
+    )
+    problem.setup()
+    problem.run_model()
+
+    assert problem["xfoil:CL_max_2D"] == pytest.approx(1.5 + 0.01 * lengths, abs=1e-4)
+
+
+def test_chunked_polar():
+    """ Tests that a polar split in alpha chunks computed concurrently gives the same points as a single run """
+
+    assert split_alpha_range(0.0, 30.0, 0.5, 3, 2.0) == [(0.0, 9.5, 0.0), (8.0, 20.0, 10.0), (18.5, 30.0, 20.5)]
+
+    pool = XfoilSessionPool(XfoilWorkingDirectoryPool())
+    profile = np.array([[1.0, 0.0], [0.5, 0.06], [0.0, 0.0], [0.5, -0.06], [1.0, 0.0]])
+
+    with pool.get_session(FAKE_XFOIL_COMMAND, timeout=10.0) as session:
+        full_polar = session.compute_polar(profile, 1.0e6, 0.1, 100, 0.0, 30.0)
+    chunked_polar, output = pool.compute_chunked_polar(
+        profile, 1.0e6, 0.1, 100, 0.0, 30.0, 3, command=FAKE_XFOIL_COMMAND, timeout=10.0
+    )
+
+    # A session released by a finished chunk may be reused by a next one: at most one session per chunk
+    assert 1 <= len(pool) <= 3
+    assert len(output) > 0
+    # Fake XFOIL does not converge above 20°
+    assert np.max(chunked_polar["alpha"]) == pytest.approx(20.0)
+    assert np.array_equal(chunked_polar, full_polar)
+    pool.clear()
@@ -0,0 +1,168 @@
+"""
+Pool of reusable working directories for XFOIL runs
+"""
+#  This file is part of FAST : A framework for rapid Overall Aircraft Design
+#  Copyright (C) 2020  ONERA & ISAE-SUPAERO
+#  FAST is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import atexit
+import os
+import os.path as pth
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+from fastoad.models.aerodynamics.external.xfoil import xfoil699
+from fastoad.utils.resource_management.copy import copy_resource
+
+XFOIL_EXE_NAME = "xfoil.exe"  # name of embedded XFoil executable
+
+# Dev Note: XFOIL fails if length of provided file path exceeds 64 characters.
+XFOIL_PATH_LIMIT = 64
+
+# Memory-backed file system, used first when available
+_TMPFS_PATH = "/dev/shm"
+
+
+class XfoilWorkingDirectory:
+    """
+    Scratch directory with a short path, where the embedded XFOIL executable is copied once (when first needed).
+    """
+
+    def __init__(self, directory_path: str):
+        self.path = directory_path
+        self._exe_path = None
+
+    @property
+    def exe_path(self) -> str:
+        """ Path of the embedded XFOIL executable, copied in the directory on first access """
+        if self._exe_path is None:
+            # noinspection PyTypeChecker
+            copy_resource(xfoil699, XFOIL_EXE_NAME, self.path)
+            self._exe_path = pth.join(self.path, XFOIL_EXE_NAME)
+        return self._exe_path
+
+    def clean(self):
+        """ Removes files left by a run, but the executable """
+        for file_name in os.listdir(self.path):
+            if file_name != XFOIL_EXE_NAME:
+                file_path = pth.join(self.path, file_name)
+                if pth.isdir(file_path):
+                    shutil.rmtree(file_path, ignore_errors=True)
+                else:
+                    os.remove(file_path)
+
+
+class XfoilWorkingDirectoryPool:
+    """
+    Thread-safe pool of :class:`XfoilWorkingDirectory` instances.
+
+    Directories are created on demand (as many as concurrent XFOIL runs), reused by successive runs and removed
+    when the Python process exits.
+    """
+
+    def __init__(self, max_file_name_length: int = 3, base_paths: Optional[List[Optional[str]]] = None):
+        """
+        :param max_file_name_length: length of the longest file name XFOIL will read or write in the directory
+        :param base_paths: candidate parent folders, by order of preference. None stands for default temp folder.
+                           Default: tmpfs (if executables are allowed in it), default temp folder, ~/.fast
+        """
+        self.max_file_name_length = max_file_name_length
+        self._base_paths = base_paths
+        self._idle_directories = []
+        self._all_directories = []
+        self._lock = threading.Lock()
+        atexit.register(self.clear)
+
+    @contextmanager
+    def get_directory(self) -> XfoilWorkingDirectory:
+        """
+        Context manager providing a working directory for the time of one XFOIL run.
+
+        Run files are removed when leaving the context, so the directory is clean for next run.
+        """
+        directory = self.acquire()
+        try:
+            yield directory
+        finally:
+            self.release(directory)
+
+    def acquire(self) -> XfoilWorkingDirectory:
+        """ Provides an idle working directory (created if none is available) until :meth:`release` is called """
+        with self._lock:
+            directory = self._idle_directories.pop() if self._idle_directories else None
+        if directory is None or not pth.isdir(directory.path):
+            directory = self._create_directory()
+        return directory
+
+    def release(self, directory: XfoilWorkingDirectory):
+        """ Cleans directory and makes it available for next runs """
+        if pth.isdir(directory.path):
+            directory.clean()
+            with self._lock:
+                self._idle_directories.append(directory)
+
+    def clear(self):
+        """
+        Removes all directories of the pool. Directories currently in use are removed too: they are
+        dropped when released and new ones are created by next :meth:`acquire` calls.
+        """
+        with self._lock:
+            for directory in self._all_directories:
+                shutil.rmtree(directory.path, ignore_errors=True)
+            self._idle_directories = []
+            self._all_directories = []
+
+    def __len__(self):
+        return len(self._all_directories)
+
+    def _create_directory(self) -> XfoilWorkingDirectory:
+        # The point is to get a tmp directory with a short path. tmpfs avoids disk access. On Windows, the default
+        # (user-dependent) tmp dir can exceed the limit. Therefore, as a last choice, tmp dir is created as close of
+        # user home directory as possible.
+        base_paths = self._base_paths
+        if base_paths is None:
+            base_paths = [None, pth.join(str(Path.home()), ".fast")]
+            if _is_executable_tmpfs(_TMPFS_PATH):
+                base_paths.insert(0, _TMPFS_PATH)
+
+        tmp_candidates = []
+        for base_path in base_paths:
+            if base_path is not None:
+                os.makedirs(base_path, exist_ok=True)
+            directory_path = tempfile.mkdtemp(prefix="x", dir=base_path)
+            tmp_candidates.append(directory_path)
+            if len(pth.join(directory_path, "x" * self.max_file_name_length)) <= XFOIL_PATH_LIMIT:
+                directory = XfoilWorkingDirectory(directory_path)
+                with self._lock:
+                    self._all_directories.append(directory)
+                return directory
+            # directory has a too long path. Erase and continue...
+            shutil.rmtree(directory_path, ignore_errors=True)
+
+        raise IOError(
+            "Could not create a tmp directory where file path will respects XFOIL "
+            "limitation (%i): tried %s" % (XFOIL_PATH_LIMIT, tmp_candidates)
+        )
+
+
+def _is_executable_tmpfs(folder_path: str) -> bool:
+    """ True if folder_path is a writable tmpfs folder from which executables can be run """
+    if not pth.isdir(folder_path) or not os.access(folder_path, os.W_OK | os.X_OK):
+        return False
+    try:
+        return not os.statvfs(folder_path).f_flag & os.ST_NOEXEC
+    except (AttributeError, OSError):
+        return False
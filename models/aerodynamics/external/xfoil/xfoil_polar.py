@@ -18,21 +18,24 @@ import logging
 import os
 import os.path as pth
 import shutil
-import tempfile
-from pathlib import Path
-from tempfile import TemporaryDirectory
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 
 import numpy as np
-from fastoad.models.aerodynamics.external.xfoil import xfoil699
-from fastoad.utils.resource_management.copy import copy_resource
-from importlib_resources import path
 from openmdao.components.external_code_comp import ExternalCodeComp
-from openmdao.utils.file_wrap import InputFileGenerator
 from ...constants import POLAR_POINT_COUNT
 from ....geometry.profiles.get_profile import get_profile
+from ... import resources
 
-from . import resources as local_resources
+from .polar_cache import XfoilPolarCache, DEFAULT_CACHE_SIZE
+from .working_directory_pool import XfoilWorkingDirectoryPool, XFOIL_EXE_NAME
+from .xfoil_session import (
+    XfoilSessionPool,
+    XFOIL_OUTPUT_NAMES,
+    DEFAULT_COARSE_ALPHA_STEP,
+    format_xfoil_value,
+)
 
 OPTION_RESULT_POLAR_FILENAME = "result_polar_filename"
 OPTION_RESULT_FOLDER_PATH = "result_folder_path"
@@ -40,6 +43,16 @@ OPTION_XFOIL_EXE_PATH = "xfoil_exe_path"
 OPTION_ALPHA_START = "alpha_start"
 OPTION_ALPHA_END = "alpha_end"
 OPTION_ITER_LIMIT = "iter_limit"
+OPTION_REYNOLDS_COUNT = "reynolds_count"
+OPTION_POLAR_CACHE_PATH = "polar_cache_path"
+OPTION_POLAR_CACHE_SIZE = "polar_cache_size"
+OPTION_POLAR_CACHE_TOLERANCE = "polar_cache_tolerance"
+OPTION_POLAR_CACHE_INTERPOLATION = "polar_cache_interpolation"
+OPTION_SESSION_MODE = "session_mode"
+OPTION_ADAPTIVE_ALPHA = "adaptive_alpha"
+OPTION_COARSE_ALPHA_STEP = "coarse_alpha_step"
+OPTION_ALPHA_CHUNK_COUNT = "alpha_chunk_count"
+OPTION_CONCURRENT_REYNOLDS = "concurrent_reynolds"
 DEFAULT_2D_CL_MAX = 1.9
 
 _INPUT_FILE_NAME = "polar_session.txt"
@@ -48,19 +61,74 @@ _STDERR_FILE_NAME = "polar_calc.err"
 _DEFAULT_AIRFOIL_FILE = "naca23012.af"
 _TMP_PROFILE_FILE_NAME = "in"  # as short as possible to avoid problems of path length
 _TMP_RESULT_FILE_NAME = "out"  # as short as possible to avoid problems of path length
-XFOIL_EXE_NAME = "xfoil.exe"  # name of embedded XFoil executable
+
+_SESSION_TEMPLATE = """PLOP
+G F
+
+LOAD
+{profile_file_path}
+PANE
+GDES
+GSET
+EXEC
+
+OPER
+{polar_blocks}
+QUIT
+"""
+# Each polar block deletes its polar from XFOIL memory once saved (XFOIL stores 12 polars at most)
+_FIRST_POLAR_TEMPLATE = """RE
+{reynolds}
+M
+{mach}
+VISC
+ITER
+{iter_limit}
+PACC
+{result_file_path}
+
+ASEQ
+{alpha_start}
+{alpha_end}
+0.5
+PACC
+PDEL 0
+"""
+# Next polars of the session start from a new boundary layer initialization
+_NEXT_POLAR_TEMPLATE = """RE
+{reynolds}
+INIT
+PACC
+{result_file_path}
+
+ASEQ
+{alpha_start}
+{alpha_end}
+0.5
+PACC
+PDEL 0
+"""
+_MAX_REYNOLDS_COUNT = 99  # for result file names to remain short
 
 _LOGGER = logging.getLogger(__name__)
 
-_XFOIL_PATH_LIMIT = 64
+# Working directories and XFOIL sessions are shared by all XfoilPolar instances
+_WORKING_DIRECTORY_POOL = XfoilWorkingDirectoryPool(
+    max_file_name_length=max(len(_TMP_PROFILE_FILE_NAME), len(_TMP_RESULT_FILE_NAME) + len(str(_MAX_REYNOLDS_COUNT)))
+)
+_SESSION_POOL = XfoilSessionPool(_WORKING_DIRECTORY_POOL)
 
 
 class XfoilPolar(ExternalCodeComp):
     """
     Runs a polar computation with XFOIL and returns the 2D max lift coefficient
+
+    With option reynolds_count > 1, xfoil:length is an array of section lengths, for which polars are computed
+    in a single XFOIL run (or concurrently by one XFOIL session each, with option concurrent_reynolds). Outputs are
+    then stacked (one row per section).
     """
 
-    _xfoil_output_names = ["alpha", "CL", "CD", "CDp", "CM", "Top_Xtr", "Bot_Xtr"]
+    _xfoil_output_names = XFOIL_OUTPUT_NAMES
     """Column names in XFOIL polar result"""
 
     def initialize(self):
@@ -72,19 +140,58 @@ class XfoilPolar(ExternalCodeComp):
         self.options.declare(OPTION_ALPHA_START, default=0.0, types=float)
         self.options.declare(OPTION_ALPHA_END, default=30.0, types=float)
         self.options.declare(OPTION_ITER_LIMIT, default=500, types=int)
+        self.options.declare(
+            OPTION_REYNOLDS_COUNT, default=1, types=int, lower=1, upper=_MAX_REYNOLDS_COUNT,
+            desc="count of section lengths (hence Reynolds numbers) for which polar is computed"
+        )
+        self.options.declare(
+            OPTION_POLAR_CACHE_PATH, default="", types=str,
+            desc="SQLite file where polars are stored and reused (no cache if empty)"
+        )
+        self.options.declare(OPTION_POLAR_CACHE_SIZE, default=DEFAULT_CACHE_SIZE, types=int)
+        self.options.declare(
+            OPTION_POLAR_CACHE_TOLERANCE, default=0.0, types=float,
+            desc="relative difference of Reynolds and Mach numbers for which a stored polar is reused"
+        )
+        self.options.declare(
+            OPTION_POLAR_CACHE_INTERPOLATION, default=0.0, types=float,
+            desc="maximum relative gap between stored Reynolds numbers for which polar is interpolated"
+        )
+        self.options.declare(
+            OPTION_SESSION_MODE, default=False, types=bool,
+            desc="if True, polars are computed by XFOIL processes kept alive between computations"
+        )
+        self.options.declare(
+            OPTION_ADAPTIVE_ALPHA, default=False, types=bool,
+            desc="if True, alpha step is coarse in linear range and computation stops after max CL "
+                 "(implies session mode)"
+        )
+        self.options.declare(OPTION_COARSE_ALPHA_STEP, default=DEFAULT_COARSE_ALPHA_STEP, types=float)
+        self.options.declare(
+            OPTION_ALPHA_CHUNK_COUNT, default=1, types=int, lower=1,
+            desc="if more than 1, alpha range of fixed-step polars is split in chunks computed concurrently by "
+                 "separate XFOIL processes (implies session mode)"
+        )
+        self.options.declare(
+            OPTION_CONCURRENT_REYNOLDS, default=False, types=bool,
+            desc="if True, polars of the section lengths are computed concurrently by separate XFOIL processes "
+                 "(implies session mode)"
+        )
 
     def setup(self):
         
         self.add_input("data:geometry:wing:thickness_ratio", val=np.nan)
-        self.add_input("xfoil:length", val=np.nan, units="m")
+        reynolds_count = self.options[OPTION_REYNOLDS_COUNT]
+        polar_shape = POLAR_POINT_COUNT if reynolds_count == 1 else (reynolds_count, POLAR_POINT_COUNT)
+        self.add_input("xfoil:length", val=np.nan, shape=reynolds_count, units="m")
         self.add_input("xfoil:mach", val=np.nan)
         self.add_input("xfoil:unit_reynolds", val=np.nan)
-        self.add_output("xfoil:alpha", shape=POLAR_POINT_COUNT, units="deg")
-        self.add_output("xfoil:CL", shape=POLAR_POINT_COUNT)
-        self.add_output("xfoil:CD", shape=POLAR_POINT_COUNT)
-        self.add_output("xfoil:CDp", shape=POLAR_POINT_COUNT)
-        self.add_output("xfoil:CM", shape=POLAR_POINT_COUNT)
-        self.add_output("xfoil:CL_max_2D")
+        self.add_output("xfoil:alpha", shape=polar_shape, units="deg")
+        self.add_output("xfoil:CL", shape=polar_shape)
+        self.add_output("xfoil:CD", shape=polar_shape)
+        self.add_output("xfoil:CDp", shape=polar_shape)
+        self.add_output("xfoil:CM", shape=polar_shape)
+        self.add_output("xfoil:CL_max_2D", shape=reynolds_count)
 
         self.declare_partials("*", "*", method="fd")
 
@@ -103,109 +210,251 @@ class XfoilPolar(ExternalCodeComp):
         thickness_ratio = inputs["data:geometry:wing:thickness_ratio"]
         length = inputs["xfoil:length"]
         mach = inputs["xfoil:mach"]
-        reynolds = inputs["xfoil:unit_reynolds"]*length
-
-        # Pre-processing (populating temp directory) -----------------------------------------------
-        # XFoil exe
-        tmp_directory = self._create_tmp_directory()
-        if self.options[OPTION_XFOIL_EXE_PATH]:
-            # if a path for Xfoil has been provided, simply use it
-            self.options["command"] = [self.options[OPTION_XFOIL_EXE_PATH]]
+        reynolds_values = [float(reynolds) for reynolds in inputs["xfoil:unit_reynolds"] * length]
+
+        # Get polars from cache, or run XFOIL for missing ones and store them
+        polar_cache = None
+        cache_key = ()
+        coarse_alpha_step = self.options[OPTION_COARSE_ALPHA_STEP] if self.options[OPTION_ADAPTIVE_ALPHA] else 0.0
+        result_arrays = [None] * len(reynolds_values)
+        if self.options[OPTION_POLAR_CACHE_PATH]:
+            polar_cache = XfoilPolarCache(
+                self.options[OPTION_POLAR_CACHE_PATH],
+                max_size=self.options[OPTION_POLAR_CACHE_SIZE],
+                tolerance=self.options[OPTION_POLAR_CACHE_TOLERANCE],
+                interpolation_range=self.options[OPTION_POLAR_CACHE_INTERPOLATION],
+            )
+            cache_key = (
+                XfoilPolarCache.get_airfoil_hash(pth.join(resources.__path__[0], self.options["wing_airfoil_file"])),
+                float(thickness_ratio),
+                (self.options[OPTION_ALPHA_START], self.options[OPTION_ALPHA_END]),
+                self.options[OPTION_ITER_LIMIT],
+            )
+            result_arrays = [
+                polar_cache.get(*cache_key, reynolds, float(mach), coarse_alpha_step=coarse_alpha_step)
+                for reynolds in reynolds_values
+            ]
+
+        missing_indices = [idx for idx, result_array in enumerate(result_arrays) if result_array is None]
+        if missing_indices:
+            missing_reynolds = [reynolds_values[idx] for idx in missing_indices]
+            if (
+                    self.options[OPTION_SESSION_MODE]
+                    or self.options[OPTION_ADAPTIVE_ALPHA]
+                    or self.options[OPTION_ALPHA_CHUNK_COUNT] > 1
+                    or self.options[OPTION_CONCURRENT_REYNOLDS]
+            ):
+                new_result_arrays = self._run_xfoil_session(thickness_ratio, mach, missing_reynolds)
+            else:
+                new_result_arrays = self._run_xfoil(inputs, outputs, thickness_ratio, mach, missing_reynolds)
+            for idx, reynolds, result_array in zip(missing_indices, missing_reynolds, new_result_arrays):
+                result_arrays[idx] = result_array
+                if polar_cache is not None and np.size(result_array) > 0:
+                    polar_cache.put(
+                        *cache_key, reynolds, float(mach), result_array, coarse_alpha_step=coarse_alpha_step
+                    )
+
+        # Post-processing --------------------------------------------------------------------------
+        polar_outputs = [self._get_polar_outputs(result_array) for result_array in result_arrays]
+        for name in ["xfoil:alpha", "xfoil:CL", "xfoil:CD", "xfoil:CDp", "xfoil:CM", "xfoil:CL_max_2D"]:
+            outputs[name] = np.reshape([polar_output[name] for polar_output in polar_outputs], outputs[name].shape)
+
+    def _get_polar_outputs(self, result_array: np.ndarray) -> dict:
+        """
+        :param result_array: numpy array with XFoil polar results
+        :return: dict with component output values for one polar
+        """
+        polar_outputs = {"xfoil:CL_max_2D": self._get_max_cl(result_array["alpha"], result_array["CL"])}
+        real_length = min(POLAR_POINT_COUNT, len(result_array["alpha"]))
+        if real_length < len(result_array["alpha"]):
+            warnings.warn("Defined maximum polar point count in constants.py exceeded!")
+            alpha = np.linspace(result_array["alpha"][0], result_array["alpha"][-1], POLAR_POINT_COUNT)
+            polar_outputs["xfoil:alpha"] = alpha
+            for name in ["CL", "CD", "CDp", "CM"]:
+                polar_outputs["xfoil:" + name] = np.interp(alpha, result_array["alpha"], result_array[name])
         else:
-            # otherwise, copy the embedded resource in tmp dir
+            for name in ["alpha", "CL", "CD", "CDp", "CM"]:
+                polar_outputs["xfoil:" + name] = np.zeros(POLAR_POINT_COUNT)
+                polar_outputs["xfoil:" + name][0:real_length] = result_array[name]
+
+        return polar_outputs
+
+    def _run_xfoil(self, inputs, outputs, thickness_ratio, mach, reynolds_values) -> List[np.ndarray]:
+        """
+        Runs XFOIL polar computations for each Reynolds number in one session (result files being moved to result
+        folder if any).
+
+        :return: numpy arrays with XFoil polar results, one per Reynolds number
+        """
+
+        result_folder_path = self.options[OPTION_RESULT_FOLDER_PATH]
+
+        with _WORKING_DIRECTORY_POOL.get_directory() as working_directory:
+            # Pre-processing (populating working directory) ----------------------------------------
+            # XFoil exe
+            if self.options[OPTION_XFOIL_EXE_PATH]:
+                # if a path for Xfoil has been provided, simply use it
+                self.options["command"] = [self.options[OPTION_XFOIL_EXE_PATH]]
+            else:
+                # otherwise, use the embedded resource, that is copied once per working directory
+                self.options["command"] = [working_directory.exe_path]
+
+            # I/O files
+            self.stdin = pth.join(working_directory.path, _INPUT_FILE_NAME)
+            self.stdout = pth.join(working_directory.path, _STDOUT_FILE_NAME)
+            self.stderr = pth.join(working_directory.path, _STDERR_FILE_NAME)
+
+            # profile file
+            tmp_profile_file_path = pth.join(working_directory.path, _TMP_PROFILE_FILE_NAME)
+            profile = get_profile(
+                file_name=self.options["wing_airfoil_file"],
+                thickness_ratio=thickness_ratio,
+            ).get_sides()
             # noinspection PyTypeChecker
-            copy_resource(xfoil699, XFOIL_EXE_NAME, tmp_directory.name)
-            self.options["command"] = [pth.join(tmp_directory.name, XFOIL_EXE_NAME)]
+            np.savetxt(
+                tmp_profile_file_path,
+                np.column_stack((profile["x"], profile["z"])),
+                fmt="%.15f",
+                delimiter=" ",
+                header="Wing",
+                comments="",
+            )
+
+            # standard input file
+            tmp_result_file_paths = [
+                pth.join(working_directory.path, _TMP_RESULT_FILE_NAME + ("%i" % idx if len(reynolds_values) > 1 else ""))
+                for idx in range(len(reynolds_values))
+            ]
+            polar_blocks = [
+                (_NEXT_POLAR_TEMPLATE if idx else _FIRST_POLAR_TEMPLATE).format(
+                    reynolds=format_xfoil_value(float(reynolds)),
+                    mach=format_xfoil_value(float(mach)),
+                    iter_limit=format_xfoil_value(self.options[OPTION_ITER_LIMIT]),
+                    result_file_path=tmp_result_file_path,
+                    alpha_start=format_xfoil_value(self.options[OPTION_ALPHA_START]),
+                    alpha_end=format_xfoil_value(self.options[OPTION_ALPHA_END]),
+                )
+                for idx, (reynolds, tmp_result_file_path) in enumerate(zip(reynolds_values, tmp_result_file_paths))
+            ]
+            with open(self.stdin, "w") as session_file:
+                session_file.write(
+                    _SESSION_TEMPLATE.format(
+                        profile_file_path=tmp_profile_file_path, polar_blocks="".join(polar_blocks)
+                    )
+                )
+
+            # Run XFOIL ----------------------------------------------------------------------------
+            self.options["external_input_files"] = [self.stdin, tmp_profile_file_path]
+            self.options["external_output_files"] = tmp_result_file_paths
+            super().compute(inputs, outputs)
+
+            result_arrays = [
+                self._read_polar(tmp_result_file_path) for tmp_result_file_path in tmp_result_file_paths
+            ]
 
-        # I/O files
-        self.stdin = pth.join(tmp_directory.name, _INPUT_FILE_NAME)
-        self.stdout = pth.join(tmp_directory.name, _STDOUT_FILE_NAME)
-        self.stderr = pth.join(tmp_directory.name, _STDERR_FILE_NAME)
+            # Getting output files if needed (other files are removed when working directory is released)
+            if result_folder_path != "":
+                for idx, tmp_result_file_path in enumerate(tmp_result_file_paths):
+                    if pth.exists(tmp_result_file_path):
+                        shutil.move(tmp_result_file_path, self._get_polar_file_path(idx, len(reynolds_values)))
+
+                if pth.exists(self.stdout):
+                    stdout_file_path = pth.join(result_folder_path, _STDOUT_FILE_NAME)
+                    shutil.move(self.stdout, stdout_file_path)
+
+                if pth.exists(self.stderr):
+                    stderr_file_path = pth.join(result_folder_path, _STDERR_FILE_NAME)
+                    shutil.move(self.stderr, stderr_file_path)
+
+        return result_arrays
+
+    def _run_xfoil_session(self, thickness_ratio, mach, reynolds_values) -> List[np.ndarray]:
+        """
+        Runs XFOIL polar computations for each Reynolds number in a running XFOIL session, or in one session per
+        Reynolds number with option concurrent_reynolds (polars and session output being written in result folder if
+        any).
+
+        :return: numpy arrays with XFoil polar results, one per Reynolds number
+        """
 
-        # profile file
-        tmp_profile_file_path = pth.join(tmp_directory.name, _TMP_PROFILE_FILE_NAME)
         profile = get_profile(
             file_name=self.options["wing_airfoil_file"],
             thickness_ratio=thickness_ratio,
         ).get_sides()
-        # noinspection PyTypeChecker
-        np.savetxt(
-            tmp_profile_file_path,
-            profile.to_numpy(),
-            fmt="%.15f",
-            delimiter=" ",
-            header="Wing",
-            comments="",
-        )
-
-        # standard input file
-        tmp_result_file_path = pth.join(tmp_directory.name, _TMP_RESULT_FILE_NAME)
-        parser = InputFileGenerator()
-        with path(local_resources, _INPUT_FILE_NAME) as input_template_path:
-            parser.set_template_file(str(input_template_path))
-            parser.set_generated_file(self.stdin)
-            parser.mark_anchor("RE")
-            parser.transfer_var(float(reynolds), 1, 1)
-            parser.mark_anchor("M")
-            parser.transfer_var(float(mach), 1, 1)
-            parser.mark_anchor("ITER")
-            parser.transfer_var(self.options[OPTION_ITER_LIMIT], 1, 1)
-            parser.mark_anchor("ASEQ")
-            parser.transfer_var(self.options[OPTION_ALPHA_START], 1, 1)
-            parser.transfer_var(self.options[OPTION_ALPHA_END], 2, 1)
-            parser.reset_anchor()
-            parser.mark_anchor("/profile")
-            parser.transfer_var(tmp_profile_file_path, 0, 1)
-            parser.mark_anchor("/polar_result")
-            parser.transfer_var(tmp_result_file_path, 0, 1)
-            parser.generate()
-
-        # Run XFOIL --------------------------------------------------------------------------------
-        self.options["external_input_files"] = [self.stdin, tmp_profile_file_path]
-        self.options["external_output_files"] = [tmp_result_file_path]
-        super().compute(inputs, outputs)
-
-        # Post-processing --------------------------------------------------------------------------
-        result_array = self._read_polar(tmp_result_file_path)
-        cl_max_2d = self._get_max_cl(result_array["alpha"], result_array["CL"])
-        real_length = min(POLAR_POINT_COUNT, len(result_array["alpha"]))
-        if real_length < len(result_array["alpha"]):
-            warnings.warn("Defined maximum polar point count in constants.py exceeded!")
-            outputs["xfoil:alpha"] = np.linspace(result_array["alpha"][0], result_array["alpha"][-1], POLAR_POINT_COUNT)
-            outputs["xfoil:CL"] = np.interp(outputs["xfoil:alpha"], result_array["alpha"], result_array["CL"])
-            outputs["xfoil:CD"] = np.interp(outputs["xfoil:alpha"], result_array["alpha"], result_array["CD"])
-            outputs["xfoil:CDp"] = np.interp(outputs["xfoil:alpha"], result_array["alpha"], result_array["CDp"])
-            outputs["xfoil:CDp"] = np.interp(outputs["xfoil:alpha"], result_array["alpha"], result_array["CM"])
+        profile = np.column_stack((profile["x"], profile["z"]))
+        command = [self.options[OPTION_XFOIL_EXE_PATH]] if self.options[OPTION_XFOIL_EXE_PATH] else None
+        timeout = self.options["timeout"] if self.options["timeout"] > 0.0 else None
+
+        def compute_polars(reynolds_list):
+            result_arrays = []
+            session_output = []
+            if self.options[OPTION_ALPHA_CHUNK_COUNT] > 1 and not self.options[OPTION_ADAPTIVE_ALPHA]:
+                for reynolds in reynolds_list:
+                    result_array, chunk_output = _SESSION_POOL.compute_chunked_polar(
+                        profile,
+                        float(reynolds),
+                        float(mach),
+                        self.options[OPTION_ITER_LIMIT],
+                        self.options[OPTION_ALPHA_START],
+                        self.options[OPTION_ALPHA_END],
+                        self.options[OPTION_ALPHA_CHUNK_COUNT],
+                        command=command,
+                        timeout=timeout,
+                    )
+                    result_arrays.append(result_array)
+                    session_output += chunk_output
+            else:
+                with _SESSION_POOL.get_session(command, timeout=timeout) as session:
+                    for reynolds in reynolds_list:
+                        polar_arguments = (
+                            profile,
+                            float(reynolds),
+                            float(mach),
+                            self.options[OPTION_ITER_LIMIT],
+                            self.options[OPTION_ALPHA_START],
+                            self.options[OPTION_ALPHA_END],
+                        )
+                        if self.options[OPTION_ADAPTIVE_ALPHA]:
+                            result_arrays.append(
+                                session.compute_adaptive_polar(
+                                    *polar_arguments, coarse_alpha_step=self.options[OPTION_COARSE_ALPHA_STEP]
+                                )
+                            )
+                        else:
+                            result_arrays.append(session.compute_polar(*polar_arguments))
+                        session_output += session.last_output
+            return result_arrays, session_output
+
+        if self.options[OPTION_CONCURRENT_REYNOLDS] and len(reynolds_values) > 1:
+            # One session per Reynolds number: XFOIL processes run in parallel, this component waiting for them
+            with ThreadPoolExecutor(max_workers=len(reynolds_values)) as executor:
+                polars = list(executor.map(lambda reynolds: compute_polars([reynolds]), reynolds_values))
+            result_arrays = [result_array for result_arrays, _ in polars for result_array in result_arrays]
+            session_output = [line for _, output in polars for line in output]
         else:
-            outputs["xfoil:alpha"] = np.zeros(POLAR_POINT_COUNT)
-            outputs["xfoil:CL"] = np.zeros(POLAR_POINT_COUNT)
-            outputs["xfoil:CD"] = np.zeros(POLAR_POINT_COUNT)
-            outputs["xfoil:CDp"] = np.zeros(POLAR_POINT_COUNT)
-            outputs["xfoil:CM"] = np.zeros(POLAR_POINT_COUNT)
-            outputs["xfoil:alpha"][0:real_length] = result_array["alpha"]
-            outputs["xfoil:CL"][0:real_length] = result_array["CL"]
-            outputs["xfoil:CD"][0:real_length] = result_array["CD"]
-            outputs["xfoil:CDp"][0:real_length] = result_array["CDp"]
-            outputs["xfoil:CM"][0:real_length] = result_array["CM"]
-        outputs["xfoil:CL_max_2D"] = cl_max_2d
-
-        # Getting output files if needed
-        if self.options[OPTION_RESULT_FOLDER_PATH] != "":
-            if pth.exists(tmp_result_file_path):
-                polar_file_path = pth.join(
-                    result_folder_path, self.options[OPTION_RESULT_POLAR_FILENAME]
-                )
-                shutil.move(tmp_result_file_path, polar_file_path)
+            result_arrays, session_output = compute_polars(reynolds_values)
 
-            if pth.exists(self.stdout):
-                stdout_file_path = pth.join(result_folder_path, _STDOUT_FILE_NAME)
-                shutil.move(self.stdout, stdout_file_path)
+        result_folder_path = self.options[OPTION_RESULT_FOLDER_PATH]
+        if result_folder_path != "":
+            for idx, result_array in enumerate(result_arrays):
+                # noinspection PyTypeChecker
+                np.savetxt(
+                    self._get_polar_file_path(idx, len(result_arrays)),
+                    result_array,
+                    fmt="%.6f",
+                    header=" ".join(self._xfoil_output_names),
+                )
+            with open(pth.join(result_folder_path, _STDOUT_FILE_NAME), "w") as stdout_file:
+                stdout_file.write("\n".join(session_output))
 
-            if pth.exists(self.stderr):
-                stderr_file_path = pth.join(result_folder_path, _STDERR_FILE_NAME)
-                shutil.move(self.stderr, stderr_file_path)
+        return result_arrays
 
-        tmp_directory.cleanup()
+    def _get_polar_file_path(self, index: int, polar_count: int) -> str:
+        """ Path of polar file in result folder (suffixed by polar index if several polars are computed) """
+        file_name = self.options[OPTION_RESULT_POLAR_FILENAME]
+        if polar_count > 1:
+            file_name = "%s_%i%s" % (pth.splitext(file_name)[0], index + 1, pth.splitext(file_name)[1])
+        return pth.join(self.options[OPTION_RESULT_FOLDER_PATH], file_name)
 
     @staticmethod
     def _read_polar(xfoil_result_file_path: str) -> np.ndarray:
@@ -219,7 +468,7 @@ class XfoilPolar(ExternalCodeComp):
             return result_array
 
         _LOGGER.error("XFOIL results file not found")
-        return np.array([])
+        return np.array([], dtype=[(name, "f8") for name in XfoilPolar._xfoil_output_names])
 
     @staticmethod
     def _get_max_cl(alpha: np.ndarray, lift_coeff: np.ndarray) -> float:
@@ -235,35 +484,3 @@ class XfoilPolar(ExternalCodeComp):
         _LOGGER.warning("2D CL max not found. Using default value (%s)", DEFAULT_2D_CL_MAX)
         return DEFAULT_2D_CL_MAX
 
-
-    @staticmethod
-    def _create_tmp_directory() -> TemporaryDirectory:
-        # Dev Note: XFOIL fails if length of provided file path exceeds 64 characters.
-        #           Changing working directory to the tmp dir would allow to just provide file name,
-        #           but it is not really safe (at least, it does mess with the coverage report).
-        #           Then the point is to get a tmp directory with a short path.
-        #           On Windows, the default (user-dependent) tmp dir can exceed the limit.
-        #           Therefore, as a second choice, tmp dir is created as close of user home
-        #           directory as possible.
-        tmp_candidates = []
-        for tmp_base_path in [None, pth.join(str(Path.home()), ".fast")]:
-            if tmp_base_path is not None:
-                os.makedirs(tmp_base_path, exist_ok=True)
-            tmp_directory = tempfile.TemporaryDirectory(prefix="x", dir=tmp_base_path)
-            tmp_candidates.append(tmp_directory.name)
-            tmp_profile_file_path = pth.join(tmp_directory.name, _TMP_PROFILE_FILE_NAME)
-            tmp_result_file_path = pth.join(tmp_directory.name, _TMP_RESULT_FILE_NAME)
-
-            if max(len(tmp_profile_file_path), len(tmp_result_file_path)) <= _XFOIL_PATH_LIMIT:
-                # tmp_directory is OK. Stop there
-                break
-            # tmp_directory has a too long path. Erase and continue...
-            tmp_directory.cleanup()
-
-        if max(len(tmp_profile_file_path), len(tmp_result_file_path)) > _XFOIL_PATH_LIMIT:
-            raise IOError(
-                "Could not create a tmp directory where file path will respects XFOIL "
-                "limitation (%i): tried %s" % (_XFOIL_PATH_LIMIT, tmp_candidates)
-            )
-
-        return tmp_directory
@@ -0,0 +1,489 @@
+"""
+Long-lived interactive XFOIL sessions
+"""
+#  This file is part of FAST : A framework for rapid Overall Aircraft Design
+#  Copyright (C) 2020  ONERA & ISAE-SUPAERO
+#  FAST is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import atexit
+import hashlib
+import logging
+import os
+import os.path as pth
+import queue
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .working_directory_pool import XfoilWorkingDirectory, XfoilWorkingDirectoryPool
+
+XFOIL_OUTPUT_NAMES = ["alpha", "CL", "CD", "CDp", "CM", "Top_Xtr", "Bot_Xtr"]
+"""Column names in XFOIL polar result"""
+
+DEFAULT_ALPHA_STEP = 0.5
+DEFAULT_COARSE_ALPHA_STEP = 1.0
+
+# Adaptive polar: fine step is used below this ratio of the initial lift slope
+STALL_SLOPE_RATIO = 0.7
+# Adaptive polar: computation stops once CL has dropped by this amount below max CL
+STALL_CL_DROP = 0.05
+# Adaptive polar: computation stops after this count of successive unconverged points with fine step
+MAX_UNCONVERGED_POINTS = 3
+
+# Chunked polar: each chunk starts this far (in degrees) before its first point, for boundary layer to settle
+DEFAULT_CHUNK_RAMP_IN = 2.0
+
+_ALPHA_TOLERANCE = 1e-3  # alpha is listed by XFOIL with 3 decimals
+_PROFILE_FILE_NAME = "in"  # as short as possible to avoid problems of path length
+_SYNC_PREFIX = "Z"  # XFOIL echoes the first 4 characters of unknown commands
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class XfoilSession:
+    """
+    One XFOIL process kept alive, driven through its standard input and output.
+
+    The airfoil is loaded and panelled only when it changes. Each polar is computed in the OPER menu, accumulated
+    in memory and listed back on the standard output (PLIS), where it is parsed. After each request, XFOIL is sent
+    an unknown 4-character command whose error message marks the end of the output of the request.
+
+    If the process dies or does not answer within timeout, polar is returned empty and the session is closed.
+    """
+
+    def __init__(
+            self,
+            working_directory: XfoilWorkingDirectory,
+            command: Optional[List[str]] = None,
+            timeout: Optional[float] = None
+    ):
+        """
+        :param working_directory: directory where airfoil file is written
+        :param command: command that launches XFOIL. Default: embedded executable (copied in working_directory)
+        :param timeout: maximum time in seconds for one request (no limit if None)
+        """
+        self.working_directory = working_directory
+        self.command = command if command else [working_directory.exe_path]
+        self.timeout = timeout
+        self.load_count = 0
+        self.polar_count = 0
+        self.last_output = []
+
+        self._airfoil_key = None
+        self._viscous = False
+        self._sync_count = 0
+        self._output = queue.Queue()
+
+        # Fortran runtime must not buffer output, otherwise answers would not come before process ends
+        environment = dict(os.environ, GFORTRAN_UNBUFFERED_PRECONNECTED="y")
+        self._process = subprocess.Popen(
+            self.command,
+            env=environment,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            bufsize=1,
+            cwd=working_directory.path,
+        )
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+
+        # Graphics are disabled for the whole session
+        self._request(["PLOP", "G F", ""])
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process.poll() is None
+
+    def compute_polar(
+            self,
+            profile: np.ndarray,
+            reynolds: float,
+            mach: float,
+            iter_limit: int,
+            alpha_start: float,
+            alpha_end: float,
+            alpha_step: float = DEFAULT_ALPHA_STEP,
+    ) -> np.ndarray:
+        """
+        Computes polar from alpha_start to alpha_end with constant alpha step.
+
+        :param profile: (N, 2) array of airfoil point coordinates, in Selig order
+        :return: numpy array with XFoil polar results (converged points only), without any point if XFOIL failed
+        """
+        self.last_output = []
+        output = self._request(
+            self._get_polar_start_commands(profile, reynolds, mach, iter_limit)
+            + [
+                "ASEQ %s %s %s" % tuple(format_xfoil_value(float(value)) for value in (alpha_start, alpha_end, alpha_step)),
+                "PACC",
+                "PLIS 1",
+                "PDEL 0",
+                "",
+            ]
+        )
+        if output is None:
+            return parse_polar_listing([])
+
+        self._polar_started(profile)
+        return parse_polar_listing(output)
+
+    def compute_adaptive_polar(
+            self,
+            profile: np.ndarray,
+            reynolds: float,
+            mach: float,
+            iter_limit: int,
+            alpha_start: float,
+            alpha_end: float,
+            alpha_step: float = DEFAULT_ALPHA_STEP,
+            coarse_alpha_step: float = DEFAULT_COARSE_ALPHA_STEP,
+    ) -> np.ndarray:
+        """
+        Computes polar from alpha_start with coarse_alpha_step in the linear range, and alpha_step near max CL.
+
+        Alpha step is refined (and the points of the last coarse step are filled in) as soon as the lift slope
+        drops below STALL_SLOPE_RATIO times the initial lift slope, or a point does not converge.
+        Computation stops before alpha_end once CL has dropped by STALL_CL_DROP below max CL, or if
+        MAX_UNCONVERGED_POINTS successive points do not converge after refinement.
+
+        :param profile: (N, 2) array of airfoil point coordinates, in Selig order
+        :return: numpy array with XFoil polar results (converged points only), sorted by alpha
+        """
+        self.last_output = []
+        if self._request(self._get_polar_start_commands(profile, reynolds, mach, iter_limit) + [""]) is None:
+            return parse_polar_listing([])
+        self._polar_started(profile)
+
+        points = []
+        step = max(coarse_alpha_step, alpha_step)
+        initial_slope = None
+        unconverged_count = 0
+        alpha = alpha_start
+        while alpha <= alpha_end + _ALPHA_TOLERANCE and self.is_alive:
+            previous_point = points[-1] if points else None
+            point = self._compute_point(alpha)
+            if point is not None:
+                points.append(point)
+                unconverged_count = 0
+            else:
+                unconverged_count += 1
+                if step == alpha_step and unconverged_count >= MAX_UNCONVERGED_POINTS:
+                    break
+
+            if step > alpha_step:
+                slope = None
+                if point is not None and previous_point is not None:
+                    slope = (point[1] - previous_point[1]) / (point[0] - previous_point[0])
+                    if initial_slope is None:
+                        initial_slope = slope
+                if point is None or (slope is not None and slope < STALL_SLOPE_RATIO * initial_slope):
+                    # Getting close to max CL: points of the last coarse step are filled in with fine step
+                    step = alpha_step
+                    fill_alpha = alpha if previous_point is None else previous_point[0] + step
+                    while fill_alpha < alpha - _ALPHA_TOLERANCE and self.is_alive:
+                        fill_point = self._compute_point(fill_alpha)
+                        if fill_point is not None:
+                            points.append(fill_point)
+                        fill_alpha += step
+
+            if point is not None and point[1] < max(row[1] for row in points) - STALL_CL_DROP:
+                break
+            alpha += step
+
+        if self.is_alive:
+            self._request(["OPER", "PACC", "PDEL 0", ""])
+
+        polar = np.array(points, dtype=parse_polar_listing([]).dtype)
+        return np.sort(polar, order="alpha")
+
+    def close(self):
+        """ Ends XFOIL process """
+        if self.is_alive:
+            try:
+                self._send(["QUIT"])
+                self._process.wait(timeout=1.0)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                self._process.kill()
+                self._process.wait()
+        for stream in (self._process.stdin, self._process.stdout):
+            try:
+                stream.close()
+            except (OSError, ValueError):
+                pass
+
+    def _get_polar_start_commands(self, profile, reynolds, mach, iter_limit) -> List[str]:
+        """ Commands that load airfoil (if needed), set flow conditions and start polar accumulation """
+        commands = []
+        airfoil_reloaded = self._get_airfoil_key(profile) != self._airfoil_key
+        if airfoil_reloaded:
+            profile_file_path = pth.join(self.working_directory.path, _PROFILE_FILE_NAME)
+            # noinspection PyTypeChecker
+            np.savetxt(profile_file_path, profile, fmt="%.15f", delimiter=" ", header="Wing", comments="")
+            commands += ["LOAD " + profile_file_path, "PANE", "GDES", "GSET", "EXEC", ""]
+
+        commands += ["OPER", "RE %s" % format_xfoil_value(float(reynolds)), "M %s" % format_xfoil_value(float(mach))]
+        # Boundary layer of previous polar is not used as initial state. INIT toggles XFOIL flag telling boundary
+        # layers are initialized, which is already cleared when the airfoil is panelled: it must not be sent then.
+        if not self._viscous:
+            commands.append("VISC")
+        elif not airfoil_reloaded:
+            commands.append("INIT")
+        commands += [
+            "ITER %i" % iter_limit,
+            # Polar is accumulated in memory only (no save file, no dump file)
+            "PACC",
+            "",
+            "",
+        ]
+        return commands
+
+    def _polar_started(self, profile):
+        """ Records session state once polar start commands have been processed """
+        airfoil_key = self._get_airfoil_key(profile)
+        if airfoil_key != self._airfoil_key:
+            self._airfoil_key = airfoil_key
+            self.load_count += 1
+        self._viscous = True
+        self.polar_count += 1
+
+    def _compute_point(self, alpha: float) -> Optional[tuple]:
+        """
+        Computes one point of the polar being accumulated.
+
+        :return: the polar row for alpha, or None if XFOIL did not converge
+        """
+        output = self._request(["OPER", "ALFA %s" % format_xfoil_value(float(alpha)), "PLIS 1", ""])
+        if output is None:
+            return None
+        polar = parse_polar_listing(output)
+        matching = np.abs(polar["alpha"] - alpha) < _ALPHA_TOLERANCE
+        return tuple(polar[matching][-1]) if np.any(matching) else None
+
+    @staticmethod
+    def _get_airfoil_key(profile) -> str:
+        return hashlib.sha1(np.ascontiguousarray(profile, dtype=float).tobytes()).hexdigest()
+
+    def _request(self, commands: List[str]) -> Optional[List[str]]:
+        """
+        Sends commands and returns XFOIL output until synchronization mark, or None if XFOIL failed.
+
+        Output is also appended to last_output.
+        """
+        self._sync_count = (self._sync_count + 1) % 1000
+        sync_mark = "%s%03i" % (_SYNC_PREFIX, self._sync_count)
+
+        output = []
+        try:
+            self._send(commands + [sync_mark])
+        except (OSError, ValueError):
+            _LOGGER.error("XFOIL session ended unexpectedly")
+            self.close()
+            return None
+
+        while True:
+            try:
+                line = self._output.get(timeout=self.timeout)
+            except queue.Empty:
+                _LOGGER.error("XFOIL session did not answer within %s s", self.timeout)
+                self.close()
+                return None
+            if line is None:
+                _LOGGER.error("XFOIL session ended unexpectedly")
+                self.close()
+                return None
+            if sync_mark in line and "not recognized" in line:
+                return output
+            output.append(line)
+            self.last_output.append(line)
+
+    def _send(self, commands: List[str]):
+        self._process.stdin.write("\n".join(commands) + "\n")
+        self._process.stdin.flush()
+
+    def _read_output(self):
+        for line in self._process.stdout:
+            self._output.put(line.rstrip("\n"))
+        self._output.put(None)
+
+
+class XfoilSessionPool:
+    """
+    Thread-safe pool of :class:`XfoilSession` instances, so that each worker thread keeps using an XFOIL process.
+
+    Sessions are started on demand (as many as concurrent requests for a same command) and closed when the Python
+    process exits.
+    """
+
+    def __init__(self, working_directory_pool: XfoilWorkingDirectoryPool):
+        self.working_directory_pool = working_directory_pool
+        self._idle_sessions = {}
+        self._all_sessions = []
+        self._lock = threading.Lock()
+        atexit.register(self.clear)
+
+    @contextmanager
+    def get_session(self, command: Optional[List[str]] = None, timeout: Optional[float] = None) -> XfoilSession:
+        """
+        Context manager providing a running XFOIL session.
+
+        :param command: command that launches XFOIL. Default: embedded executable
+        :param timeout: maximum time in seconds for one request (no limit if None)
+        """
+        key = tuple(command) if command else ()
+        with self._lock:
+            idle_sessions = self._idle_sessions.setdefault(key, [])
+            session = idle_sessions.pop() if idle_sessions else None
+        if session is None or not session.is_alive:
+            if session is not None:
+                self._discard(session)
+            working_directory = self.working_directory_pool.acquire()
+            try:
+                session = XfoilSession(working_directory, command=command, timeout=timeout)
+            except OSError:
+                self.working_directory_pool.release(working_directory)
+                raise
+            with self._lock:
+                self._all_sessions.append(session)
+        session.timeout = timeout
+
+        try:
+            yield session
+        finally:
+            if session.is_alive:
+                with self._lock:
+                    self._idle_sessions[key].append(session)
+            else:
+                self._discard(session)
+
+    def compute_chunked_polar(
+            self,
+            profile: np.ndarray,
+            reynolds: float,
+            mach: float,
+            iter_limit: int,
+            alpha_start: float,
+            alpha_end: float,
+            chunk_count: int,
+            alpha_step: float = DEFAULT_ALPHA_STEP,
+            ramp_in: float = DEFAULT_CHUNK_RAMP_IN,
+            command: Optional[List[str]] = None,
+            timeout: Optional[float] = None,
+    ) -> Tuple[np.ndarray, List[str]]:
+        """
+        Computes polar from alpha_start to alpha_end by splitting the alpha range in chunk_count chunks, computed
+        concurrently in separate sessions.
+
+        Each chunk starts ramp_in degrees before its first point, so its points overlap the previous chunk. For each
+        alpha, the point of the chunk that owns it is used if converged, otherwise the one of the overlapping chunk.
+
+        :return: numpy array with XFoil polar results (converged points only) and the output of XFOIL sessions
+        """
+        chunks = split_alpha_range(alpha_start, alpha_end, alpha_step, chunk_count, ramp_in)
+
+        def compute_chunk(chunk):
+            with self.get_session(command, timeout=timeout) as session:
+                polar = session.compute_polar(
+                    profile, reynolds, mach, iter_limit, chunk[0], chunk[1], alpha_step=alpha_step
+                )
+                return polar, session.last_output
+
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            results = list(executor.map(compute_chunk, chunks))
+
+        points = {}
+        for (run_start, _, own_start), (polar, _) in zip(chunks, results):
+            for point in polar:
+                key = int(round((point["alpha"] - alpha_start) / alpha_step))
+                if key not in points or point["alpha"] >= own_start - _ALPHA_TOLERANCE:
+                    points[key] = point
+        polar = np.array([points[key] for key in sorted(points)], dtype=parse_polar_listing([]).dtype)
+
+        return polar, [line for _, output in results for line in output]
+
+    def clear(self):
+        """ Closes all sessions of the pool """
+        with self._lock:
+            sessions = self._all_sessions
+            self._idle_sessions = {}
+            self._all_sessions = []
+        for session in sessions:
+            session.close()
+            self.working_directory_pool.release(session.working_directory)
+
+    def __len__(self):
+        return len(self._all_sessions)
+
+    def _discard(self, session: XfoilSession):
+        session.close()
+        with self._lock:
+            if session in self._all_sessions:
+                self._all_sessions.remove(session)
+        self.working_directory_pool.release(session.working_directory)
+
+
+def split_alpha_range(
+        alpha_start: float, alpha_end: float, alpha_step: float, chunk_count: int, ramp_in: float
+) -> List[Tuple[float, float, float]]:
+    """
+    Splits the alpha points of a polar in contiguous chunks of nearly equal point counts.
+
+    :return: list of (first computed alpha, last computed alpha, first owned alpha) for each chunk
+    """
+    point_count = int(round((alpha_end - alpha_start) / alpha_step)) + 1
+    chunk_count = max(1, min(chunk_count, point_count))
+    boundaries = np.linspace(0, point_count, chunk_count + 1).round().astype(int)
+    ramp_in_count = int(round(ramp_in / alpha_step))
+
+    chunks = []
+    for first_index, next_index in zip(boundaries[:-1], boundaries[1:]):
+        chunks.append(
+            (
+                alpha_start + max(first_index - ramp_in_count, 0) * alpha_step,
+                alpha_start + (next_index - 1) * alpha_step,
+                alpha_start + first_index * alpha_step,
+            )
+        )
+    return chunks
+
+
+def parse_polar_listing(lines: List[str]) -> np.ndarray:
+    """
+    Reads the polar points that follow the last dashed header line of XFOIL output.
+
+    :return: numpy array with XFoil polar results
+    """
+    header_indices = [idx for idx, line in enumerate(lines) if line.strip().startswith("------")]
+    rows = []
+    if header_indices:
+        for line in lines[header_indices[-1] + 1:]:
+            try:
+                values = [float(value) for value in line.split()]
+            except ValueError:
+                break
+            if len(values) < len(XFOIL_OUTPUT_NAMES):
+                break
+            rows.append(tuple(values[: len(XFOIL_OUTPUT_NAMES)]))
+
+    return np.array(rows, dtype=[(name, "f8") for name in XFOIL_OUTPUT_NAMES])
+
+
+def format_xfoil_value(value) -> str:
+    """ Formats value in XFOIL commands as OpenMDAO InputFileGenerator does """
+    if isinstance(value, float):
+        return "%.1f" % value if int(value) == value else "%.16g" % value
+    return str(value)
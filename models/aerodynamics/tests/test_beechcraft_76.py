@@ -16,6 +16,7 @@ Test module for aerodynamics groups
 
 import os.path as pth
 import os
+import shutil
 import pandas as pd
 import openmdao.api as om
 from openmdao.core.component import Component
@@ -36,10 +37,13 @@ from fastoad.models.propulsion.propulsion import IOMPropulsionWrapper
 
 from ...tests.testing_utilities import run_system, register_wrappers, get_indep_var_comp, list_inputs, Timer
 from ..components.cd0 import CD0
-from ..external.vlm import ComputeOSWALDvlm, ComputeWingCLALPHAvlm, ComputeHTPCLALPHAvlm, ComputeHTPCLCMvlm
+from ..external.vlm import ComputeOSWALDvlm, ComputeWingCLALPHAvlm, ComputeHTPCLALPHAvlm, ComputeHTPCLCMvlm, \
+    VLM, VLM_CACHE
 from ..external.xfoil import XfoilPolar
 from ..external.openvsp import ComputeOSWALDopenvsp, ComputeWingCLALPHAopenvsp, ComputeHTPCLALPHAopenvsp, \
-    ComputeHTPCLCMopenvsp, ComputeAEROopenvsp
+    ComputeHTPCLCMopenvsp, ComputeAEROopenvsp, OPENVSP_CACHE, GEOMETRY_CACHE
+from ..external.openvsp.result_cache import OpenVSPResultCache
+from ..external.openvsp.tests.fake_openvsp import RUN_LOG_FILE_NAME
 from ..components.compute_cnbeta_fuselage import ComputeCnBetaFuselage
 from ..components.compute_cl_max import ComputeMaxCL
 from ..components.high_lift_aero import ComputeDeltaHighLift
@@ -54,6 +58,7 @@ from ...propulsion.propulsion import IPropulsion
 
 
 RESULTS_FOLDER = pth.join(pth.dirname(__file__), "results")
+FAKE_OPENVSP_PATH = pth.join(pth.dirname(__file__), "..", "external", "openvsp", "tests", "fake_openvsp.py")
 xfoil_path = None if system() == "Windows" else get_xfoil_path()
 
 XML_FILE = "beechcraft_76.xml"
@@ -381,6 +386,162 @@ def est_vlm_comp_low_speed():
     assert cm2 == pytest.approx(-0.0667, abs=1e-4)
 
 
+def test_vlm_cache():
+    """ Tests vlm geometry is computed once and shared between components """
+
+    VLM_CACHE.clear()
+
+    # Research independent input value in .xml file
+    ivc = get_indep_var_comp(list_inputs(ComputeWingCLALPHAvlm()), __file__, XML_FILE)
+    ivc.add_output("data:aerodynamics:cruise:mach", 0.245)
+
+    # Run problem and check geometry has been computed
+    run_system(ComputeWingCLALPHAvlm(), ivc)
+    assert VLM_CACHE.misses == 1
+    assert VLM_CACHE.hits == 0
+
+    # Research independent input value in .xml file
+    ivc = get_indep_var_comp(list_inputs(ComputeHTPCLALPHAvlm(low_speed_aero=True)), __file__, XML_FILE)
+    ivc.add_output("data:aerodynamics:low_speed:mach", 0.1149)
+
+    # Run problem and check geometry has been read from cache (VLM does not depend on mach)
+    problem = run_system(ComputeHTPCLALPHAvlm(low_speed_aero=True), ivc)
+    assert VLM_CACHE.misses == 1
+    assert VLM_CACHE.hits >= 1
+    cl_alpha_htp = problem.get_val("data:aerodynamics:horizontal_tail:low_speed:CL_alpha", units="rad**-1")
+    assert cl_alpha_htp == pytest.approx(0.6200, abs=1e-4)
+
+
+def test_vlm_induced_drag_methods():
+    """ Tests Trefftz plane induced drag against full wake influence matrix at control points """
+
+    # Research independent input value in .xml file
+    ivc = get_indep_var_comp(list_inputs(ComputeOSWALDvlm()), __file__, XML_FILE)
+    ivc.add_output("data:aerodynamics:cruise:mach", 0.245)
+    cl = np.zeros(POLAR_POINT_COUNT)
+    cdp = np.zeros(POLAR_POINT_COUNT)
+    cl[0:27] = np.array(
+        [0.2682, 0.3105, 0.3606, 0.4073, 0.4572, 0.5105, 0.5645, 0.6183,
+         0.6714, 0.7237, 0.7762, 0.828, 0.8785, 0.9255, 0.9705, 1.017,
+         1.0644, 1.1107, 1.1563, 1.2421, 1.2836, 1.3243, 1.3635, 1.3993,
+         1.4349, 1.4657, 1.494]
+    )
+    cdp[0:27] = np.array(
+        [0.00089, 0.00109, 0.00126, 0.00151, 0.00176, 0.00197, 0.00219,
+         0.00241, 0.00268, 0.00298, 0.00322, 0.00351, 0.00383, 0.00419,
+         0.00479, 0.00531, 0.00575, 0.00621, 0.00675, 0.00823, 0.009,
+         0.00989, 0.01088, 0.012, 0.01319, 0.01455, 0.01626]
+    )
+    ivc.add_output("data:aerodynamics:wing:cruise:CL", cl)
+    ivc.add_output("data:aerodynamics:wing:cruise:CDp", cdp)
+
+    # Run problem with both methods and check obtained values are close, near field being the default
+    problem = run_system(ComputeOSWALDvlm(), ivc)
+    coef_k_default = problem["data:aerodynamics:aircraft:cruise:induced_drag_coefficient"]
+    problem = run_system(ComputeOSWALDvlm(induced_drag_method="near_field"), ivc)
+    coef_k_near_field = problem["data:aerodynamics:aircraft:cruise:induced_drag_coefficient"]
+    assert coef_k_near_field == pytest.approx(0.0537, abs=1e-4)
+    assert coef_k_default == coef_k_near_field
+    problem = run_system(ComputeOSWALDvlm(induced_drag_method="trefftz"), ivc)
+    coef_k_trefftz = problem["data:aerodynamics:aircraft:cruise:induced_drag_coefficient"]
+    assert coef_k_trefftz == pytest.approx(0.0516, abs=1e-4)
+    assert coef_k_trefftz == pytest.approx(coef_k_near_field, rel=0.05)
+
+
+def test_vlm_gmres_solver():
+    """ Tests matrix-free GMRES solver against direct (LU) solver """
+
+    # Research independent input value in .xml file
+    ivc = get_indep_var_comp(list_inputs(ComputeWingCLALPHAvlm()), __file__, XML_FILE)
+    ivc.add_output("data:aerodynamics:cruise:mach", 0.245)
+
+    # Run problem with both solvers and check obtained values are the same
+    problem = run_system(ComputeWingCLALPHAvlm(solver="direct"), ivc)
+    cl0_direct = problem["data:aerodynamics:aircraft:cruise:CL0_clean"]
+    cl_alpha_direct = problem["data:aerodynamics:aircraft:cruise:CL_alpha"]
+    problem = run_system(ComputeWingCLALPHAvlm(solver="gmres"), ivc)
+    cl0_gmres = problem["data:aerodynamics:aircraft:cruise:CL0_clean"]
+    cl_alpha_gmres = problem["data:aerodynamics:aircraft:cruise:CL_alpha"]
+    assert cl0_gmres == pytest.approx(cl0_direct, rel=1e-6)
+    assert cl_alpha_gmres == pytest.approx(cl_alpha_direct, rel=1e-6)
+
+
+def test_vlm_auto_mesh(caplog):
+    """ Tests automatic mesh refinement converges and only chosen mesh is stored in cache """
+
+    VLM_CACHE.clear()
+
+    # Research independent input value in .xml file
+    ivc = get_indep_var_comp(list_inputs(ComputeWingCLALPHAvlm()), __file__, XML_FILE)
+    ivc.add_output("data:aerodynamics:cruise:mach", 0.245)
+
+    # Run problem with default mesh
+    problem = run_system(ComputeWingCLALPHAvlm(), ivc)
+    cl_alpha_default = problem["data:aerodynamics:aircraft:cruise:CL_alpha"]
+
+    # Run problem with auto mesh and check refinement converges (on default mesh) without evicting cache entries
+    problem = run_system(ComputeWingCLALPHAvlm(auto_mesh=True), ivc)
+    cl_alpha_auto = problem["data:aerodynamics:aircraft:cruise:CL_alpha"]
+    assert "did not converge" not in caplog.text
+    assert cl_alpha_auto == pytest.approx(cl_alpha_default, rel=1e-6)
+    assert len(VLM_CACHE) == 1
+
+
+def test_vlm_cosine_spacing():
+    """ Tests cosine panel spacing against uniform spacing """
+
+    # Check panels are refined at both ends
+    borders = [VLM._get_panel_border(0.0, 1.0, idx, 10, 'cosine') for idx in range(11)]
+    assert borders[0] == 0.0
+    assert borders[10] == pytest.approx(1.0, abs=1e-12)
+    assert borders[1] - borders[0] < 0.1 < borders[6] - borders[5]
+    assert borders[10] - borders[9] == pytest.approx(borders[1] - borders[0], abs=1e-12)
+
+    # Research independent input value in .xml file
+    ivc = get_indep_var_comp(list_inputs(ComputeWingCLALPHAvlm()), __file__, XML_FILE)
+    ivc.add_output("data:aerodynamics:cruise:mach", 0.245)
+
+    # Run problem with both spacings and check obtained values are close
+    problem = run_system(ComputeWingCLALPHAvlm(), ivc)
+    cl_alpha_uniform = problem["data:aerodynamics:aircraft:cruise:CL_alpha"]
+    problem = run_system(ComputeWingCLALPHAvlm(chordwise_spacing='cosine', spanwise_spacing='cosine'), ivc)
+    cl_alpha_cosine = problem["data:aerodynamics:aircraft:cruise:CL_alpha"]
+    assert cl_alpha_cosine == pytest.approx(cl_alpha_uniform, rel=0.01)
+    assert cl_alpha_cosine != cl_alpha_uniform
+
+
+def test_vlm_batch():
+    """ Tests batched multi-planform VLM evaluation against single planform computation """
+
+    # Research independent input value in .xml file
+    ivc = get_indep_var_comp(list_inputs(ComputeWingCLALPHAvlm()), __file__, XML_FILE)
+    ivc.add_output("data:aerodynamics:cruise:mach", 0.245)
+
+    # Run problem for the reference planform
+    problem = run_system(ComputeWingCLALPHAvlm(), ivc)
+    cl0 = problem["data:aerodynamics:aircraft:cruise:CL0_clean"]
+    cl_alpha = problem["data:aerodynamics:aircraft:cruise:CL_alpha"]
+
+    # Evaluate reference planform and a higher span/aspect ratio one in a single batch
+    names = [
+        "data:geometry:wing:aspect_ratio", "data:geometry:wing:MAC:length", "data:geometry:wing:kink:span_ratio",
+        "data:geometry:wing:span", "data:geometry:wing:root:y", "data:geometry:wing:root:chord",
+        "data:geometry:wing:tip:chord", "data:geometry:flap:span_ratio", "data:geometry:fuselage:maximum_width",
+    ]
+    planforms = {name: problem[name] for name in names}
+    planforms["data:geometry:wing:span"] = problem["data:geometry:wing:span"] * np.array([1.0, 1.2])
+    planforms["data:geometry:wing:aspect_ratio"] = problem["data:geometry:wing:aspect_ratio"] * np.array([1.0, 1.2])
+    results = VLM().compute_wing_batch(planforms)
+
+    # Check reference values are retrieved (without fuselage and Prandtl-Glauert corrections of the component)
+    span_ratio = problem["data:geometry:fuselage:maximum_width"] / problem["data:geometry:wing:span"]
+    k_fus = 1 + 0.025 * span_ratio - 0.025 * span_ratio ** 2
+    beta = np.sqrt(1 - 0.245 ** 2)
+    assert results["CL0"][0] / beta == pytest.approx(cl0, rel=1e-6)
+    assert results["CL_alpha"][0] * k_fus / beta == pytest.approx(cl_alpha, rel=1e-6)
+    assert results["CL_alpha"][1] > results["CL_alpha"][0]
+
+
 def est_openvsp_comp_high_speed():
     """ Tests openvsp components @ high speed """
 
@@ -507,6 +668,182 @@ def test_openvsp_comp_low_speed_new():
         run_system(ComputeAEROopenvsp(low_speed_aero=True, result_folder_path=results_folder.name), ivc)
 
 
+def _create_fake_openvsp_directory() -> TemporaryDirectory:
+    """ Provides a directory with stand-in OpenVSP executables (and airfoil files) """
+    exe_folder = _create_tmp_directory()
+    for exe_name in ["vspscript.exe", "vspaero.exe"]:
+        shutil.copy(FAKE_OPENVSP_PATH, pth.join(exe_folder.name, exe_name))
+    for airfoil_file in ["naca23012.af", "naca0012.af"]:
+        shutil.copy(pth.join(pth.dirname(__file__), "..", "resources", airfoil_file), exe_folder.name)
+
+    return exe_folder
+
+
+def _read_run_intervals(exe_folder: TemporaryDirectory) -> np.ndarray:
+    """ Reads (and clears) start/end times of the runs of stand-in OpenVSP executables """
+    log_file_path = pth.join(exe_folder.name, RUN_LOG_FILE_NAME)
+    intervals = pd.read_csv(log_file_path, sep=" ", header=None, index_col=0).to_numpy()
+    os.remove(log_file_path)
+
+    return intervals
+
+
+@pytest.mark.skipif(system() == "Windows", reason="Stand-in OpenVSP executables are Python scripts")
+def test_openvsp_concurrent_cases():
+    """ Tests openvsp cases are run concurrently, within concurrency limit """
+
+    GEOMETRY_CACHE.clear()
+    exe_folder = _create_fake_openvsp_directory()
+
+    # Research independent input value in .xml file
+    ivc = get_indep_var_comp(list_inputs(ComputeAEROopenvsp(low_speed_aero=True)), __file__, XML_FILE)
+    ivc.add_output("data:aerodynamics:low_speed:mach", 0.1149)
+
+    # Run problem with default concurrency: both geometries, then the 4 aero cases are computed at once
+    problem = run_system(ComputeAEROopenvsp(low_speed_aero=True, openvsp_exe_path=exe_folder.name), ivc)
+    cl_alpha_wing = problem.get_val("data:aerodynamics:wing:low_speed:CL_alpha", units="rad**-1")
+    intervals = _read_run_intervals(exe_folder)
+    assert len(intervals) == 6
+    assert max(intervals[0:2, 0]) < min(intervals[0:2, 1])
+    assert max(intervals[2:6, 0]) < min(intervals[2:6, 1])
+
+    # Run problem with one case at a time
+    problem = run_system(
+        ComputeAEROopenvsp(low_speed_aero=True, openvsp_exe_path=exe_folder.name, max_concurrent_cases=1), ivc
+    )
+    intervals = _read_run_intervals(exe_folder)
+    assert np.all(intervals[1:, 0] >= intervals[:-1, 1])
+    assert problem.get_val("data:aerodynamics:wing:low_speed:CL_alpha", units="rad**-1") == pytest.approx(
+        cl_alpha_wing, abs=1e-6
+    )
+
+    exe_folder.cleanup()
+
+
+@pytest.mark.skipif(system() == "Windows", reason="Stand-in OpenVSP executables are Python scripts")
+def test_openvsp_shared_cases():
+    """ Tests low speed openvsp cases are computed once and shared between components """
+
+    OPENVSP_CACHE.clear()
+    GEOMETRY_CACHE.clear()
+    exe_folder = _create_fake_openvsp_directory()
+
+    # Run the 4 components: geometries and aero cases are computed by the first one only
+    for component in [
+        ComputeOSWALDopenvsp(low_speed_aero=True, openvsp_exe_path=exe_folder.name),
+        ComputeWingCLALPHAopenvsp(low_speed_aero=True, openvsp_exe_path=exe_folder.name),
+        ComputeHTPCLCMopenvsp(openvsp_exe_path=exe_folder.name),
+        ComputeHTPCLALPHAopenvsp(low_speed_aero=True, openvsp_exe_path=exe_folder.name),
+    ]:
+        # Research independent input value in .xml file
+        ivc = get_indep_var_comp(list_inputs(component), __file__, XML_FILE)
+        ivc.add_output("data:aerodynamics:low_speed:mach", 0.1149)
+        problem = run_system(component, ivc)
+    assert OPENVSP_CACHE.misses == 1
+    assert OPENVSP_CACHE.hits == 3
+    cl_alpha_htp = problem.get_val("data:aerodynamics:horizontal_tail:low_speed:CL_alpha", units="rad**-1")
+    assert cl_alpha_htp == pytest.approx(0.6039, abs=1e-4)
+
+    # 2 geometries, 3 wing cases and 6 wing/horizontal tail cases (2 for CL_alpha, 5 for CL/CM curves, 0° shared)
+    intervals = _read_run_intervals(exe_folder)
+    assert len(intervals) == 11
+
+    exe_folder.cleanup()
+
+
+@pytest.mark.skipif(system() == "Windows", reason="Stand-in OpenVSP executables are Python scripts")
+def test_openvsp_geometry_cache():
+    """ Tests openvsp geometries are generated once for several flight conditions """
+
+    GEOMETRY_CACHE.clear()
+    exe_folder = _create_fake_openvsp_directory()
+
+    # Research independent input value in .xml file
+    ivc = get_indep_var_comp(list_inputs(ComputeAEROopenvsp(low_speed_aero=True)), __file__, XML_FILE)
+    ivc.add_output("data:aerodynamics:low_speed:mach", 0.1149)
+
+    # Run problem and check both geometries, then the 4 aero cases have been computed
+    run_system(ComputeAEROopenvsp(low_speed_aero=True, openvsp_exe_path=exe_folder.name), ivc)
+    assert GEOMETRY_CACHE.misses == 2
+    assert len(_read_run_intervals(exe_folder)) == 6
+
+    # Research independent input value in .xml file
+    ivc = get_indep_var_comp(list_inputs(ComputeAEROopenvsp()), __file__, XML_FILE)
+    ivc.add_output("data:aerodynamics:cruise:mach", 0.245)
+
+    # Run problem at cruise and check only aero cases have been computed (geometries read from cache)
+    problem = run_system(ComputeAEROopenvsp(openvsp_exe_path=exe_folder.name), ivc)
+    assert GEOMETRY_CACHE.hits == 2
+    assert len(_read_run_intervals(exe_folder)) == 4
+    cl_alpha_htp = problem.get_val("data:aerodynamics:horizontal_tail:cruise:CL_alpha", units="rad**-1")
+    assert cl_alpha_htp == pytest.approx(0.6188, abs=1e-4)
+
+    exe_folder.cleanup()
+
+
+@pytest.mark.skipif(system() == "Windows", reason="Stand-in OpenVSP executables are Python scripts")
+def test_openvsp_multi_speed():
+    """ Tests low speed and cruise openvsp coefficients are computed by the same vspaero runs """
+
+    GEOMETRY_CACHE.clear()
+    exe_folder = _create_fake_openvsp_directory()
+
+    # Research independent input value in .xml file
+    ivc = get_indep_var_comp(list_inputs(ComputeAEROopenvsp(multi_speed_aero=True)), __file__, XML_FILE)
+    ivc.add_output("data:aerodynamics:low_speed:mach", 0.1149)
+    ivc.add_output("data:aerodynamics:cruise:mach", 0.245)
+
+    # Run problem and check both speeds are computed from 2 geometries and 4 aero cases
+    problem = run_system(ComputeAEROopenvsp(multi_speed_aero=True, openvsp_exe_path=exe_folder.name), ivc)
+    assert len(_read_run_intervals(exe_folder)) == 6
+    cl_alpha_wing = problem.get_val("data:aerodynamics:wing:low_speed:CL_alpha", units="rad**-1")
+    assert cl_alpha_wing == pytest.approx(4.5400, abs=1e-4)
+    y_vector = problem.get_val("data:aerodynamics:wing:low_speed:Y_vector", units="m")
+    assert y_vector[0:2] == pytest.approx([0.2, 0.45], abs=1e-5)
+    cl_alpha_htp = problem.get_val("data:aerodynamics:horizontal_tail:cruise:CL_alpha", units="rad**-1")
+    assert cl_alpha_htp == pytest.approx(0.6188, abs=1e-4)
+
+    exe_folder.cleanup()
+
+
+def test_openvsp_result_cache():
+    """ Tests storage, tolerance match and eviction of openvsp results """
+
+    # Create result temporary directory
+    results_folder = _create_tmp_directory()
+    cache_file_path = pth.join(results_folder.name, "openvsp_results.sqlite")
+    geometry_set = [0.0, 1.0, 7.98, 0.0, 0.8, 0.1149]
+    results = {"cl_alpha_wing": 4.82, "y_vector": np.linspace(0.0, 5.0, SPAN_MESH_POINT_OPENVSP)}
+
+    # Exact match only without tolerance
+    cache = OpenVSPResultCache(cache_file_path)
+    cache.put(geometry_set, results)
+    assert cache.get(geometry_set)["cl_alpha_wing"] == pytest.approx(4.82, abs=1e-12)
+    assert np.array(cache.get(geometry_set)["y_vector"]) == pytest.approx(results["y_vector"], abs=1e-12)
+    assert cache.get([0.0, 1.0, 7.98 * (1 + 1e-6), 0.0, 0.8, 0.1149]) is None
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+    # Match within relative tolerance (on both sides of stored values), results being shared between instances
+    cache = OpenVSPResultCache(cache_file_path, tolerance=1e-3)
+    cache.put(geometry_set, results)
+    for factor in [1 - 9e-4, 1 + 9e-4]:
+        assert cache.get([0.0, 1.0, 7.98 * factor, 0.0, 0.8, 0.1149 / factor]) is not None
+    assert cache.get([0.0, 1.0, 7.98 * 1.002, 0.0, 0.8, 0.1149]) is None
+    assert cache.get([0.0, 1.0, 7.98, 0.1, 0.8, 0.1149]) is None
+
+    # Least recently used results are dropped
+    cache = OpenVSPResultCache(cache_file_path, max_size=2)
+    cache.put(geometry_set[:-1] + [0.2], results)
+    cache.get(geometry_set)
+    cache.put(geometry_set[:-1] + [0.3], results)
+    assert len(cache) == 2
+    assert cache.get(geometry_set) is not None
+    assert cache.get(geometry_set[:-1] + [0.2]) is None
+
+    results_folder.cleanup()
+
+
 def est_high_lift():
     """ Tests high-lift contribution """
 
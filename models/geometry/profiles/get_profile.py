@@ -14,13 +14,25 @@ Airfoil reshape function
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import os
 import os.path as pth
-import pandas as pd
 import math
+import threading
 import warnings
+from collections import namedtuple
+from typing import Dict, Iterable
+
+import numpy as np
 
 from .profile import Profile
-from ...aerodynamics import resources
+from .profile_database import get_database_profile, get_file_hash
+
+ProfileCacheInfo = namedtuple("ProfileCacheInfo", ["hits", "misses", "size"])
+
+# Parsed base profiles, keyed on (file name, modification time): they are never modified, get_profile returns copies
+_PROFILE_CACHE = {}
+_PROFILE_CACHE_STATS = {"hits": 0, "misses": 0}
+_PROFILE_CACHE_LOCK = threading.Lock()
 
 
 def get_profile(
@@ -29,19 +41,20 @@ def get_profile(
     """
     Reads profile from indicated resource file and returns it after resize
 
+    The resource file is parsed once (and again only if modified): the returned profile is a copy of the cached one
+    and can be freely modified.
+
     :param file_name: name of resource (ex: "naca23012.af")
     :param thickness_ratio:
     :param chord_length:
     :return: Profile object
     """
 
-    profile = Profile()
-    x_z = genfromtxt(pth.join(resources.__path__[0], file_name))
-    profile.set_points(x_z["x"], x_z["z"])
+    profile = _get_base_profile(file_name).copy()
 
     if thickness_ratio:
         if abs(profile.thickness_ratio - thickness_ratio)/thickness_ratio > 0.01:
-            warnings.warn('The airfoil thickness ratio from file ' + pth.join(resources.__path__[0], file_name)
+            warnings.warn('The airfoil thickness ratio from file ' + pth.join(_get_resources_path(), file_name)
                           + ' differs from user defined input data:geometry:wing:thickness_ratio!')
         profile.thickness_ratio = thickness_ratio
 
@@ -51,8 +64,83 @@ def get_profile(
     return profile
 
 
-def genfromtxt(file_name: str = None) -> pd.DataFrame:
-    with open(pth.join(resources.__path__[0], file_name), 'r') as lf:
+def preload_profiles(file_names: Iterable[str] = None):
+    """
+    Parses profiles in advance (for instance at startup) so that later get_profile calls are cache hits.
+
+    :param file_names: names of resources (all .af resources if not provided)
+    """
+
+    if file_names is None:
+        file_names = sorted(name for name in os.listdir(_get_resources_path()) if name.endswith(".af"))
+    for file_name in file_names:
+        _get_base_profile(file_name)
+
+
+def get_profile_cache_info() -> ProfileCacheInfo:
+    """
+    :return: hits and misses of get_profile calls on the parsed profile cache, and number of cached profiles
+    """
+
+    with _PROFILE_CACHE_LOCK:
+        return ProfileCacheInfo(_PROFILE_CACHE_STATS["hits"], _PROFILE_CACHE_STATS["misses"], len(_PROFILE_CACHE))
+
+
+def clear_profile_cache():
+    """ Removes parsed profiles from cache and resets statistics """
+
+    with _PROFILE_CACHE_LOCK:
+        _PROFILE_CACHE.clear()
+        _PROFILE_CACHE_STATS["hits"] = 0
+        _PROFILE_CACHE_STATS["misses"] = 0
+
+
+def _get_base_profile(file_name: str) -> Profile:
+    """
+    Returns cached profile read from binary store (see profile_database) or resource file, parsing it if unknown or
+    modified (must not be modified)
+    """
+
+    file_path = pth.join(_get_resources_path(), file_name)
+    # Profiles may be available only in binary store
+    file_exists = pth.exists(file_path)
+    key = (file_name, os.stat(file_path).st_mtime_ns if file_exists else None)
+    with _PROFILE_CACHE_LOCK:
+        profile = _PROFILE_CACHE.get(key)
+        if profile is not None:
+            _PROFILE_CACHE_STATS["hits"] += 1
+            return profile
+        _PROFILE_CACHE_STATS["misses"] += 1
+
+    profile = get_database_profile(file_name, get_file_hash(file_path) if file_exists else None)
+    if profile is None:
+        profile = Profile()
+        x_z = genfromtxt(file_name)
+        profile.set_points(x_z["x"], x_z["z"])
+    with _PROFILE_CACHE_LOCK:
+        # Outdated versions of the file are dropped
+        for outdated_key in [cached_key for cached_key in _PROFILE_CACHE if cached_key[0] == file_name]:
+            del _PROFILE_CACHE[outdated_key]
+        _PROFILE_CACHE[key] = profile
+
+    return profile
+
+
+def _get_resources_path() -> str:
+    """ Folder of airfoil resources (imported on use: aerodynamics package imports this module) """
+    from ...aerodynamics import resources
+
+    return resources.__path__[0]
+
+
+def genfromtxt(file_name: str = None, resources_folder: str = None) -> Dict[str, np.ndarray]:
+    """
+    :param file_name: name of resource (ex: "naca23012.af")
+    :param resources_folder: folder of the resource (aerodynamics resources if not provided)
+    :return: points of the profile, keys are 'x' and 'z'
+    """
+    resources_folder = resources_folder if resources_folder else _get_resources_path()
+    with open(pth.join(resources_folder, file_name), 'r') as lf:
         data = lf.readlines()
         # Extract data
         x_data = []
@@ -70,4 +158,4 @@ def genfromtxt(file_name: str = None) -> pd.DataFrame:
                 except:
                     pass
 
-    return pd.DataFrame(data={'x': x_data, 'z': z_data})
+    return {'x': np.array(x_data), 'z': np.array(z_data)}
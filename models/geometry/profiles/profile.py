@@ -15,14 +15,11 @@ Management of 2D wing profiles
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import operator
-import copy
 from collections import namedtuple
-from typing import Sequence, Tuple
+from typing import Dict, Sequence, Tuple
 
 import numpy as np
-import pandas as pd
 from scipy.interpolate import interp1d
-from scipy import interpolate
 
 Coordinates2D = namedtuple("Coordinates2D", ["x", "y"])
 
@@ -31,22 +28,32 @@ Z = "z"
 THICKNESS = "thickness"
 
 
+def _read_only(array) -> np.ndarray:
+    """ Returns array as contiguous float64 array that cannot be modified """
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    array.flags.writeable = False
+    return array
+
+
 class Profile:
     """Class for managing 2D wing profiles
+
+    Points are returned as dictionaries of read-only float64 arrays (keys 'x', 'z' or 'thickness'), see
+    :meth:`to_dataframe` for a pandas DataFrame export.
     """
 
     # pylint: disable=invalid-name  # X and Z are valid names in this context
 
+    __slots__ = ("_rel_x", "_rel_z", "_rel_thickness", "chord_length", "_max_relative_thickness")
+
     def __init__(self, chord_length: float = 0.0):
 
-        self._rel_mean_line_and_thickness = pd.DataFrame(columns=[X, Z, THICKNESS])
-        """
-        Data of mean line and thickness, computed after inputs of :meth:`set_points`_.
-        
-        DataFrame keys are 'x', 'z' and 'thickness'.
-        - 'x' and 'z' are relative to chord_length
-        - 'thickness' is relative to max thickness (and given according to 'x')
-        """
+        # Mean line and thickness, computed after inputs of :meth:`set_points`_: 'x' and 'z' are relative to
+        # chord_length, 'thickness' is relative to max thickness (and given according to 'x'). Arrays are never
+        # modified in place (only replaced), so that copies can share them.
+        self._rel_x: np.ndarray = _read_only([])
+        self._rel_z: np.ndarray = _read_only([])
+        self._rel_thickness: np.ndarray = _read_only([])
 
         self.chord_length: float = chord_length
         """ in meters """
@@ -65,9 +72,44 @@ class Profile:
         # mean line is modified accordingly
         if self._max_relative_thickness != 0.0:
             coeff = value / self._max_relative_thickness
-            self._rel_mean_line_and_thickness[Z] *= coeff
+            self._rel_z = _read_only(self._rel_z * coeff)
         self._max_relative_thickness = value
 
+    def copy(self) -> "Profile":
+        """
+        :return: an independent copy of the profile (mean line and thickness arrays, being read-only, are shared)
+        """
+        profile = Profile(self.chord_length)
+        profile._rel_x = self._rel_x
+        profile._rel_z = self._rel_z
+        profile._rel_thickness = self._rel_thickness
+        profile._max_relative_thickness = self._max_relative_thickness
+        return profile
+
+    @staticmethod
+    def from_relative_data(
+        rel_x: np.ndarray,
+        rel_z: np.ndarray,
+        rel_thickness: np.ndarray,
+        chord_length: float,
+        thickness_ratio: float,
+    ) -> "Profile":
+        """
+        Creates profile from data of :meth:`get_relative_data` (no copy if arrays are already read-only float64).
+        """
+        profile = Profile(chord_length)
+        profile._rel_x = _read_only(rel_x)
+        profile._rel_z = _read_only(rel_z)
+        profile._rel_thickness = _read_only(rel_thickness)
+        profile._max_relative_thickness = thickness_ratio
+        return profile
+
+    def get_relative_data(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :return: stored mean line x and z (relative to chord_length) and thickness (relative to max thickness)
+        """
+        return self._rel_x, self._rel_z, self._rel_thickness
+
     def set_points(
         self,
         x: Sequence,
@@ -87,7 +129,8 @@ class Profile:
         :param keep_chord_length:
         """
 
-        x = np.asarray(x)
+        x = np.asarray(x, dtype=np.float64)
+        z = np.asarray(z, dtype=np.float64)
 
         # Separate upper surface from lower surface (easier for computation
         # of thickness and mean line)
@@ -101,60 +144,71 @@ class Profile:
         if not keep_relative_thickness or self.thickness_ratio == 0.0:
             self.thickness_ratio = max_thickness / chord_length
 
-    def get_mean_line(self) -> pd.DataFrame:
+    def get_mean_line(self) -> Dict[str, np.ndarray]:
         """Point set of mean line of the profile.
 
-        DataFrame keys are 'x' and 'z', given in meters.
+        Keys are 'x' and 'z', given in meters.
         """
-        mean_line = self._rel_mean_line_and_thickness[[X, Z]] * self.chord_length
-        return mean_line
+        return {X: _read_only(self._rel_x * self.chord_length), Z: _read_only(self._rel_z * self.chord_length)}
 
-    def get_relative_thickness(self) -> pd.DataFrame:
+    def get_relative_thickness(self) -> Dict[str, np.ndarray]:
         """Point set of relative thickness of the profile.
 
-        DataFrame keys are 'x' and 'thickness' and are relative to chord_length.
+        Keys are 'x' and 'thickness' and are relative to chord_length.
         'x' is form 0. to 1.
         """
-        return self._rel_mean_line_and_thickness[[X, THICKNESS]] * [1.0, self.thickness_ratio]
+        return {X: self._rel_x, THICKNESS: _read_only(self._rel_thickness * self.thickness_ratio)}
 
-    def get_upper_side(self) -> pd.DataFrame:
+    def get_upper_side(self) -> Dict[str, np.ndarray]:
         """Point set of upper side of the profile.
 
-        DataFrame keys are 'x' and 'z', given in meters.
+        Keys are 'x' and 'z', given in meters.
         """
         return self._get_side_points(operator.add)
 
-    def get_lower_side(self) -> pd.DataFrame:
+    def get_lower_side(self) -> Dict[str, np.ndarray]:
         """Point set of lower side of the profile.
 
-        DataFrame keys are 'x' and 'z', given in meters.
+        Keys are 'x' and 'z', given in meters.
         """
         return self._get_side_points(operator.sub)
 
-    def get_sides(self) -> pd.DataFrame:
+    def get_sides(self) -> Dict[str, np.ndarray]:
         """Point set of the whole profile
 
         Points are given from trailing edge to trailing edge, starting by upper side.
         """
-        return pd.concat(
-            [self.get_upper_side().sort_values(by=X, ascending=False), self.get_lower_side()[1:]]
-        )
+        upper_side = self.get_upper_side()
+        lower_side = self.get_lower_side()
+        # Upper side by decreasing x
+        order = np.argsort(upper_side[X])[::-1]
+        return {
+            X: _read_only(np.concatenate((upper_side[X][order], lower_side[X][1:]))),
+            Z: _read_only(np.concatenate((upper_side[Z][order], lower_side[Z][1:]))),
+        }
+
+    def to_dataframe(self):
+        """
+        Exports relative mean line and thickness (as stored) to a pandas DataFrame (pandas being imported on request).
 
-    def _get_side_points(self, operator_) -> pd.DataFrame:
+        DataFrame keys are 'x', 'z' (relative to chord_length) and 'thickness' (relative to max thickness).
+        """
+        import pandas as pd
+
+        return pd.DataFrame(data={X: self._rel_x, Z: self._rel_z, THICKNESS: self._rel_thickness})
+
+    def _get_side_points(self, operator_) -> Dict[str, np.ndarray]:
         """
         Computes upper or lower side points.
 
         operator_ ==  operator.add() -> upper side
         operator_ ==  operator.sub() -> lower side
         """
-        mean_line = self._rel_mean_line_and_thickness[[X, Z]]
-        half_thickness = pd.DataFrame().reindex_like(mean_line)
-        half_thickness[X] = 0.0
-        half_thickness[Z] = (
-            self._rel_mean_line_and_thickness[THICKNESS] / 2.0 * self.thickness_ratio
-        )
-        points = operator_(mean_line, half_thickness) * self.chord_length
-        return points
+        half_thickness = self._rel_thickness / 2.0 * self.thickness_ratio
+        return {
+            X: _read_only(self._rel_x * self.chord_length),
+            Z: _read_only(operator_(self._rel_z, half_thickness) * self.chord_length),
+        }
 
     def _compute_mean_line_and_thickness(
         self, upper_side_points, lower_side_points
@@ -162,11 +216,11 @@ class Profile:
         """
         Computes mean line and thickness from upper_side_points and lower_side_points.
 
-        Fills self._rel_mean_line_and_thickness with relative values.
+        Fills relative mean line and thickness arrays.
         Returns actual chord length and maximum thickness (in meters)
         """
-        x_up_vect = list(np.array(upper_side_points[X]).tolist())
-        x_lo_vect = list(np.array(lower_side_points[X]).tolist())
+        x_up_vect = upper_side_points[X]
+        x_lo_vect = lower_side_points[X]
         x_start = (np.logspace(0, 1, 15)-1)/9.0 * (0.1 - max(min(x_up_vect), min(x_lo_vect))) +\
                   max(min(x_up_vect), min(x_lo_vect))
         x_interp = np.append(
@@ -175,55 +229,47 @@ class Profile:
         )
         interp_lower = interp1d(lower_side_points[X], lower_side_points[Z], kind="slinear")
         interp_upper = interp1d(upper_side_points[X], upper_side_points[Z], kind="slinear")
-        z_sides = pd.DataFrame({"z_lower": interp_lower(x_interp), "z_upper": interp_upper(x_interp)})
-        z = z_sides.mean(axis=1)
-        thickness = z_sides.diff(axis=1).iloc[:, -1]
+        z_lower = interp_lower(x_interp)
+        z_upper = interp_upper(x_interp)
+        z = (z_lower + z_upper) / 2.0
+        thickness = z_upper - z_lower
 
         chord_length = np.max(x_interp) - np.min(x_interp)
         max_thickness = np.max(thickness)
-        self._rel_mean_line_and_thickness = pd.DataFrame(
-            data={
-                X: (x_interp / chord_length).tolist(),
-                Z: (z / chord_length).tolist(),
-                THICKNESS: (thickness / max_thickness).tolist()
-            }
-        )
+        self._rel_x = _read_only(x_interp / chord_length)
+        self._rel_z = _read_only(z / chord_length)
+        self._rel_thickness = _read_only(thickness / max_thickness)
         return chord_length, max_thickness
 
     @staticmethod
-    def _create_upper_lower_sides(x: Sequence, z: Sequence) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    def _create_upper_lower_sides(
+            x: np.ndarray, z: np.ndarray
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
         """ returns upper side points and lower side points using provided x and z """
 
         # Find middle point (inversion of delta_x locally for 1-0-1 (or 0-1-0) chord struct. or
         # permanently for 0-1/0-1 (or 1-0/1-0) chord struct.)
-        x_vect = np.array(x)
-        if x_vect[0] > x_vect[1]:
-            list_index = np.where(x_vect[0:len(x_vect) - 1] < x_vect[1:len(x_vect)])[0].tolist()
+        if x[0] > x[1]:
+            list_index = np.where(x[0:len(x) - 1] < x[1:len(x)])[0].tolist()
         else:
-            list_index = np.where(x_vect[0:len(x_vect) - 1] > x_vect[1:len(x_vect)])[0].tolist()
+            list_index = np.where(x[0:len(x) - 1] > x[1:len(x)])[0].tolist()
         index = int(list_index[0] + 1)
 
-        if index is None:
-            side1 = pd.DataFrame({X: x, Z: z})
-            # noinspection PyTypeChecker
-            side2 = pd.DataFrame({X: x, Z: -1.0*z})
-        else:
-            side1 = pd.DataFrame({X: x[0: index], Z: z[0: index]})
-            side2 = pd.DataFrame({X: x[index:], Z: z[index:]})
-
-        side1.sort_values(by=X, inplace=True)
-        side2.sort_values(by=X, inplace=True)
+        side1 = Profile._sort_points(x[0: index], z[0: index])
+        side2 = Profile._sort_points(x[index:], z[index:])
 
         if np.max(side1[Z]) > np.max(side2[Z]):
-            upper_side_points = side1
-            lower_side_points = side2
-        else:
-            upper_side_points = side2
-            lower_side_points = side1
+            return side1, side2
+        return side2, side1
+
+    @staticmethod
+    def _sort_points(x: np.ndarray, z: np.ndarray) -> Dict[str, np.ndarray]:
+        """ returns points sorted by x, duplicated points being removed """
 
-        upper_side_points.drop_duplicates(inplace=True)
-        lower_side_points.drop_duplicates(inplace=True)
-        upper_side_points.reset_index(drop=True, inplace=True)
-        lower_side_points.reset_index(drop=True, inplace=True)
+        order = np.argsort(x, kind="quicksort")
+        points = np.column_stack((x[order], z[order]))
+        # Duplicated points are dropped, first occurrence being kept
+        _, first_index = np.unique(points, axis=0, return_index=True)
+        points = points[np.sort(first_index)]
 
-        return upper_side_points, lower_side_points
+        return {X: points[:, 0], Z: points[:, 1]}
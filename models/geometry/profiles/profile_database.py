@@ -0,0 +1,150 @@
+"""
+Binary store of airfoil profiles, compiled from .af resource files
+"""
+#  This file is part of FAST : A framework for rapid Overall Aircraft Design
+#  Copyright (C) 2020  ONERA & ISAE-SUPAERO
+#  FAST is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import argparse
+import hashlib
+import json
+import os
+import os.path as pth
+import threading
+from typing import Optional
+
+import numpy as np
+
+from .profile import Profile
+
+DATABASE_FILE_NAME = "profiles.npy"
+INDEX_FILE_NAME = "profiles.json"
+
+# Loaded databases per folder: (index file modification time, index, memory-mapped data)
+_DATABASES = {}
+_DATABASES_LOCK = threading.Lock()
+
+
+def build_profile_database(resources_folder: str = None, database_folder: str = None) -> str:
+    """
+    Compiles all .af files of resources_folder into one binary store: a flat float64 .npy array holding, for each
+    airfoil, the raw coordinates followed by the relative mean line and thickness distribution, and a JSON index
+    giving their offsets, the file content hashes, chord length, thickness ratio and max thickness location.
+
+    :param resources_folder: folder of .af files (aerodynamics resources if not provided)
+    :param database_folder: folder where store is written (resources_folder if not provided)
+    :return: path of the index file
+    """
+    from .get_profile import genfromtxt, _get_resources_path
+
+    resources_folder = resources_folder if resources_folder else _get_resources_path()
+    database_folder = database_folder if database_folder else resources_folder
+
+    blocks = []
+    index = {}
+    offset = 0
+    for file_name in sorted(name for name in os.listdir(resources_folder) if name.endswith(".af")):
+        x_z = genfromtxt(file_name, resources_folder)
+        profile = Profile()
+        profile.set_points(x_z["x"], x_z["z"])
+        rel_x, rel_z, rel_thickness = profile.get_relative_data()
+        coordinates = np.concatenate((x_z["x"], x_z["z"]))
+        mean_line = np.concatenate((rel_x, rel_z, rel_thickness))
+        index[file_name] = {
+            "sha256": get_file_hash(pth.join(resources_folder, file_name)),
+            "coordinates": [offset, len(x_z["x"])],
+            "mean_line": [offset + len(coordinates), len(rel_x)],
+            "chord_length": float(profile.chord_length),
+            "thickness_ratio": float(profile.thickness_ratio),
+            "max_thickness_x": float(rel_x[int(np.argmax(rel_thickness))]),
+        }
+        blocks += [coordinates, mean_line]
+        offset += len(coordinates) + len(mean_line)
+
+    # Files are written under temporary names then renamed, so that readers never see partial files
+    if not pth.exists(database_folder):
+        os.makedirs(database_folder)
+    database_path = pth.join(database_folder, DATABASE_FILE_NAME)
+    index_path = pth.join(database_folder, INDEX_FILE_NAME)
+    with open(database_path + ".tmp", "wb") as database_file:
+        np.save(database_file, np.concatenate(blocks) if blocks else np.zeros(0))
+    with open(index_path + ".tmp", "w") as index_file:
+        json.dump(index, index_file, indent=1)
+    os.replace(database_path + ".tmp", database_path)
+    os.replace(index_path + ".tmp", index_path)
+
+    return index_path
+
+
+def get_database_profile(
+        file_name: str, file_hash: Optional[str] = None, database_folder: str = None
+) -> Optional[Profile]:
+    """
+    Reads profile from binary store, with no parsing (data is memory-mapped and shared by all processes).
+
+    :param file_name: name of resource (ex: "naca23012.af")
+    :param file_hash: content hash of the resource file (see get_file_hash), the stored profile being ignored if it
+                      differs (None if the file is only available in the store)
+    :param database_folder: folder of the store (aerodynamics resources if not provided)
+    :return: Profile object or None if store does not exist or is outdated for this file
+    """
+
+    entry, data = _get_database_entry(file_name, database_folder)
+    if entry is None or (file_hash is not None and entry.get("sha256") != file_hash):
+        return None
+
+    start, count = entry["mean_line"]
+    rel_x, rel_z, rel_thickness = np.reshape(data[start:start + 3 * count], (3, count))
+
+    return Profile.from_relative_data(
+        rel_x, rel_z, rel_thickness, entry["chord_length"], entry["thickness_ratio"]
+    )
+
+
+def get_file_hash(file_path: str) -> str:
+    """
+    :param file_path: path of a resource file
+    :return: SHA-256 hash of file content (stored profiles remain valid when the store is copied or checked out)
+    """
+
+    with open(file_path, "rb") as resource_file:
+        return hashlib.sha256(resource_file.read()).hexdigest()
+
+
+def _get_database_entry(file_name: str, database_folder: str = None):
+    """ Returns (index entry, memory-mapped data) of the profile, entry being None if unknown """
+    from .get_profile import _get_resources_path
+
+    database_folder = database_folder if database_folder else _get_resources_path()
+    index_path = pth.join(database_folder, INDEX_FILE_NAME)
+    if not pth.exists(index_path):
+        return None, None
+
+    index_mtime = os.stat(index_path).st_mtime_ns
+    with _DATABASES_LOCK:
+        database = _DATABASES.get(database_folder)
+        if database is None or database[0] != index_mtime:
+            with open(index_path, "r") as index_file:
+                index = json.load(index_file)
+            data = np.load(pth.join(database_folder, DATABASE_FILE_NAME), mmap_mode="r")
+            database = (index_mtime, index, data)
+            _DATABASES[database_folder] = database
+
+    return database[1].get(file_name), database[2]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compiles .af airfoil files into a binary profile store")
+    parser.add_argument("--resources", help="folder of .af files (default: aerodynamics resources)")
+    parser.add_argument("--output", help="folder of the store (default: resources folder)")
+    args = parser.parse_args()
+    print(build_profile_database(args.resources, args.output))
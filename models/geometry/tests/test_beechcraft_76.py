@@ -14,6 +14,13 @@ Test module for geometry functions of cg components
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import os
+import os.path as pth
+import shutil
+import sys
+import tempfile
+
+import numpy as np
 import openmdao.api as om
 import pandas as pd
 from openmdao.core.component import Component
@@ -58,6 +65,10 @@ from ..geom_components.vt.components import (
 )
 from ..geom_components.nacelle.compute_nacelle import ComputeNacelleGeometry
 from ..geom_components import ComputeTotalArea
+from ..profiles.get_profile import (
+    get_profile, get_profile_cache_info, clear_profile_cache, preload_profiles, _get_resources_path
+)
+from ..profiles.profile_database import build_profile_database, get_database_profile, get_file_hash
 from ..geometry import Geometry
 from ...propulsion.fuel_propulsion.base import AbstractFuelPropulsion
 from ...propulsion.propulsion import IPropulsion
@@ -525,6 +536,80 @@ def test_geometry_total_area():
     assert total_surface == pytest.approx(92.056, abs=1e-3)
 
 
+def test_profile_cache():
+    """ Tests parsed airfoil profiles are cached and returned as independent copies """
+
+    clear_profile_cache()
+    preload_profiles(["naca23012.af"])
+    assert get_profile_cache_info().misses == 1
+
+    # Resized profile does not alter cached one
+    profile = get_profile(file_name="naca23012.af", thickness_ratio=0.15, chord_length=2.0)
+    assert profile.thickness_ratio == pytest.approx(0.15, abs=1e-6)
+    assert profile.chord_length == pytest.approx(2.0, abs=1e-6)
+    profile = get_profile(file_name="naca23012.af")
+    assert profile.thickness_ratio == pytest.approx(0.1201, abs=1e-4)
+    assert get_profile_cache_info().hits == 2
+    assert get_profile_cache_info().misses == 1
+
+    # Points are read-only arrays, DataFrame being available on request
+    relative_thickness = profile.get_relative_thickness()
+    assert not relative_thickness["thickness"].flags.writeable
+    assert np.max(relative_thickness["thickness"]) == pytest.approx(0.1201, abs=1e-4)
+    assert list(profile.to_dataframe().columns) == ["x", "z", "thickness"]
+
+
+def test_profile_database():
+    """ Tests profiles read from compiled binary store are the same as parsed ones """
+
+    database_folder = tempfile.mkdtemp()
+    build_profile_database(database_folder=database_folder)
+    profile = get_database_profile("naca23012.af", database_folder=database_folder)
+    parsed_profile = get_profile(file_name="naca23012.af")
+    assert profile.thickness_ratio == parsed_profile.thickness_ratio
+    assert profile.chord_length == parsed_profile.chord_length
+    for stored_data, parsed_data in zip(profile.get_relative_data(), parsed_profile.get_relative_data()):
+        assert np.array_equal(stored_data, parsed_data)
+    assert get_database_profile("unknown.af", database_folder=database_folder) is None
+    shutil.rmtree(database_folder)
+
+
+def test_get_profile_from_database(tmpdir, monkeypatch):
+    """ Tests get_profile serves profiles from the binary store of resources folder while files are unchanged """
+
+    resources_folder = str(tmpdir.mkdir("resources"))
+    naca23012_path = pth.join(resources_folder, "naca23012.af")
+    shutil.copy(pth.join(_get_resources_path(), "naca23012.af"), naca23012_path)
+    shutil.copy(naca23012_path, pth.join(resources_folder, "stored.af"))
+    monkeypatch.setattr(sys.modules[get_profile.__module__], "_get_resources_path", lambda: resources_folder)
+    clear_profile_cache()
+
+    # Store is built from a relative folder path
+    monkeypatch.chdir(str(tmpdir))
+    build_profile_database("resources")
+
+    # Profile only available in store
+    os.remove(pth.join(resources_folder, "stored.af"))
+    assert get_profile(file_name="stored.af").thickness_ratio == pytest.approx(0.1201, abs=1e-4)
+
+    # Stored profile remains valid if file is copied (modification time changes, content does not)
+    os.utime(naca23012_path, ns=(0, 0))
+    assert get_database_profile("naca23012.af", get_file_hash(naca23012_path)) is not None
+
+    # Stored profile is ignored once file content changes
+    with open(naca23012_path, "r") as profile_file:
+        lines = profile_file.readlines()
+    with open(naca23012_path, "w") as profile_file:
+        for line in lines:
+            values = line.split()
+            if len(values) == 2 and values[0].replace(".", "", 1).isdigit():
+                line = "%s %f\n" % (values[0], 1.25 * float(values[1]))
+            profile_file.write(line)
+    assert get_database_profile("naca23012.af", get_file_hash(naca23012_path)) is None
+    assert get_profile(file_name="naca23012.af").thickness_ratio == pytest.approx(1.25 * 0.1201, abs=1e-3)
+    clear_profile_cache()
+
+
 def test_complete_geometry():
     """ Run computation of all models """
 